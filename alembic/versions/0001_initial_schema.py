@@ -0,0 +1,47 @@
+"""Initial schema of the secret storage
+
+The ``secrets`` table of the first release, with a globally unique ``secret_key``. The
+service stamps databases created by ``create_all`` before migrations with this revision and
+upgrades them; later revisions skip the tables and indexes ``create_all`` already added.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 00:00:00
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: str | Sequence[str] | None = None
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "secrets",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("application_id", sa.String(), nullable=False),
+        sa.Column("secret_key", sa.String(), nullable=False),
+        sa.Column("secret_value", sa.LargeBinary(), nullable=False),
+        sa.Column("is_deleted", sa.Boolean(), nullable=True),
+        sa.Column("is_destoyed", sa.Boolean(), nullable=True),
+        sa.Column("version", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("deleted_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("secret_key"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("secrets")
@@ -0,0 +1,47 @@
+"""Chunks of large secrets
+
+Large values are split into ``secret_chunks`` rows read back by ``blob_id`` in
+``chunk_index`` order.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 00:00:00
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: str | Sequence[str] | None = "0001"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # create_all до появления миграций мог уже создать таблицу
+    if sa.inspect(op.get_bind()).has_table("secret_chunks"):
+        return
+    op.create_table(
+        "secret_chunks",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("application_id", sa.String(), nullable=False),
+        sa.Column("blob_id", sa.String(), nullable=False),
+        sa.Column("chunk_index", sa.Integer(), nullable=False),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_secret_chunks_blob_id_chunk_index", "secret_chunks", ["blob_id", "chunk_index"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_secret_chunks_blob_id_chunk_index", table_name="secret_chunks")
+    op.drop_table("secret_chunks")
@@ -0,0 +1,40 @@
+"""Checkpoints of background jobs
+
+``job_checkpoints`` keeps the progress of resumable jobs such as the key rotation.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:00
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: str | Sequence[str] | None = "0002"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # create_all до появления миграций мог уже создать таблицу
+    if sa.inspect(op.get_bind()).has_table("job_checkpoints"):
+        return
+    op.create_table(
+        "job_checkpoints",
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("state", sa.Text(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("job_checkpoints")
@@ -0,0 +1,33 @@
+"""Index on the update time of secrets
+
+``ix_secrets_updated_at`` serves the polling of changed secrets.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 00:00:00
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: str | Sequence[str] | None = "0003"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    indexes = {index["name"] for index in sa.inspect(op.get_bind()).get_indexes("secrets")}
+    if "ix_secrets_updated_at" not in indexes:
+        op.create_index("ix_secrets_updated_at", "secrets", ["updated_at"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_secrets_updated_at", table_name="secrets")
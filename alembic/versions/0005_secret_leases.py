@@ -0,0 +1,40 @@
+"""Leases of secrets
+
+``expires_at`` limits the lifetime of a secret; expired secrets are not read and are
+removed by the reaper, which looks them up by ``ix_secrets_expires_at``.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 00:00:00
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: str | Sequence[str] | None = "0004"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    columns = {column["name"] for column in inspector.get_columns("secrets")}
+    if "expires_at" not in columns:
+        op.add_column("secrets", sa.Column("expires_at", sa.DateTime(), nullable=True))
+    indexes = {index["name"] for index in inspector.get_indexes("secrets")}
+    if "ix_secrets_expires_at" not in indexes:
+        op.create_index("ix_secrets_expires_at", "secrets", ["expires_at"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_secrets_expires_at", table_name="secrets")
+    with op.batch_alter_table("secrets") as batch_op:
+        batch_op.drop_column("expires_at")
@@ -0,0 +1,35 @@
+"""Index on the application and key of secrets
+
+``ix_secrets_application_id_secret_key`` serves the lookups of a secret by application.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 00:00:00
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: str | Sequence[str] | None = "0005"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    indexes = {index["name"] for index in sa.inspect(op.get_bind()).get_indexes("secrets")}
+    if "ix_secrets_application_id_secret_key" not in indexes:
+        op.create_index(
+            "ix_secrets_application_id_secret_key", "secrets", ["application_id", "secret_key"]
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_secrets_application_id_secret_key", table_name="secrets")
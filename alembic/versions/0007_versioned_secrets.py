@@ -0,0 +1,85 @@
+"""Versioned secrets with keys unique per application
+
+``secret_key`` is no longer unique across the whole table: a secret is identified by
+``(application_id, secret_key, version)`` and each write adds a version row. ``is_latest``
+marks the newest version, and the partial index ``ix_secrets_latest_live`` covers the
+latest live version of every secret.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 00:00:00
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: str | Sequence[str] | None = "0006"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Безымянные ограничения SQLite получают имя при пересоздании таблицы в пакетном режиме
+NAMING_CONVENTION = {"uq": "uq_%(table_name)s_%(column_0_name)s"}
+
+LATEST_LIVE = sa.and_(
+    sa.column("is_latest", sa.Boolean).is_(True),
+    sa.column("is_deleted", sa.Boolean).is_(False),
+)
+
+
+def _secret_key_constraints() -> list[str]:
+    inspector = sa.inspect(op.get_bind())
+    return [
+        constraint["name"] or "uq_secrets_secret_key"
+        for constraint in inspector.get_unique_constraints("secrets")
+        if constraint["column_names"] == ["secret_key"]
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    secret_key_constraints = _secret_key_constraints()
+    indexes = {index["name"] for index in sa.inspect(op.get_bind()).get_indexes("secrets")}
+
+    with op.batch_alter_table("secrets", naming_convention=NAMING_CONVENTION) as batch_op:
+        for name in secret_key_constraints:
+            batch_op.drop_constraint(name, type_="unique")
+        if "ix_secrets_application_id_secret_key" in indexes:
+            batch_op.drop_index("ix_secrets_application_id_secret_key")
+        batch_op.add_column(
+            sa.Column("is_latest", sa.Boolean(), nullable=False, server_default=sa.true())
+        )
+        batch_op.create_unique_constraint(
+            "uq_secrets_application_id_secret_key_version",
+            ["application_id", "secret_key", "version"],
+        )
+
+    op.create_index(
+        "ix_secrets_latest_live",
+        "secrets",
+        ["application_id", "secret_key"],
+        unique=True,
+        postgresql_where=LATEST_LIVE,
+        sqlite_where=LATEST_LIVE,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_secrets_latest_live", table_name="secrets")
+    # Глобально уникальный secret_key допускает только одну строку на ключ. Откат невозможен,
+    # пока один ключ используется несколькими приложениями
+    op.execute(sa.text("DELETE FROM secrets WHERE is_latest IS NOT TRUE"))
+
+    with op.batch_alter_table("secrets", naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.drop_constraint("uq_secrets_application_id_secret_key_version", type_="unique")
+        batch_op.drop_column("is_latest")
+        batch_op.create_unique_constraint("uq_secrets_secret_key", ["secret_key"])
+        batch_op.create_index(
+            "ix_secrets_application_id_secret_key", ["application_id", "secret_key"]
+        )
@@ -0,0 +1,36 @@
+"""Blob manifests marked in the secrets table
+
+``is_blob`` marks versions whose value is a blob manifest, so reads tell blobs from
+secret values without looking at the decrypted value.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 00:00:00
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: str | Sequence[str] | None = "0008"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("secrets") as batch_op:
+        batch_op.add_column(
+            sa.Column("is_blob", sa.Boolean(), nullable=False, server_default=sa.false())
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("secrets") as batch_op:
+        batch_op.drop_column("is_blob")
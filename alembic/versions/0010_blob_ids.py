@@ -0,0 +1,35 @@
+"""Blob IDs of manifests in the secrets table
+
+``blob_id`` names the chunks a manifest version refers to, so the storage deletes the
+chunks of superseded, deleted and expired manifests without decrypting them. Manifests
+stored before have no ``blob_id``; their chunks are deleted only by ``delete_blob``.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17 00:00:00
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: str | Sequence[str] | None = "0009"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("secrets") as batch_op:
+        batch_op.add_column(sa.Column("blob_id", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("secrets") as batch_op:
+        batch_op.drop_column("blob_id")
@@ -1,8 +1,12 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 
-from api.routes import auth, resources, secrets
+from api.routes import auth, diagnostics, resources, secrets, signing, transit
 from api.swagger_config import custom_openapi
 from auth.db import db, startup_db_client
+from core.config import Config
+from core.executor.crypto_executor import CryptoExecutorBusyError, crypto_executor
+from core.key_access.key_pool import key_pool
 
 #, groups, applications, secrets
 
@@ -12,11 +16,31 @@ app = FastAPI()
 @app.on_event("startup")
 async def on_startup():
     await startup_db_client()
+    await secrets.secret_manager_module.secret_storage.create_indexes()
+    # Заранее генерируются ключи только тех алгоритмов, которые используют приложения
+    key_pool.start(await db.applications.distinct("algorithm"))
+    secrets.secret_manager_module.expiry_reaper.start()
 
 @app.on_event("shutdown")
 async def on_shutdown():
     client = db.client
     client.close()
+    crypto_executor.shutdown()
+    key_pool.shutdown()
+    secrets.secret_manager_module.secret_watcher.shutdown()
+    secrets.secret_manager_module.expiry_reaper.shutdown()
+
+
+# Переполненная очередь шифрования — временная перегрузка, клиент повторяет запрос позже
+@app.exception_handler(CryptoExecutorBusyError)
+async def crypto_executor_busy_handler(request: Request, exc: CryptoExecutorBusyError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Service is busy, retry later."},
+        headers={"Retry-After": str(Config.CRYPTO_EXECUTOR_RETRY_AFTER)},
+    )
+
+
 # Применение кастомной OpenAPI схемы
 app.openapi = lambda: custom_openapi(app)
 
@@ -24,4 +48,7 @@ app.openapi = lambda: custom_openapi(app)
 app.include_router(auth.router, prefix="/auth", tags=["Auth"])
 app.include_router(resources.router)
 app.include_router(secrets.router)
+app.include_router(transit.router)
+app.include_router(signing.router)
+app.include_router(diagnostics.router)
 
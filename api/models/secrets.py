@@ -1,10 +1,61 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from core.config import Config
 
 
 class SecretRequest(BaseModel):
     secrets: dict
+    ttl: int | None = Field(None, gt=0, description="Lease of the secrets in seconds")
+
+
+class LeaseRenewRequest(BaseModel):
+    ttl: int = Field(..., gt=0, description="New lease in seconds, counted from now")
 
 
 class SecretQuery(BaseModel):
     app_id: str
     secret_key: str
+
+
+class TransitEncryptRequest(BaseModel):
+    plaintexts: list[str] = Field(
+        ..., max_length=Config.TRANSIT_MAX_BATCH_SIZE, example=["c2VjcmV0LXZhbHVl"]
+    )
+
+
+class TransitDecryptRequest(BaseModel):
+    ciphertexts: list[str] = Field(..., max_length=Config.TRANSIT_MAX_BATCH_SIZE)
+
+
+class TransitEncryptResponse(BaseModel):
+    ciphertexts: list[str]
+
+
+class TransitDecryptResponse(BaseModel):
+    plaintexts: list[str]
+
+
+class SignRequest(BaseModel):
+    inputs: list[str] = Field(
+        ...,
+        max_length=Config.TRANSIT_MAX_BATCH_SIZE,
+        example=["n4bQgYhMfWWaL+qgxVrQFaO/TxsrC4Is0V1sFbDwCgg="],
+    )
+
+
+class SignResponse(BaseModel):
+    signatures: list[str]
+
+
+class VerifyRequest(BaseModel):
+    inputs: list[str] = Field(..., max_length=Config.TRANSIT_MAX_BATCH_SIZE)
+    signatures: list[str] = Field(..., max_length=Config.TRANSIT_MAX_BATCH_SIZE)
+
+
+class VerifyResponse(BaseModel):
+    valid: list[bool]
+
+
+class PublicKeyResponse(BaseModel):
+    algorithm: str
+    public_key: str
@@ -0,0 +1,52 @@
+import json
+import re
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+_JSON_ESCAPE_RE = re.compile(rb'["\\\x00-\x1f]')
+_JSON_ESCAPES = {bytes([char]): f"\\u{char:04x}".encode() for char in range(0x20)} | {
+    b'"': b'\\"',
+    b"\\": b"\\\\",
+    b"\n": b"\\n",
+    b"\r": b"\\r",
+    b"\t": b"\\t",
+}
+
+
+def _encode_bytes(value: bytes | bytearray, parts: list[bytes]) -> None:
+    if not value.isascii():
+        parts.append(json.dumps(value.decode(), ensure_ascii=False).encode())
+        return
+    if _JSON_ESCAPE_RE.search(value):
+        value = _JSON_ESCAPE_RE.sub(lambda match: _JSON_ESCAPES[match.group()], value)
+    parts += (b'"', value, b'"')
+
+
+def _encode(content: Any, parts: list[bytes]) -> None:
+    if isinstance(content, bytes | bytearray):
+        _encode_bytes(content, parts)
+    elif isinstance(content, dict):
+        parts.append(b"{")
+        for i, (key, value) in enumerate(content.items()):
+            if i:
+                parts.append(b",")
+            parts += (json.dumps(str(key), ensure_ascii=False).encode(), b":")
+            _encode(value, parts)
+        parts.append(b"}")
+    else:
+        encoded = json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+        parts.append(encoded.encode())
+
+
+class SecretJSONResponse(JSONResponse):
+    """JSON response that accepts decrypted secrets as UTF-8 bytes.
+
+    Bytes values are written into the body directly instead of being decoded to `str`,
+    JSON-encoded and encoded back, so a large secret is copied once: into the body.
+    """
+
+    def render(self, content: Any) -> bytes:
+        parts: list[bytes] = []
+        _encode(content, parts)
+        return b"".join(parts)
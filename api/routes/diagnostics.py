@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends
+
+from api.routes.secrets import secret_manager_module
+from auth.dependencies import get_current_user
+from core.key_access.key_pool import key_pool
+
+router = APIRouter(prefix="/api", tags=["Diagnostics"], dependencies=[Depends(get_current_user)])
+
+
+@router.get("/diagnostics/crypto")
+async def crypto_diagnostics():
+    # Шифр мастер-слоя и результат калибровки при TYPE_ENCRYPT=auto, состояние пула, кешей
+    # подписок на изменения, очистки истёкших секретов и пула соединений БД
+    return {
+        "master_layer": secret_manager_module.secret_engine.master_layer_info(),
+        "key_pool": key_pool.stats(),
+        "app_key_cache": secret_manager_module.app_key_cache_stats(),
+        "secret_cache": secret_manager_module.secret_cache_stats(),
+        "secret_watcher": secret_manager_module.secret_watcher.stats(),
+        "expiry_reaper": secret_manager_module.expiry_reaper.stats(),
+        "secret_db_pool": secret_manager_module.secret_storage.pool_stats(),
+    }
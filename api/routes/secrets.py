@@ -1,17 +1,56 @@
+import asyncio
+import json
+from datetime import datetime
+
 from bson import ObjectId
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 
-from api.models.secrets import SecretRequest
+from api.models.secrets import LeaseRenewRequest, SecretRequest
+from api.responses import SecretJSONResponse
 from auth.db import db
 from auth.dependencies import get_current_user
 from auth.models import User
+from core.config import Config
+from core.db_conn.storage_backend import StorageUnavailableError
 from core.master.master_module import SecretManagerModule
+from core.master.secret_watcher import RESYNC_EVENT
 
 router = APIRouter(prefix="/api", tags=["Secrets"], dependencies=[Depends(get_current_user)])
 
 secret_manager_module = SecretManagerModule()
 
 
+async def get_authorized_application(application_id: str, current_user: User) -> dict:
+    try:
+        obj_application_id = ObjectId(application_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid application ID format.")
+
+    application = await db.applications.find_one({"_id": obj_application_id})
+    if not application:
+        raise HTTPException(status_code=404, detail="Application not found.")
+    application_groups = application.get("group_ids", [])
+    if (
+        not set(application_groups).intersection(current_user.group_ids)
+        and application.get("group_id") not in current_user.group_ids
+    ):
+        raise HTTPException(status_code=403, detail="Access from group is not permitted.")
+    return application
+
+
+def check_encryption_key(application: dict) -> None:
+    # Ключи подписи (ed25519, ecdsa-*) не шифруют данные, для них есть api.routes.signing
+    if secret_manager_module.signing_engine.supports(application.get("algorithm")):
+        raise HTTPException(status_code=400, detail="Application uses a signing key.")
+
+
+async def get_encryption_application(application_id: str, current_user: User) -> dict:
+    application = await get_authorized_application(application_id, current_user)
+    check_encryption_key(application)
+    return application
+
+
 @router.post("/applications/{application_id}/secrets")
 async def store_secrets(
     application_id: str,
@@ -30,20 +69,47 @@ async def store_secrets(
         and application.get("group_id") not in current_user.group_ids
     ):
         raise HTTPException(status_code=403, detail="Access from group is not permitted.")
+    check_encryption_key(application)
     print(application.get("algorithm"))
     print(type(application.get("algorithm")))
-    await secret_manager_module.process_request(
-        str(application.get("_id")), secrets.secrets, application.get("algorithm")
-    )
+    try:
+        result = await secret_manager_module.process_request(
+            str(application.get("_id")),
+            secrets.secrets,
+            application.get("algorithm"),
+            ttl=secrets.ttl,
+        )
+    except StorageUnavailableError:
+        # Хранилище недоступно или отклонило запись: ни один секрет не сохранён
+        raise HTTPException(status_code=503, detail="Failed to store secrets.")
+    if "error" in result:
+        raise HTTPException(status_code=409, detail=result["error"])
 
     return {"status": "success"}
 
 
+@router.get("/applications/{application_id}/secrets")
+async def retrieve_secrets(
+    application_id: str,
+    keys: list[str] | None = Query(None, max_length=Config.SECRETS_BULK_MAX_KEYS),
+    current_user: User = Depends(get_current_user),
+):
+    application = await get_encryption_application(application_id, current_user)
+
+    # Все ключи читаются одним запросом к хранилищу и расшифровываются одним пакетом
+    result = await secret_manager_module.retrieve_secrets(
+        str(application.get("_id")), keys, application.get("algorithm"), decode=False
+    )
+
+    return SecretJSONResponse({"status": "success", **result})
+
+
 @router.get("/applications/{application_id}/secrets/{secret_key}")
 async def retrieve_secret(
     application_id: str,
     secret_key: str,
     # secrets_keys: SecretQuery,
+    as_of: datetime | None = None,
     current_user: User = Depends(get_current_user),
 ):
     try:
@@ -58,12 +124,133 @@ async def retrieve_secret(
         and application.get("group_id") not in current_user.group_ids
     ):
         raise HTTPException(status_code=403, detail="Access from group is not permitted.")
+    check_encryption_key(application)
 
+    if as_of is not None:
+        # Значение на момент времени читается в обход кеша
+        secret = await secret_manager_module.retrieve_secret_version(
+            str(application.get("_id")),
+            secret_key,
+            as_of=as_of,
+            algorithm=application.get("algorithm"),
+            decode=False,
+        )
+        return SecretJSONResponse({"status": "success", "secret": secret})
+
+    # Значение передаётся в ответ в виде байтов, без промежуточного декодирования
     secret = await secret_manager_module.process_request(
-        str(application.get("_id")), secret_key, application.get("algorithm")
+        str(application.get("_id")),
+        secret_key,
+        application.get("algorithm"),
+        decode=False,
+        cache=secret_manager_module.secret_cache_allowed(application.get("namespace_id")),
+    )
+
+    return SecretJSONResponse({"status": "success", "secret": secret})
+
+
+@router.get("/applications/{application_id}/secrets/{secret_key}/versions")
+async def list_secret_versions(
+    application_id: str,
+    secret_key: str,
+    before: int | None = Query(None, ge=1),
+    limit: int = Query(50, ge=1, le=1000),
+    current_user: User = Depends(get_current_user),
+):
+    application = await get_authorized_application(application_id, current_user)
+
+    # Страницы выбираются по номеру версии, а не смещением
+    result = await secret_manager_module.list_secret_versions(
+        str(application.get("_id")), secret_key, before, limit
     )
 
-    return {"status": "success", "secret": secret}
+    return {"status": "success", **result}
+
+
+@router.get("/applications/{application_id}/secrets/{secret_key}/versions/{version}")
+async def retrieve_secret_version(
+    application_id: str,
+    secret_key: str,
+    version: int,
+    current_user: User = Depends(get_current_user),
+):
+    application = await get_encryption_application(application_id, current_user)
+
+    secret = await secret_manager_module.retrieve_secret_version(
+        str(application.get("_id")),
+        secret_key,
+        version=version,
+        algorithm=application.get("algorithm"),
+        decode=False,
+    )
+
+    return SecretJSONResponse({"status": "success", "secret": secret})
+
+
+@router.post("/applications/{application_id}/secrets/{secret_key}/renew")
+async def renew_secret(
+    application_id: str,
+    secret_key: str,
+    lease: LeaseRenewRequest,
+    current_user: User = Depends(get_current_user),
+):
+    application = await get_authorized_application(application_id, current_user)
+
+    expires_at = await secret_manager_module.renew_secret(
+        str(application.get("_id")), secret_key, lease.ttl
+    )
+    if expires_at is None:
+        raise HTTPException(status_code=404, detail="Secret not found.")
+
+    return {"status": "success", "expires_at": expires_at}
+
+
+@router.post("/applications/{application_id}/secrets/{secret_key}/revoke")
+async def revoke_secret(
+    application_id: str,
+    secret_key: str,
+    current_user: User = Depends(get_current_user),
+):
+    application = await get_authorized_application(application_id, current_user)
+
+    # Секрет перестаёт читаться сразу, удаляется фоновой очисткой или TTL-индексом
+    if not await secret_manager_module.revoke_secret(str(application.get("_id")), secret_key):
+        raise HTTPException(status_code=404, detail="Secret not found.")
+
+    return {"status": "success"}
+
+
+async def watch_events(request: Request, application_id: str):
+    watcher = secret_manager_module.secret_watcher
+    queue = watcher.subscribe(application_id)
+    try:
+        while not await request.is_disconnected():
+            try:
+                change = await asyncio.wait_for(queue.get(), Config.WATCH_HEARTBEAT_INTERVAL)
+            except TimeoutError:
+                # Комментарий SSE не даёт прокси закрыть простаивающее соединение
+                yield b": keepalive\n\n"
+                continue
+            event = "resync" if change is RESYNC_EVENT else "version"
+            yield f"event: {event}\ndata: {json.dumps(change)}\n\n".encode()
+    finally:
+        watcher.unsubscribe(application_id, queue)
+
+
+@router.get("/applications/{application_id}/watch")
+async def watch_secrets(
+    request: Request,
+    application_id: str,
+    current_user: User = Depends(get_current_user),
+):
+    application = await get_authorized_application(application_id, current_user)
+
+    # Клиент получает только номера новых версий и сам перечитывает изменившиеся секреты
+    return StreamingResponse(
+        watch_events(request, str(application.get("_id"))),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.delete("/applications/{application_id}/secrets/{secret_key}")
@@ -91,3 +278,56 @@ async def delete_secret(
         raise HTTPException(status_code=501, detail="Failed to delete secret.")
 
     return {"status": "success"}
+
+
+@router.put("/applications/{application_id}/blobs/{secret_key}")
+async def store_blob(
+    application_id: str,
+    secret_key: str,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+):
+    application = await get_encryption_application(application_id, current_user)
+
+    # Тело запроса шифруется по мере поступления и не загружается в память целиком
+    result = await secret_manager_module.save_blob(
+        str(application.get("_id")), secret_key, request.stream(), application.get("algorithm")
+    )
+    return result
+
+
+@router.get("/applications/{application_id}/blobs/{secret_key}")
+async def retrieve_blob(
+    application_id: str,
+    secret_key: str,
+    current_user: User = Depends(get_current_user),
+):
+    application = await get_encryption_application(application_id, current_user)
+
+    blob = await secret_manager_module.open_blob(
+        str(application.get("_id")), secret_key, application.get("algorithm")
+    )
+    if blob is None:
+        raise HTTPException(status_code=404, detail="Blob not found.")
+
+    size, chunks = blob
+    return StreamingResponse(
+        chunks, media_type="application/octet-stream", headers={"Content-Length": str(size)}
+    )
+
+
+@router.delete("/applications/{application_id}/blobs/{secret_key}")
+async def delete_blob(
+    application_id: str,
+    secret_key: str,
+    current_user: User = Depends(get_current_user),
+):
+    application = await get_authorized_application(application_id, current_user)
+    try:
+        await secret_manager_module.delete_blob(
+            str(application.get("_id")), secret_key, application.get("algorithm")
+        )
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Blob not found.")
+
+    return {"status": "success"}
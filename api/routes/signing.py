@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Depends, HTTPException
+
+from api.models.secrets import (
+    PublicKeyResponse,
+    SignRequest,
+    SignResponse,
+    VerifyRequest,
+    VerifyResponse,
+)
+from api.routes.secrets import get_authorized_application, secret_manager_module
+from api.routes.transit import decode_base64_items, encode_base64_items
+from auth.dependencies import get_current_user
+from auth.models import User
+
+router = APIRouter(prefix="/api", tags=["Signing"], dependencies=[Depends(get_current_user)])
+
+
+async def get_signing_application(application_id: str, current_user: User) -> dict:
+    application = await get_authorized_application(application_id, current_user)
+    if not secret_manager_module.signing_engine.supports(application.get("algorithm")):
+        raise HTTPException(status_code=400, detail="Application does not use a signing key.")
+    return application
+
+
+# Подпись пакета данных (например, дайджестов артефактов) за один запрос
+@router.post("/applications/{application_id}/sign", response_model=SignResponse)
+async def sign(
+    application_id: str,
+    request: SignRequest,
+    current_user: User = Depends(get_current_user),
+):
+    application = await get_signing_application(application_id, current_user)
+
+    signatures = await secret_manager_module.sign(
+        str(application.get("_id")),
+        decode_base64_items(request.inputs),
+        application.get("algorithm"),
+    )
+    return {"signatures": encode_base64_items(signatures)}
+
+
+@router.post("/applications/{application_id}/verify", response_model=VerifyResponse)
+async def verify(
+    application_id: str,
+    request: VerifyRequest,
+    current_user: User = Depends(get_current_user),
+):
+    application = await get_signing_application(application_id, current_user)
+    if len(request.inputs) != len(request.signatures):
+        raise HTTPException(status_code=400, detail="Number of inputs and signatures must match.")
+
+    valid = await secret_manager_module.verify(
+        str(application.get("_id")),
+        decode_base64_items(request.inputs),
+        decode_base64_items(request.signatures),
+        application.get("algorithm"),
+    )
+    return {"valid": valid}
+
+
+@router.get("/applications/{application_id}/public-key", response_model=PublicKeyResponse)
+async def get_public_key(
+    application_id: str,
+    current_user: User = Depends(get_current_user),
+):
+    application = await get_signing_application(application_id, current_user)
+
+    public_key = await secret_manager_module.get_public_key(
+        str(application.get("_id")), application.get("algorithm")
+    )
+    return {"algorithm": application.get("algorithm"), "public_key": public_key.decode()}
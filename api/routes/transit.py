@@ -0,0 +1,68 @@
+import base64
+import binascii
+
+from cryptography.exceptions import InvalidTag
+from fastapi import APIRouter, Depends, HTTPException
+
+from api.models.secrets import (
+    TransitDecryptRequest,
+    TransitDecryptResponse,
+    TransitEncryptRequest,
+    TransitEncryptResponse,
+)
+from api.routes.secrets import get_encryption_application, secret_manager_module
+from auth.dependencies import get_current_user
+from auth.models import User
+
+router = APIRouter(prefix="/api", tags=["Transit"], dependencies=[Depends(get_current_user)])
+
+
+def decode_base64_items(items: list[str]) -> list[bytes]:
+    try:
+        return [base64.b64decode(item, validate=True) for item in items]
+    except binascii.Error:
+        raise HTTPException(status_code=400, detail="Items must be base64 encoded.")
+
+
+def encode_base64_items(items: list[bytes]) -> list[str]:
+    return [base64.b64encode(item).decode() for item in items]
+
+
+# Данные шифруются ключом приложения и возвращаются вызывающему сервису без сохранения
+@router.post(
+    "/applications/{application_id}/transit/encrypt", response_model=TransitEncryptResponse
+)
+async def transit_encrypt(
+    application_id: str,
+    request: TransitEncryptRequest,
+    current_user: User = Depends(get_current_user),
+):
+    application = await get_encryption_application(application_id, current_user)
+
+    ciphertexts = await secret_manager_module.transit_encrypt(
+        str(application.get("_id")),
+        decode_base64_items(request.plaintexts),
+        application.get("algorithm"),
+    )
+    return {"ciphertexts": encode_base64_items(ciphertexts)}
+
+
+@router.post(
+    "/applications/{application_id}/transit/decrypt", response_model=TransitDecryptResponse
+)
+async def transit_decrypt(
+    application_id: str,
+    request: TransitDecryptRequest,
+    current_user: User = Depends(get_current_user),
+):
+    application = await get_encryption_application(application_id, current_user)
+
+    try:
+        plaintexts = await secret_manager_module.transit_decrypt(
+            str(application.get("_id")),
+            decode_base64_items(request.ciphertexts),
+            application.get("algorithm"),
+        )
+    except (InvalidTag, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid ciphertext.")
+    return {"plaintexts": encode_base64_items(plaintexts)}
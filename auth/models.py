@@ -40,6 +40,10 @@ class AlgorithmEnum(enum.Enum):
     rsa_2048 = "rsa-2048"
     rsa_3072 = "rsa-3072"
     rsa_4096 = "rsa-4096"
+    ed25519 = "ed25519"
+    ecdsa_p256 = "ecdsa-p256"
+    ecdsa_p384 = "ecdsa-p384"
+    ecdsa_p521 = "ecdsa-p521"
 
 class Application(MongoBaseModel):
     name: str
@@ -0,0 +1,75 @@
+"""Latency of light requests while heavy crypto runs in the same event loop.
+
+A "light request" coroutine wakes up every few milliseconds and records how late it was
+scheduled. Meanwhile several coroutines generate rsa-4096 keys and bulk-decrypt 1 MB values
+through `CryptoExecutor` in inline, thread and process modes.
+
+Usage: python -m benchmarks.bench_event_loop_latency [duration_seconds]
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+from os import urandom
+
+from core.executor.crypto_executor import CryptoExecutor
+from core.key_access.key_access_module import RSAKeyGenerationStrategy, _generate_serialized_key
+from core.secret_engines.secret_module import AESEncryptionStrategy, _decrypt_value
+
+INTERVAL = 0.005
+
+
+async def light_requests(stop: asyncio.Event) -> list[float]:
+    delays = []
+    while not stop.is_set():
+        expected = time.perf_counter() + INTERVAL
+        await asyncio.sleep(INTERVAL)
+        delays.append((time.perf_counter() - expected) * 1000)
+    return delays
+
+
+async def heavy_keygen(executor: CryptoExecutor, stop: asyncio.Event) -> None:
+    strategy = RSAKeyGenerationStrategy(4096)
+    while not stop.is_set():
+        await executor.run(_generate_serialized_key, strategy)
+        # Inline runs never suspend, so give the loop a chance to notice the stop event
+        await asyncio.sleep(0)
+
+
+async def heavy_decrypt(executor: CryptoExecutor, stop: asyncio.Event) -> None:
+    strategy = AESEncryptionStrategy()
+    key, master_key = urandom(32), urandom(32)
+    value = strategy.encrypt(master_key, strategy.encrypt(key, urandom(1024 * 1024)))
+    while not stop.is_set():
+        await executor.run(
+            _decrypt_value, strategy, key, value, strategy, master_key, payload_size=len(value)
+        )
+        await asyncio.sleep(0)
+
+
+async def run_mode(mode: str, duration: float) -> tuple[float, float, int]:
+    executor = CryptoExecutor(mode=mode, max_workers=4)
+    stop = asyncio.Event()
+    light = asyncio.create_task(light_requests(stop))
+    heavy = [asyncio.create_task(heavy_keygen(executor, stop)) for _ in range(2)]
+    heavy += [asyncio.create_task(heavy_decrypt(executor, stop)) for _ in range(2)]
+    await asyncio.sleep(duration)
+    stop.set()
+    await asyncio.gather(*heavy)
+    delays = await light
+    executor.shutdown()
+    p50 = statistics.median(delays)
+    p99 = statistics.quantiles(delays, n=100)[98] if len(delays) > 1 else delays[0]
+    return p50, p99, len(delays)
+
+
+async def main(duration: float) -> None:
+    print(f"{'mode':<10}{'p50, ms':>10}{'p99, ms':>10}{'requests':>10}")
+    for mode in ("inline", "thread", "process"):
+        p50, p99, count = await run_mode(mode, duration)
+        print(f"{mode:<10}{p50:>10.2f}{p99:>10.2f}{count:>10}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(float(sys.argv[1]) if len(sys.argv) > 1 else 5.0))
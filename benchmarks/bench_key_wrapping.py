@@ -0,0 +1,51 @@
+"""Per-secret CPU cost of double encryption versus key wrapping (KEK/DEK).
+
+Both modes are measured interleaved, so allocator and cache effects hit them equally.
+
+Usage: python -m benchmarks.bench_key_wrapping [iterations]
+"""
+
+import sys
+import time
+from os import urandom
+
+from core.secret_engines.secret_module import (
+    AESEncryptionStrategy,
+    _decrypt_value,
+    _encrypt_value,
+)
+
+MODES = (("double", False), ("wrap", True))
+
+
+def main(iterations: int = 2000) -> None:
+    strategy = AESEncryptionStrategy()
+    app_key, master_key = urandom(32), urandom(32)
+    print(f"{'payload':>10}{'mode':>10}{'encrypt, us':>14}{'decrypt, us':>14}")
+    for size in (32, 1024, 16 * 1024, 256 * 1024):
+        value = urandom(size)
+        count = max(iterations * 1024 // max(size, 1024), 200)
+        ciphertexts = {
+            mode: _encrypt_value(strategy, app_key, value, strategy, master_key, key_wrapping)
+            for mode, key_wrapping in MODES
+        }
+        encrypt_time = dict.fromkeys(ciphertexts, 0.0)
+        decrypt_time = dict.fromkeys(ciphertexts, 0.0)
+        for _ in range(count):
+            for mode, key_wrapping in MODES:
+                start = time.process_time()
+                _encrypt_value(strategy, app_key, value, strategy, master_key, key_wrapping)
+                encrypt_time[mode] += time.process_time() - start
+
+                start = time.process_time()
+                _decrypt_value(strategy, app_key, ciphertexts[mode], strategy, master_key)
+                decrypt_time[mode] += time.process_time() - start
+
+        for mode, _ in MODES:
+            encrypt_us = encrypt_time[mode] / count * 1e6
+            decrypt_us = decrypt_time[mode] / count * 1e6
+            print(f"{size:>10}{mode:>10}{encrypt_us:>14.1f}{decrypt_us:>14.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
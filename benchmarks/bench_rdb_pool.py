@@ -0,0 +1,112 @@
+"""Connection pool saturation of `RDBStorageBackend` under concurrent secret reads.
+
+Concurrent clients read secrets through the backend session, each holding its connection for
+a few milliseconds to stand in for a slower query. The run is repeated for several pool sizes
+and reports throughput, latency, the average numbers of connections in use and of callers
+waiting for a connection, and the checkouts that timed out (``secret_db_pool_timeout``).
+
+Without an argument a temporary SQLite database stands in for PostgreSQL.
+
+Usage: python -m benchmarks.bench_rdb_pool [database_uri] [duration_seconds]
+"""
+
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy.future import select
+
+from core.db_conn.config import config
+from core.db_conn.rdb_models import Secret
+from core.db_conn.storage_backend import RDBStorageBackend
+
+CLIENTS = 50
+HOLD = 0.005
+POOL_SIZES = (1, 5, 20, 50)
+POOL_TIMEOUT = 0.25
+
+
+async def client(backend: RDBStorageBackend, stop: asyncio.Event, latencies: list[float]) -> int:
+    errors = 0
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            async with backend.session() as session:
+                await session.execute(select(Secret.secret_value).filter(Secret.secret_key == "k"))  # noqa: S105
+                await asyncio.sleep(HOLD)
+        except Exception:
+            errors += 1
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+    return errors
+
+
+async def sample(backend: RDBStorageBackend, stop: asyncio.Event) -> tuple[float, float]:
+    waiting, checked_out = [], []
+    while not stop.is_set():
+        stats = backend.pool_stats()
+        waiting.append(stats["waiting"])
+        checked_out.append(stats["checked_out"])
+        await asyncio.sleep(0.001)
+    return statistics.mean(waiting), statistics.mean(checked_out)
+
+
+async def run(uri: str, pool_size: int, duration: float) -> dict:
+    config.secret_db_uri = uri
+    config.secret_db_pool_size = pool_size
+    config.secret_db_max_overflow = 0
+    config.secret_db_pool_timeout = POOL_TIMEOUT
+    backend = RDBStorageBackend()
+    await backend.create_tables()
+    if not await backend.read_data("bench", "k"):
+        await backend.put_data("bench", "k", b"value")
+
+    stop = asyncio.Event()
+    latencies: list[float] = []
+    sampler = asyncio.create_task(sample(backend, stop))
+    clients = [asyncio.create_task(client(backend, stop, latencies)) for _ in range(CLIENTS)]
+    await asyncio.sleep(duration)
+    stop.set()
+    errors = sum(await asyncio.gather(*clients))
+    waiting, checked_out = await sampler
+    timeouts = backend.pool_stats()["timeouts"]
+    await backend.engine.dispose()
+    return {
+        "rps": len(latencies) / duration,
+        "p50": statistics.median(latencies),
+        "p99": statistics.quantiles(latencies, n=100)[98],
+        "checked_out": checked_out,
+        "waiting": waiting,
+        "timeouts": timeouts,
+        "errors": errors,
+    }
+
+
+async def main(uri: str, duration: float) -> None:
+    print(
+        f"{CLIENTS} clients, connection held {HOLD * 1000:.0f} ms, pool timeout {POOL_TIMEOUT} s"
+    )
+    print(
+        f"{'pool':>6}{'req/s':>10}{'p50, ms':>10}{'p99, ms':>10}"
+        f"{'in use':>8}{'waiting':>9}{'timeouts':>10}"
+    )
+    for pool_size in POOL_SIZES:
+        result = await run(uri, pool_size, duration)
+        print(
+            f"{pool_size:>6}{result['rps']:>10.0f}{result['p50']:>10.1f}{result['p99']:>10.1f}"
+            f"{result['checked_out']:>8.1f}{result['waiting']:>9.1f}{result['timeouts']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and "://" in sys.argv[1]:
+        database_uri, arguments = sys.argv[1], sys.argv[2:]
+    else:
+        directory = tempfile.mkdtemp()
+        database_uri = f"sqlite+aiosqlite:///{Path(directory) / 'bench.db'}"
+        arguments = sys.argv[1:]
+    config.secret_db_echo = False
+    asyncio.run(main(database_uri, float(arguments[0]) if arguments else 3.0))
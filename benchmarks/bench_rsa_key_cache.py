@@ -0,0 +1,43 @@
+"""Per-operation latency of RSAEncryptionStrategy with and without the parsed key cache.
+
+Usage: python -m benchmarks.bench_rsa_key_cache [iterations]
+"""
+
+import sys
+import time
+
+from core.cache import LRUCache
+from core.key_access.key_access_module import RSAKeyGenerationStrategy
+from core.secret_engines.secret_module import RSAEncryptionStrategy
+
+
+def measure(strategy: RSAEncryptionStrategy, key: bytes, iterations: int) -> tuple[float, float]:
+    plaintext = b"x" * 128
+    ciphertext = strategy.encrypt(key, plaintext)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        strategy.encrypt(key, plaintext)
+    encrypt_us = (time.perf_counter() - start) / iterations * 1e6
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        strategy.decrypt(key, ciphertext)
+    decrypt_us = (time.perf_counter() - start) / iterations * 1e6
+    return encrypt_us, decrypt_us
+
+
+def main(iterations: int = 50) -> None:
+    strategy = RSAEncryptionStrategy(hybrid=False)
+    print(f"{'key':<10}{'mode':<10}{'encrypt, us':>14}{'decrypt, us':>14}")
+    for key_size in (2048, 3072, 4096):
+        generator = RSAKeyGenerationStrategy(key_size)
+        key = generator.serialize_key(generator.generate_key())
+        for mode, cache_size in (("no cache", 0), ("cache", 128)):
+            RSAEncryptionStrategy._key_cache = LRUCache(cache_size)
+            encrypt_us, decrypt_us = measure(strategy, key, iterations)
+            print(f"rsa-{key_size:<6}{mode:<10}{encrypt_us:>14.1f}{decrypt_us:>14.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
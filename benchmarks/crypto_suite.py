@@ -0,0 +1,170 @@
+"""Micro-benchmark suite for every algorithm registered in the engine and key access module.
+
+Covers:
+- keygen for every `KeyAccessModule._strategies` entry;
+- encrypt/decrypt for every `SecretEngineModule._encryption_strategies` entry with payloads
+  from 32 B to 1 MB, for the application layer alone (``app``), with the master-key second
+  layer (``double``) and in key wrapping mode (``wrap``). For RSA, ``decrypt`` is measured
+  with a warm data key cache (repeated reads) and ``decrypt_cold`` with an empty one.
+
+Each case runs for at least ``--min-time`` seconds and reports ops/sec, p50/p99 latency and
+bytes/sec. Results are printed as JSON so that runs from different releases can be diffed.
+
+Usage: python -m benchmarks.crypto_suite [--min-time 0.2] [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+
+import cryptography
+
+from core.config import Config
+from core.key_access.key_access_module import KeyAccessModule, _generate_serialized_key
+from core.secret_engines.secret_module import (
+    MasterKeyring,
+    RSAEncryptionStrategy,
+    SecretEngineModule,
+    _decrypt_value,
+    _encrypt_value,
+)
+
+PAYLOAD_SIZES = [32, 256, 1024, 4 * 1024, 16 * 1024, 64 * 1024, 256 * 1024, 1024 * 1024]
+LAYERS = ("app", "double", "wrap")
+
+
+def measure(func: Callable[[], object], min_time: float, max_iterations: int) -> dict:
+    """Runs `func` repeatedly and returns latency statistics in microseconds."""
+    func()
+    samples = []
+    deadline = time.perf_counter() + min_time
+    while len(samples) < max_iterations and (len(samples) < 5 or time.perf_counter() < deadline):
+        start = time.perf_counter_ns()
+        func()
+        samples.append((time.perf_counter_ns() - start) / 1000)
+
+    total_seconds = sum(samples) / 1e6
+    return {
+        "iterations": len(samples),
+        "ops_per_sec": len(samples) / total_seconds,
+        "p50_us": statistics.median(samples),
+        "p99_us": statistics.quantiles(samples, n=100)[98] if len(samples) > 1 else samples[0],
+    }
+
+
+def bench_keygen(min_time: float, max_iterations: int) -> list[dict]:
+    results = []
+    for algorithm, strategy in KeyAccessModule._strategies.items():
+        stats = measure(lambda s=strategy: _generate_serialized_key(s), min_time, max_iterations)
+        results.append({"operation": "keygen", "algorithm": algorithm, **stats})
+    return results
+
+
+def bench_encryption(
+    sizes: list[int], algorithms: list[str] | None, min_time: float, max_iterations: int
+) -> list[dict]:
+    engine = SecretEngineModule()
+    master_strategy = engine._create_master_strategy(Config.TYPE_ENCRYPT)
+    master_key = MasterKeyring.from_config()
+
+    results = []
+    for algorithm, strategy in engine._encryption_strategies.items():
+        if algorithms and algorithm not in algorithms:
+            continue
+        key = _generate_serialized_key(KeyAccessModule._strategies[algorithm])
+        for size in sizes:
+            payload = os.urandom(size)
+            for layer in LAYERS:
+                if layer == "app":
+
+                    def encrypt(s=strategy, p=payload):
+                        return s.encrypt(key, p)
+
+                    def decrypt(k, value, s=strategy):
+                        return s.decrypt(k, value)
+
+                else:
+                    key_wrapping = layer == "wrap"
+
+                    def encrypt(s=strategy, p=payload, kw=key_wrapping):
+                        return _encrypt_value(s, key, p, master_strategy, master_key, kw)
+
+                    def decrypt(k, value, s=strategy):
+                        return _decrypt_value(s, k, value, master_strategy, master_key)
+
+                case = {"algorithm": algorithm, "layer": layer, "payload_bytes": size}
+                try:
+                    ciphertext = encrypt()
+                except ValueError as e:
+                    results.append({"operation": "encrypt", **case, "error": str(e)})
+                    continue
+
+                operations = [
+                    ("encrypt", encrypt),
+                    ("decrypt", lambda d=decrypt, c=ciphertext: d(key, c)),
+                ]
+                if isinstance(strategy, RSAEncryptionStrategy):
+
+                    def decrypt_cold(d=decrypt, c=ciphertext):
+                        RSAEncryptionStrategy._data_key_cache.clear()
+                        return d(key, c)
+
+                    operations.append(("decrypt_cold", decrypt_cold))
+
+                for operation, func in operations:
+                    stats = measure(func, min_time, max_iterations)
+                    stats["bytes_per_sec"] = stats["ops_per_sec"] * size
+                    results.append({"operation": operation, **case, **stats})
+    return results
+
+
+def main(argv: list[str] | None = None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per case")
+    parser.add_argument("--max-iterations", type=int, default=100_000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=PAYLOAD_SIZES)
+    parser.add_argument("--algorithms", nargs="+", help="limit to these algorithms")
+    parser.add_argument("--skip-keygen", action="store_true")
+    parser.add_argument("--output", help="write JSON to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    # The suite only needs some master key; use the configured one if it is set
+    if not (Config.MASTER_KEY or Config.MASTER_KEYS):
+        Config.MASTER_KEY = os.urandom(32).hex()
+    Config.TYPE_ENCRYPT = Config.TYPE_ENCRYPT or "aes256-gcm96"
+
+    results = []
+    if not args.skip_keygen:
+        results += bench_keygen(args.min_time, args.max_iterations)
+    results += bench_encryption(args.sizes, args.algorithms, args.min_time, args.max_iterations)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(UTC).isoformat(),
+            "python": platform.python_version(),
+            "cryptography": cryptography.__version__,
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "master_layer": SecretEngineModule().master_layer_info(),
+            "min_time": args.min_time,
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+    else:
+        sys.stdout.write(output + "\n")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from threading import Lock
+from typing import Any
+
+
+class LRUCache:
+    """Thread-safe bounded cache with least-recently-used eviction and optional expiry."""
+
+    def __init__(self, max_size: int, ttl: float | None = None):
+        """
+        Parameters
+        ----------
+        max_size : int
+            Maximum number of entries kept in the cache. A value of 0 disables caching.
+        ttl : float, optional
+            Lifetime of an entry in seconds (default is None, entries never expire).
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._data: OrderedDict[Hashable, tuple[Any, float | None]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Any | None:
+        """Return the cached value for `key` and mark it as recently used.
+
+        Parameters
+        ----------
+        key : Hashable
+            The cache key.
+
+        Returns
+        -------
+        Any | None
+            The cached value, or None if the key is not cached.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store `value` under `key`, evicting the least recently used entries if needed.
+
+        Parameters
+        ----------
+        key : Hashable
+            The cache key.
+        value : Any
+            The value to cache.
+        """
+        if self.max_size <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Remove `key` from the cache if it is present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def invalidate_matching(self, predicate: Callable[[Hashable], bool]) -> None:
+        """Remove every entry whose key satisfies `predicate`."""
+        with self._lock:
+            for key in [key for key in self._data if predicate(key)]:
+                del self._data[key]
+
+    def clear(self) -> None:
+        """Remove all entries from the cache."""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Return cache counters.
+
+        Returns
+        -------
+        dict[str, int]
+            Current size, capacity, hits, misses, evictions and expirations.
+        """
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
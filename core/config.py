@@ -9,4 +9,40 @@ class Config:
     MONGO_URI = os.getenv("MONGO_URI")
     TYPE_DB_SECRET = os.getenv("TYPE_DB_SECRET")
     TYPE_ENCRYPT = os.getenv("TYPE_ENCRYPT")
+    TYPE_ENCRYPT_FALLBACK = os.getenv("TYPE_ENCRYPT_FALLBACK", "aes256-gcm96")
+    MASTER_CIPHER = os.getenv("MASTER_CIPHER")
     MASTER_KEY = os.getenv("MASTER_KEY")
+    MASTER_KEYS = os.getenv("MASTER_KEYS")
+    MASTER_KEY_VERSION = os.getenv("MASTER_KEY_VERSION")
+    RSA_KEY_CACHE_SIZE = int(os.getenv("RSA_KEY_CACHE_SIZE", "128"))
+    RSA_HYBRID_MODE = os.getenv("RSA_HYBRID_MODE", "true").lower() == "true"
+    RSA_DATA_KEY_CACHE_SIZE = int(os.getenv("RSA_DATA_KEY_CACHE_SIZE", "1024"))
+    APP_KEY_CACHE_SIZE = int(os.getenv("APP_KEY_CACHE_SIZE", "1024"))
+    APP_KEY_CACHE_TTL = float(os.getenv("APP_KEY_CACHE_TTL", "60"))
+    SECRET_CACHE_SIZE = int(os.getenv("SECRET_CACHE_SIZE", "0"))
+    SECRET_CACHE_TTL = float(os.getenv("SECRET_CACHE_TTL", "5"))
+    SECRET_CACHE_EXCLUDED_NAMESPACES = os.getenv("SECRET_CACHE_EXCLUDED_NAMESPACES", "")
+    KEY_POOL_ALGORITHMS = os.getenv("KEY_POOL_ALGORITHMS", "")
+    KEY_POOL_LOW_WATERMARK = int(os.getenv("KEY_POOL_LOW_WATERMARK", "2"))
+    KEY_POOL_HIGH_WATERMARK = int(os.getenv("KEY_POOL_HIGH_WATERMARK", "8"))
+    KEY_POOL_WORKERS = int(os.getenv("KEY_POOL_WORKERS", "1"))
+    WATCH_POLL_INTERVAL = float(os.getenv("WATCH_POLL_INTERVAL", "1"))
+    WATCH_HEARTBEAT_INTERVAL = float(os.getenv("WATCH_HEARTBEAT_INTERVAL", "15"))
+    WATCH_QUEUE_SIZE = int(os.getenv("WATCH_QUEUE_SIZE", "1000"))
+    LEASE_REAPER_INTERVAL = float(os.getenv("LEASE_REAPER_INTERVAL", "30"))
+    LEASE_REAPER_BATCH_SIZE = int(os.getenv("LEASE_REAPER_BATCH_SIZE", "500"))
+    LEASE_REAPER_BATCH_PAUSE = float(os.getenv("LEASE_REAPER_BATCH_PAUSE", "0.1"))
+    CRYPTO_EXECUTOR_MODE = os.getenv("CRYPTO_EXECUTOR_MODE", "thread")
+    CRYPTO_EXECUTOR_WORKERS = int(os.getenv("CRYPTO_EXECUTOR_WORKERS", str(os.cpu_count() or 1)))
+    CRYPTO_EXECUTOR_MAX_QUEUE = int(os.getenv("CRYPTO_EXECUTOR_MAX_QUEUE", "1024"))
+    CRYPTO_EXECUTOR_RETRY_AFTER = int(os.getenv("CRYPTO_EXECUTOR_RETRY_AFTER", "1"))
+    CRYPTO_INLINE_THRESHOLD = int(os.getenv("CRYPTO_INLINE_THRESHOLD", "4096"))
+    CRYPTO_BATCH_CHUNK_SIZE = int(os.getenv("CRYPTO_BATCH_CHUNK_SIZE", "64"))
+    KEY_WRAPPING_MODE = os.getenv("KEY_WRAPPING_MODE", "double")
+    BLOB_CHUNK_SIZE = int(os.getenv("BLOB_CHUNK_SIZE", str(64 * 1024)))
+    SIGNING_KEY_CACHE_SIZE = int(os.getenv("SIGNING_KEY_CACHE_SIZE", "128"))
+    MASTER_REWRAP_BATCH_SIZE = int(os.getenv("MASTER_REWRAP_BATCH_SIZE", "500"))
+    MASTER_REWRAP_CONCURRENCY = int(os.getenv("MASTER_REWRAP_CONCURRENCY", "2"))
+    MASTER_REWRAP_MAX_RATE = float(os.getenv("MASTER_REWRAP_MAX_RATE", "2000"))
+    SECRETS_BULK_MAX_KEYS = int(os.getenv("SECRETS_BULK_MAX_KEYS", "1000"))
+    TRANSIT_MAX_BATCH_SIZE = int(os.getenv("TRANSIT_MAX_BATCH_SIZE", "10000"))
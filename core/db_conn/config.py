@@ -12,6 +12,14 @@ class Config(BaseSettings):
     secret_db_host: str = "None"
     secret_db_port: int
     secret_db_name: str
+    # Пул соединений реляционной БД
+    secret_db_pool_size: int = 10
+    secret_db_max_overflow: int = 10
+    secret_db_pool_timeout: float = 30
+    secret_db_pool_pre_ping: bool = True
+    secret_db_pool_recycle: int = 1800
+    secret_db_statement_cache_size: int = 100
+    secret_db_echo: bool = False
 
     class Config:
         env_file = ".env"
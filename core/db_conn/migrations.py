@@ -0,0 +1,65 @@
+from pathlib import Path
+
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config as AlembicConfig
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+from alembic import command
+from core.db_conn.rdb_models import Base
+
+ALEMBIC_DIR = Path(__file__).resolve().parents[2] / "alembic"
+
+# Ревизии схем, которые создавал create_all до появления миграций
+BASELINE_REVISION = "0001"
+VERSIONED_REVISION = "0007"
+HEAD_REVISION = "head"
+
+# Ключ advisory-блокировки PostgreSQL: экземпляры сервиса применяют миграции по очереди
+MIGRATION_LOCK_ID = 0x564D544D
+
+
+def alembic_config(connection: Connection | None = None) -> AlembicConfig:
+    """Returns the Alembic configuration of the secret storage schema.
+
+    Parameters
+    ----------
+    connection : Connection, optional
+        A connection the migrations run on (default is None, which lets ``alembic/env.py``
+        connect to ``SECRET_DB_URI``).
+    """
+    config = AlembicConfig()
+    config.set_main_option("script_location", str(ALEMBIC_DIR))
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def upgrade_schema(connection: Connection) -> None:
+    """Brings the secret storage schema to the latest revision.
+
+    Databases created by ``create_all`` have no ``alembic_version`` table; they are stamped
+    with the revision their schema matches and upgraded from there.
+
+    Parameters
+    ----------
+    connection : Connection
+        A connection inside a transaction; the migrations are committed with it.
+    """
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+
+    config = alembic_config(connection)
+    inspector = inspect(connection)
+    tables = inspector.get_table_names()
+    if "secrets" in tables and "alembic_version" not in tables:
+        columns = {column["name"] for column in inspector.get_columns("secrets")}
+        if not compare_metadata(MigrationContext.configure(connection), Base.metadata):
+            revision = HEAD_REVISION
+        elif "is_latest" in columns:
+            revision = VERSIONED_REVISION
+        else:
+            revision = BASELINE_REVISION
+        command.stamp(config, revision)
+    command.upgrade(config, HEAD_REVISION)
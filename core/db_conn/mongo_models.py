@@ -7,12 +7,15 @@ class SecretVersion(BaseModel):
     application_id: str
     secret_key: str
     secret_value: bytes
+    is_blob: bool = False
+    blob_id: str | None = None
     is_deleted: bool = False
     is_destoyed: bool = False
     version: int = 1
     created_at: datetime = datetime.now(UTC)
     updated_at: datetime = datetime.now(UTC)
     deleted_at: datetime = datetime.now(UTC) + timedelta(days=10 * 365.25)
+    expires_at: datetime | None = None
 
 
 # class SecretMongo(BaseModel):
@@ -26,3 +29,11 @@ class AppsKeyMongo(BaseModel):
     version: int = 1
     created_at: datetime = datetime.now(UTC)
     updated_at: datetime = datetime.now(UTC)
+
+
+class SecretChunkMongo(BaseModel):
+    application_id: str
+    blob_id: str
+    chunk_index: int
+    data: bytes
+    expires_at: datetime | None = None
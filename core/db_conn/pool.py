@@ -0,0 +1,82 @@
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from core.db_conn.config import Config
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool that counts callers waiting for a connection and checkout timeouts."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.waiting = 0
+        self.timeouts = 0
+
+    def _do_get(self):
+        # Ждёт только вызывающий, которому не досталось ни свободного соединения, ни overflow
+        blocked = self._pool.empty() and -1 < self._max_overflow <= self._overflow
+        if blocked:
+            self.waiting += 1
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            if blocked:
+                self.waiting -= 1
+
+    def stats(self) -> dict[str, int]:
+        """Returns pool usage counters.
+
+        Returns
+        -------
+        dict[str, int]
+            The pool size, connections checked out, overflow connections, callers waiting
+            for a connection and checkouts that timed out.
+        """
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "overflow": max(self.overflow(), 0),
+            "waiting": self.waiting,
+            "timeouts": self.timeouts,
+        }
+
+
+def engine_options(uri: str, config: Config) -> dict:
+    """Builds `create_async_engine` keyword arguments from the ``secret_db_*`` settings.
+
+    Parameters
+    ----------
+    uri : str
+        The database URI.
+    config : Config
+        The storage settings.
+
+    Returns
+    -------
+    dict
+        Engine options. In-memory SQLite keeps its single shared connection and gets no pool
+        options.
+    """
+    url = make_url(uri)
+    options = {"echo": config.secret_db_echo}
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return options
+
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=config.secret_db_pool_size,
+        max_overflow=config.secret_db_max_overflow,
+        pool_timeout=config.secret_db_pool_timeout,
+        pool_pre_ping=config.secret_db_pool_pre_ping,
+        pool_recycle=config.secret_db_pool_recycle,
+    )
+    if url.get_driver_name() == "asyncpg":
+        # Подготовленные выражения asyncpg кешируются на каждом соединении
+        options["connect_args"] = {
+            "prepared_statement_cache_size": config.secret_db_statement_cache_size
+        }
+    return options
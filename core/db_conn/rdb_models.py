@@ -1,26 +1,104 @@
 import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, Integer, LargeBinary, String
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    UniqueConstraint,
+    and_,
+    false,
+    true,
+)
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
 
 
 class Secret(Base):
+    """One version of a secret. Every write adds a row; the newest one has ``is_latest``."""
+
     __tablename__ = "secrets"
+    __table_args__ = (
+        UniqueConstraint(
+            "application_id",
+            "secret_key",
+            "version",
+            name="uq_secrets_application_id_secret_key_version",
+        ),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     application_id = Column(String, nullable=False)
-    secret_key = Column(String, nullable=False, unique=True)
+    secret_key = Column(String, nullable=False)
     secret_value = Column(LargeBinary, nullable=False)
+    # Значение — манифест блоба, а не значение секрета
+    is_blob = Column(Boolean, nullable=False, default=False, server_default=false())
+    # Блоб, чанки которого описывает манифест; по нему хранилище удаляет ненужные чанки
+    blob_id = Column(String)
     is_deleted = Column(Boolean, default=False)
     is_destoyed = Column(Boolean, default=False)
     version = Column(Integer, default=1)
+    is_latest = Column(Boolean, nullable=False, default=True, server_default=true())
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     updated_at = Column(
-        DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow
+        DateTime,
+        default=datetime.datetime.utcnow,
+        onupdate=datetime.datetime.utcnow,
+        index=True,
     )
     deleted_at = Column(DateTime)
+    expires_at = Column(DateTime, index=True)
 
     def __repr__(self):
         return f"<Secret(key={self.secret_key}, value={self.secret_value})>"
+
+
+# Последняя живая версия каждого секрета: чтение секрета — один поиск по этому индексу.
+# Условие запросов должно совпадать с условием индекса, иначе СУБД его не выберет
+LATEST_LIVE_SECRET = and_(Secret.is_latest.is_(True), Secret.is_deleted.is_(False))
+
+Index(
+    "ix_secrets_latest_live",
+    Secret.application_id,
+    Secret.secret_key,
+    unique=True,
+    postgresql_where=LATEST_LIVE_SECRET,
+    sqlite_where=LATEST_LIVE_SECRET,
+)
+
+
+class SecretChunk(Base):
+    __tablename__ = "secret_chunks"
+    __table_args__ = (Index("ix_secret_chunks_blob_id_chunk_index", "blob_id", "chunk_index"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    application_id = Column(String, nullable=False)
+    blob_id = Column(String, nullable=False)
+    chunk_index = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+
+
+class AppKey(Base):
+    """The encrypted key of an application; one row per application."""
+
+    __tablename__ = "apps_keys"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    application_id = Column(String, nullable=False, unique=True)
+    app_key = Column(LargeBinary, nullable=False)
+    version = Column(Integer, nullable=False, default=1)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+
+class JobCheckpoint(Base):
+    __tablename__ = "job_checkpoints"
+
+    name = Column(String, primary_key=True)
+    state = Column(Text, nullable=False)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow)
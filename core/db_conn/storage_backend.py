@@ -1,17 +1,49 @@
+import asyncio
+import json
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Callable
 from datetime import UTC, datetime
 
+from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo.errors import PyMongoError
-from sqlalchemy import update
-from sqlalchemy.exc import SQLAlchemyError
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure, PyMongoError
+from sqlalchemy import bindparam, delete, func, insert, or_, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.future import select
 from sqlalchemy.orm import sessionmaker
 
+from core.config import Config
 from core.db_conn.config import config
-from core.db_conn.mongo_models import AppsKeyMongo, SecretVersion
-from core.db_conn.rdb_models import Base, Secret
+from core.db_conn.migrations import upgrade_schema
+from core.db_conn.mongo_models import AppsKeyMongo, SecretChunkMongo, SecretVersion
+from core.db_conn.pool import InstrumentedQueuePool, engine_options
+from core.db_conn.rdb_models import (
+    LATEST_LIVE_SECRET,
+    AppKey,
+    JobCheckpoint,
+    Secret,
+    SecretChunk,
+)
+
+# Код ошибки MongoDB при нарушении уникального индекса
+DUPLICATE_KEY_ERROR = 11000
+# Код ошибки MongoDB, если потоки изменений недоступны на сервере без набора реплик
+CHANGE_STREAM_NOT_SUPPORTED = 40573
+
+
+class StorageUnavailableError(RuntimeError):
+    """Raised when the storage fails to complete a write and nothing was written."""
+
+
+class BlobManifest(bytes):
+    """A stored value that the storage marks as a blob manifest rather than a secret value."""
+
+
+def _stored_value(value: bytes | None, is_blob: bool | None) -> bytes | None:
+    # Манифест блоба отличается от значения секрета отметкой в хранилище, а не содержимым
+    return BlobManifest(value) if value is not None and is_blob else value
 
 
 class AsyncStorageBackend(ABC):
@@ -31,7 +63,29 @@ class AsyncStorageBackend(ABC):
         Returns
         -------
         bytes
-            The data associated with the specified key.
+            The data associated with the specified key; a `BlobManifest` if it was stored as
+            a blob manifest.
+        """
+        pass
+
+    @abstractmethod
+    async def read_many(
+        self, application_id: str, keys: list[str] | None = None
+    ) -> dict[str, bytes]:
+        """Asynchronously read several secrets of an application in one query.
+
+        Parameters
+        ----------
+        application_id : str
+            The ID of the application.
+        keys : list[str], optional
+            The keys to read (default is None, which reads every live secret).
+
+        Returns
+        -------
+        dict[str, bytes]
+            The stored values by key, blob manifests as `BlobManifest`. Keys that are not
+            found are omitted.
         """
         pass
 
@@ -55,6 +109,33 @@ class AsyncStorageBackend(ABC):
         """
         pass
 
+    @abstractmethod
+    async def write_many(
+        self, application_id: str, values: dict[str, bytes], expires_at: datetime | None = None
+    ) -> None:
+        """Asynchronously write several new secrets in one call.
+
+        Either every value is written or none is.
+
+        Parameters
+        ----------
+        application_id : str
+            The ID of the application.
+        values : dict[str, bytes]
+            The values to be written by key.
+        expires_at : datetime, optional
+            The end of the secrets' lease (default is None, which never expires). Expired
+            secrets are not returned by reads and are removed in the background.
+
+        Raises
+        ------
+        ValueError
+            If a secret with one of the keys already exists.
+        StorageUnavailableError
+            If the storage fails to write the secrets.
+        """
+        pass
+
     @abstractmethod
     async def update_data(self, application_id: str, key: str, value: bytes) -> dict[str, str]:
         """Asynchronously update data by key.
@@ -75,10 +156,40 @@ class AsyncStorageBackend(ABC):
         """
         pass
 
+    @abstractmethod
+    async def put_data(
+        self, application_id: str, key: str, value: bytes, blob_id: str | None = None
+    ) -> int:
+        """Asynchronously create a secret or store a new version of it.
+
+        The new version keeps the lease of the previous one. Chunks of the blob referenced
+        by the previous version are deleted once the new version is stored.
+
+        Parameters
+        ----------
+        application_id : str
+            The ID of the application.
+        key : str
+            The key for the data to be stored.
+        value : bytes
+            The data to be stored.
+        blob_id : str, optional
+            The ID of the blob whose manifest `value` is (default is None, a secret value);
+            reads return manifests as `BlobManifest`.
+
+        Returns
+        -------
+        int
+            The version of the stored data.
+        """
+        pass
+
     @abstractmethod
     async def delete_data(self, application_id: str, key: str) -> dict[str, str]:
         """Asynchronously delete data by key.
 
+        Chunks of the blobs referenced by any version of the secret are deleted as well.
+
         Parameters
         ----------
         application_id : str
@@ -93,6 +204,295 @@ class AsyncStorageBackend(ABC):
         """
         pass
 
+    @abstractmethod
+    async def set_expiry(self, application_id: str, key: str, expires_at: datetime | None) -> bool:
+        """Asynchronously set the end of a secret's lease.
+
+        Parameters
+        ----------
+        application_id : str
+            The ID of the application.
+        key : str
+            The key of the secret.
+        expires_at : datetime | None
+            The new end of the lease; a past moment revokes the secret, None removes the
+            lease.
+
+        Returns
+        -------
+        bool
+            Whether a live secret with the key was found.
+        """
+        pass
+
+    @abstractmethod
+    async def reap_expired(self, limit: int) -> int:
+        """Asynchronously remove at most `limit` secrets whose lease has ended.
+
+        Chunks of the blobs referenced by removed versions are removed with them. Backends
+        that expire data natively return 0.
+
+        Parameters
+        ----------
+        limit : int
+            The maximum number of secrets to remove.
+
+        Returns
+        -------
+        int
+            The number of removed secrets.
+        """
+        pass
+
+    @abstractmethod
+    async def list_versions(
+        self, application_id: str, key: str, before_version: int | None, limit: int
+    ) -> list[dict]:
+        """Asynchronously list the versions of a secret, newest first.
+
+        Pages are selected by keyset pagination on the version number, so listing a page
+        costs the same regardless of its position in the history.
+
+        Parameters
+        ----------
+        application_id : str
+            The ID of the application.
+        key : str
+            The key of the secret.
+        before_version : int, optional
+            Only versions lower than this one are returned; None starts from the newest.
+        limit : int
+            The maximum number of versions to return.
+
+        Returns
+        -------
+        list[dict]
+            ``version``, ``created_at`` and ``is_deleted`` of each version.
+        """
+        pass
+
+    @abstractmethod
+    async def read_version(self, application_id: str, key: str, version: int) -> bytes | None:
+        """Asynchronously read a specific version of a secret.
+
+        Parameters
+        ----------
+        application_id : str
+            The ID of the application.
+        key : str
+            The key of the secret.
+        version : int
+            The version to read.
+
+        Returns
+        -------
+        bytes | None
+            The stored value, or None if the version does not exist or is deleted.
+        """
+        pass
+
+    @abstractmethod
+    async def read_as_of(self, application_id: str, key: str, timestamp: datetime) -> bytes | None:
+        """Asynchronously read the version of a secret that was current at a point in time.
+
+        Parameters
+        ----------
+        application_id : str
+            The ID of the application.
+        key : str
+            The key of the secret.
+        timestamp : datetime
+            The point in time.
+
+        Returns
+        -------
+        bytes | None
+            The stored value, or None if the secret did not exist then or that version is
+            deleted.
+        """
+        pass
+
+    @abstractmethod
+    def watch_changes(self, position: object | None = None) -> AsyncIterator[tuple[object, dict]]:
+        """Asynchronously iterate over secret version changes of all applications.
+
+        Only metadata is produced, never secret values. The iteration does not end on its
+        own; it raises on storage errors and can be restarted from the last position.
+
+        Parameters
+        ----------
+        position : object, optional
+            A position produced by a previous iteration to continue after; None starts from
+            changes made after the call.
+
+        Yields
+        ------
+        tuple[object, dict]
+            The position of the change and the change itself: ``application_id``, ``key``,
+            ``version`` and ``deleted``.
+        """
+        pass
+
+    @abstractmethod
+    async def list_secret_keys(self, application_id: str) -> list[str]:
+        """Asynchronously list the keys of all live secrets of an application.
+
+        Parameters
+        ----------
+        application_id : str
+            The ID of the application.
+
+        Returns
+        -------
+        list[str]
+            The keys of secrets that are not deleted.
+        """
+        pass
+
+    @abstractmethod
+    async def write_blob_chunks(
+        self, application_id: str, blob_id: str, chunks: AsyncIterator[bytes]
+    ) -> int:
+        """Asynchronously store the chunks of a blob as separate records.
+
+        Chunks are written as they arrive, so the blob is never held in memory.
+
+        Parameters
+        ----------
+        application_id : str
+            The ID of the application.
+        blob_id : str
+            The ID of the blob.
+        chunks : AsyncIterator[bytes]
+            The encrypted chunks in order.
+
+        Returns
+        -------
+        int
+            The number of stored chunks.
+        """
+        pass
+
+    @abstractmethod
+    def read_blob_chunks(self, application_id: str, blob_id: str) -> AsyncIterator[bytes]:
+        """Asynchronously iterate over the chunks of a blob in order.
+
+        Parameters
+        ----------
+        application_id : str
+            The ID of the application.
+        blob_id : str
+            The ID of the blob.
+
+        Returns
+        -------
+        AsyncIterator[bytes]
+            The encrypted chunks.
+        """
+        pass
+
+    @abstractmethod
+    async def delete_blob_chunks(self, application_id: str, blob_id: str) -> None:
+        """Asynchronously delete all chunks of a blob.
+
+        Parameters
+        ----------
+        application_id : str
+            The ID of the application.
+        blob_id : str
+            The ID of the blob.
+        """
+        pass
+
+    @abstractmethod
+    def iter_stored_values(
+        self, collection: str, after_id: str | None, batch_size: int
+    ) -> AsyncIterator[list[tuple[str, bytes]]]:
+        """Asynchronously iterate over every stored value of a collection in batches.
+
+        Records are ordered by ID, so an interrupted scan can resume after the last ID it
+        has processed.
+
+        Parameters
+        ----------
+        collection : str
+            ``secrets`` (values of all secret versions) or ``apps_keys``.
+        after_id : str, optional
+            Only records with a greater ID are returned; None starts from the beginning.
+        batch_size : int
+            The number of records per batch.
+
+        Returns
+        -------
+        AsyncIterator[list[tuple[str, bytes]]]
+            Batches of record IDs and stored values.
+        """
+        pass
+
+    @abstractmethod
+    async def replace_stored_values(
+        self, collection: str, updates: list[tuple[str, bytes, bytes]]
+    ) -> int:
+        """Asynchronously replace stored values in bulk.
+
+        A record is only updated if it still holds the expected old value, so values
+        written concurrently are never overwritten.
+
+        Parameters
+        ----------
+        collection : str
+            ``secrets`` or ``apps_keys``.
+        updates : list[tuple[str, bytes, bytes]]
+            Record IDs with the expected old value and the new value.
+
+        Returns
+        -------
+        int
+            The number of updated records.
+        """
+        pass
+
+    def pool_stats(self) -> dict[str, int] | None:
+        """Return connection pool usage counters, or None if the backend does not expose them."""
+        return None
+
+    @abstractmethod
+    async def create_indexes(self) -> None:
+        """Asynchronously create the indexes serving the storage queries.
+
+        Existing indexes are left as they are, so the call is safe on every startup.
+        """
+        pass
+
+    @abstractmethod
+    async def read_checkpoint(self, name: str) -> dict | None:
+        """Asynchronously read the saved state of a background job.
+
+        Parameters
+        ----------
+        name : str
+            The name of the checkpoint.
+
+        Returns
+        -------
+        dict | None
+            The saved state, or None if the job has no checkpoint.
+        """
+        pass
+
+    @abstractmethod
+    async def write_checkpoint(self, name: str, state: dict) -> None:
+        """Asynchronously save the state of a background job.
+
+        Parameters
+        ----------
+        name : str
+            The name of the checkpoint.
+        state : dict
+            JSON-serializable job state.
+        """
+        pass
+
     @abstractmethod
     async def _read_key_app(self, application_id: str) -> bytes:
         """Asynchronously read the application key.
@@ -110,8 +510,8 @@ class AsyncStorageBackend(ABC):
         pass
 
     @abstractmethod
-    async def _write_key_app(self, application_id: str, app_key: bytes) -> dict[str, str]:
-        """Asynchronously write the application key.
+    async def _write_key_app(self, application_id: str, app_key: bytes) -> bytes:
+        """Asynchronously write the application key unless the application already has one.
 
         Parameters
         ----------
@@ -122,8 +522,9 @@ class AsyncStorageBackend(ABC):
 
         Returns
         -------
-        dict[str, str]
-            A dictionary containing the status of the write operation.
+        bytes
+            The key stored for the application: `app_key`, or the key written first by a
+            concurrent request.
         """
         pass
 
@@ -163,8 +564,16 @@ class AsyncStorageBackend(ABC):
 
 
 class RDBStorageBackend(AsyncStorageBackend):
+    # Число попыток записи новой версии при конкурентных обновлениях одного секрета
+    _put_attempts = 5
+    # Таблицы и поля с зашифрованными значениями
+    _stored_value_tables = {"secrets": Secret.__table__, "apps_keys": AppKey.__table__}
+    _stored_value_fields = {"secrets": "secret_value", "apps_keys": "app_key"}
+
     def __init__(self):
-        self.engine = create_async_engine(config.secret_db_uri, echo=True)
+        self.engine = create_async_engine(
+            config.secret_db_uri, **engine_options(config.secret_db_uri, config)
+        )
         self.session = sessionmaker(
             bind=self.engine,
             class_=AsyncSession,
@@ -172,21 +581,50 @@ class RDBStorageBackend(AsyncStorageBackend):
         )
 
     async def create_tables(self):
+        # Схема ведётся только миграциями Alembic: create_all не оставлял бы alembic_version
         async with self.engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(upgrade_schema)
+
+    @staticmethod
+    def _unexpired():
+        # Истёкшие секреты не видны до удаления фоновой очисткой
+        now = datetime.now(UTC).replace(tzinfo=None)
+        return or_(Secret.expires_at.is_(None), Secret.expires_at > now)
 
     async def read_data(self, application_id: str, key: str) -> bytes:
         async with self.session() as session:
             try:
+                # Один поиск по частичному индексу последних живых версий
                 result = await session.execute(
-                    select(Secret).filter(
-                        Secret.secret_key == key,
-                        Secret.is_deleted.is_(False),
+                    select(Secret.secret_value, Secret.is_blob).filter(
                         Secret.application_id == application_id,
+                        Secret.secret_key == key,
+                        LATEST_LIVE_SECRET,
+                        self._unexpired(),
                     )
                 )
-                secret = result.scalars().first()
-                return secret.secret_value if secret else None
+                secret = result.one_or_none()
+                return _stored_value(*secret) if secret else None
+            except SQLAlchemyError as e:
+                raise RuntimeError(f"Ошибка чтения данных: {e}")
+
+    async def read_many(
+        self, application_id: str, keys: list[str] | None = None
+    ) -> dict[str, bytes]:
+        async with self.session() as session:
+            try:
+                stmt = select(Secret.secret_key, Secret.secret_value, Secret.is_blob).filter(
+                    Secret.application_id == application_id,
+                    LATEST_LIVE_SECRET,
+                    self._unexpired(),
+                )
+                if keys is not None:
+                    stmt = stmt.filter(Secret.secret_key.in_(keys))
+                result = await session.execute(stmt)
+                return {
+                    secret_key: _stored_value(secret_value, is_blob)
+                    for secret_key, secret_value, is_blob in result
+                }
             except SQLAlchemyError as e:
                 raise RuntimeError(f"Ошибка чтения данных: {e}")
 
@@ -198,23 +636,141 @@ class RDBStorageBackend(AsyncStorageBackend):
                 )
                 session.add(new_secret)
                 await session.commit()
+            except IntegrityError:
+                # Версия 1 есть у любого существующего секрета приложения
+                raise ValueError(f"Секрет с ключом '{key}' уже существует.")
             except SQLAlchemyError as e:
                 raise RuntimeError(f"Ошибка записи данных: {e}")
 
+    async def write_many(
+        self, application_id: str, values: dict[str, bytes], expires_at: datetime | None = None
+    ) -> None:
+        if not values:
+            return
+        if expires_at is not None:
+            expires_at = expires_at.astimezone(UTC).replace(tzinfo=None)
+        async with self.session() as session:
+            try:
+                # Одна многострочная вставка в одной транзакции: все записи или ни одной
+                async with session.begin():
+                    await session.execute(
+                        insert(Secret),
+                        [
+                            {
+                                "secret_key": key,
+                                "secret_value": value,
+                                "application_id": application_id,
+                                "expires_at": expires_at,
+                            }
+                            for key, value in values.items()
+                        ],
+                    )
+            except IntegrityError:
+                raise ValueError("Секрет с одним из ключей уже существует.")
+            except SQLAlchemyError as e:
+                raise StorageUnavailableError(f"Ошибка записи данных: {e}")
+
     async def update_data(self, application_id: str, key: str, value: bytes):
+        await self.put_data(application_id, key, value)
+
+    async def _release_latest_version(
+        self, session: AsyncSession, application_id: str, key: str
+    ) -> tuple[int, datetime | None, str | None]:
+        # Предыдущая версия перестаёт быть последней, её номер, срок действия и блоб
+        # возвращаются тем же запросом
+        result = await session.execute(
+            update(Secret)
+            .where(
+                Secret.application_id == application_id,
+                Secret.secret_key == key,
+                Secret.is_latest.is_(True),
+            )
+            .values(is_latest=False)
+            .returning(Secret.version, Secret.expires_at, Secret.blob_id)
+        )
+        latest = result.one_or_none()
+        if latest is not None:
+            return latest.version, latest.expires_at, latest.blob_id
+        # Последнюю версию могла удалить очистка истёкших секретов
+        result = await session.execute(
+            select(func.max(Secret.version)).filter(
+                Secret.application_id == application_id, Secret.secret_key == key
+            )
+        )
+        return result.scalar() or 0, None, None
+
+    async def put_data(
+        self, application_id: str, key: str, value: bytes, blob_id: str | None = None
+    ) -> int:
+        # Каждая запись добавляет новую версию, прежние остаются в истории
+        for _ in range(self._put_attempts):
+            async with self.session() as session:
+                try:
+                    async with session.begin():
+                        (
+                            last_version,
+                            expires_at,
+                            last_blob_id,
+                        ) = await self._release_latest_version(session, application_id, key)
+                        version = last_version + 1
+                        now = datetime.now(UTC).replace(tzinfo=None)
+                        # Новая версия наследует срок действия секрета, если он ещё не истёк
+                        if expires_at is not None and expires_at <= now:
+                            expires_at = None
+                        session.add(
+                            Secret(
+                                application_id=application_id,
+                                secret_key=key,
+                                secret_value=value,
+                                is_blob=blob_id is not None,
+                                blob_id=blob_id,
+                                version=version,
+                                created_at=now,
+                                updated_at=now,
+                                expires_at=expires_at,
+                            )
+                        )
+                        # Чанки вытесненного блоба удаляются вместе с фиксацией новой версии
+                        if last_blob_id is not None and last_blob_id != blob_id:
+                            await session.execute(
+                                delete(SecretChunk).where(
+                                    SecretChunk.application_id == application_id,
+                                    SecretChunk.blob_id == last_blob_id,
+                                )
+                            )
+                    return version
+                except IntegrityError:
+                    # Версию заняла параллельная запись или другой экземпляр сервиса
+                    continue
+                except SQLAlchemyError as e:
+                    raise RuntimeError(f"Ошибка обновления данных: {e}")
+        raise RuntimeError(f"Не удалось записать новую версию секрета '{key}'.")
+
+    async def delete_data(self, application_id: str, key: str):
         async with self.session() as session:
             try:
+                # Чанки блобов всех версий секрета больше не прочитать
+                await session.execute(
+                    delete(SecretChunk).where(
+                        SecretChunk.application_id == application_id,
+                        SecretChunk.blob_id.in_(
+                            select(Secret.blob_id).filter(
+                                Secret.application_id == application_id,
+                                Secret.secret_key == key,
+                                Secret.blob_id.is_not(None),
+                            )
+                        ),
+                    )
+                )
+                # Помечаем удалёнными все версии секрета
                 stmt = (
                     update(Secret)
                     .where(
                         Secret.secret_key == key,
                         Secret.application_id == application_id,
+                        Secret.is_deleted.is_(False),
                     )
-                    .values(
-                        secret_value=value,
-                        updated_at=datetime.datetime.now(UTC),
-                        version=Secret.version + 1,
-                    )
+                    .values(is_deleted=True, deleted_at=datetime.now(UTC))
                 )
                 result = await session.execute(stmt)
                 await session.commit()
@@ -222,51 +778,379 @@ class RDBStorageBackend(AsyncStorageBackend):
                 if result.rowcount == 0:
                     raise ValueError(f"Секрет с ключом '{key}' не найден.")
             except SQLAlchemyError as e:
-                raise RuntimeError(f"Ошибка обновления данных: {e}")
+                raise RuntimeError(f"Ошибка удаления данных: {e}")
 
-    async def delete_data(self, application_id: str, key: str):
+    async def set_expiry(self, application_id: str, key: str, expires_at: datetime | None) -> bool:
+        if expires_at is not None:
+            expires_at = expires_at.astimezone(UTC).replace(tzinfo=None)
         async with self.session() as session:
             try:
-                stmt = (
-                    update(Secret)
-                    .where(
+                async with session.begin():
+                    result = await session.execute(
+                        update(Secret)
+                        .where(
+                            Secret.secret_key == key,
+                            Secret.application_id == application_id,
+                            Secret.is_deleted.is_(False),
+                            self._unexpired(),
+                        )
+                        .values(expires_at=expires_at)
+                    )
+                return result.rowcount > 0
+            except SQLAlchemyError as e:
+                raise RuntimeError(f"Ошибка обновления срока действия: {e}")
+
+    async def reap_expired(self, limit: int) -> int:
+        now = datetime.now(UTC).replace(tzinfo=None)
+        async with self.session() as session:
+            try:
+                async with session.begin():
+                    # Пакет выбирается по индексу expires_at, удаление — по первичному ключу
+                    result = await session.execute(
+                        select(Secret.id, Secret.blob_id)
+                        .filter(Secret.expires_at <= now)
+                        .limit(limit)
+                    )
+                    expired = result.all()
+                    ids = [secret.id for secret in expired]
+                    blob_ids = {secret.blob_id for secret in expired if secret.blob_id}
+                    if blob_ids:
+                        await session.execute(
+                            delete(SecretChunk).where(SecretChunk.blob_id.in_(blob_ids))
+                        )
+                    if ids:
+                        await session.execute(delete(Secret).where(Secret.id.in_(ids)))
+                return len(ids)
+            except SQLAlchemyError as e:
+                raise RuntimeError(f"Ошибка удаления истёкших секретов: {e}")
+
+    async def list_versions(
+        self, application_id: str, key: str, before_version: int | None, limit: int
+    ) -> list[dict]:
+        async with self.session() as session:
+            try:
+                stmt = select(Secret.version, Secret.created_at, Secret.is_deleted).filter(
+                    Secret.application_id == application_id, Secret.secret_key == key
+                )
+                if before_version is not None:
+                    stmt = stmt.filter(Secret.version < before_version)
+                result = await session.execute(stmt.order_by(Secret.version.desc()).limit(limit))
+                return [
+                    {"version": version, "created_at": created_at, "is_deleted": is_deleted}
+                    for version, created_at, is_deleted in result
+                ]
+            except SQLAlchemyError as e:
+                raise RuntimeError(f"Ошибка чтения версий: {e}")
+
+    async def read_version(self, application_id: str, key: str, version: int) -> bytes | None:
+        async with self.session() as session:
+            try:
+                result = await session.execute(
+                    select(Secret.secret_value, Secret.is_blob).filter(
+                        Secret.application_id == application_id,
+                        Secret.secret_key == key,
+                        Secret.version == version,
+                        Secret.is_deleted.is_(False),
+                        self._unexpired(),
+                    )
+                )
+                secret = result.one_or_none()
+                return _stored_value(*secret) if secret else None
+            except SQLAlchemyError as e:
+                raise RuntimeError(f"Ошибка чтения версии: {e}")
+
+    async def read_as_of(self, application_id: str, key: str, timestamp: datetime) -> bytes | None:
+        async with self.session() as session:
+            try:
+                # Последняя версия, созданная не позже момента времени
+                result = await session.execute(
+                    select(Secret.secret_value, Secret.is_blob, Secret.is_deleted)
+                    .filter(
+                        Secret.application_id == application_id,
                         Secret.secret_key == key,
+                        Secret.created_at <= timestamp.astimezone(UTC).replace(tzinfo=None),
+                        self._unexpired(),
+                    )
+                    .order_by(Secret.version.desc())
+                    .limit(1)
+                )
+                secret = result.first()
+                if not secret or secret.is_deleted:
+                    return None
+                return _stored_value(secret.secret_value, secret.is_blob)
+            except SQLAlchemyError as e:
+                raise RuntimeError(f"Ошибка чтения версии: {e}")
+
+    async def watch_changes(
+        self, position: datetime | None = None
+    ) -> AsyncIterator[tuple[datetime, dict]]:
+        # Опрос по индексу updated_at: без изменений каждый опрос возвращает пустой результат
+        since = position or datetime.now(UTC).replace(tzinfo=None)
+        while True:
+            async with self.session() as session:
+                try:
+                    result = await session.execute(
+                        select(
+                            Secret.application_id,
+                            Secret.secret_key,
+                            Secret.version,
+                            Secret.is_deleted,
+                            Secret.updated_at,
+                        )
+                        # Прежняя версия тоже обновляется при записи новой, но это не изменение
+                        .filter(Secret.updated_at > since, Secret.is_latest.is_(True))
+                        .order_by(Secret.updated_at)
+                    )
+                    rows = result.all()
+                except SQLAlchemyError as e:
+                    raise RuntimeError(f"Ошибка чтения изменений: {e}")
+            for application_id, key, version, is_deleted, updated_at in rows:
+                since = updated_at
+                yield (
+                    since,
+                    {
+                        "application_id": application_id,
+                        "key": key,
+                        "version": version,
+                        "deleted": is_deleted,
+                    },
+                )
+            await asyncio.sleep(Config.WATCH_POLL_INTERVAL)
+
+    async def list_secret_keys(self, application_id: str) -> list[str]:
+        async with self.session() as session:
+            try:
+                result = await session.execute(
+                    select(Secret.secret_key).filter(
                         Secret.application_id == application_id,
+                        LATEST_LIVE_SECRET,
+                        self._unexpired(),
                     )
-                    .values(is_deleted=True, deleted_at=datetime.datetime.now(UTC))
                 )
-                result = await session.execute(stmt)
+                return list(result.scalars().all())
+            except SQLAlchemyError as e:
+                raise RuntimeError(f"Ошибка чтения списка ключей: {e}")
+
+    async def write_blob_chunks(
+        self, application_id: str, blob_id: str, chunks: AsyncIterator[bytes]
+    ) -> int:
+        async with self.session() as session:
+            try:
+                count = 0
+                async for chunk in chunks:
+                    await session.execute(
+                        insert(SecretChunk).values(
+                            application_id=application_id,
+                            blob_id=blob_id,
+                            chunk_index=count,
+                            data=chunk,
+                        )
+                    )
+                    count += 1
                 await session.commit()
+                return count
+            except SQLAlchemyError as e:
+                raise RuntimeError(f"Ошибка записи блоба: {e}")
 
-                if result.rowcount == 0:
-                    raise ValueError(f"Секрет с ключом '{key}' не найден.")
+    async def read_blob_chunks(self, application_id: str, blob_id: str) -> AsyncIterator[bytes]:
+        async with self.session() as session:
+            try:
+                result = await session.stream(
+                    select(SecretChunk.data)
+                    .filter(
+                        SecretChunk.application_id == application_id,
+                        SecretChunk.blob_id == blob_id,
+                    )
+                    .order_by(SecretChunk.chunk_index)
+                )
+                async for data in result.scalars():
+                    yield data
             except SQLAlchemyError as e:
-                raise RuntimeError(f"Ошибка удаления данных: {e}")
+                raise RuntimeError(f"Ошибка чтения блоба: {e}")
 
-    async def _read_key_app(self, application_id: str) -> bytes:
+    async def delete_blob_chunks(self, application_id: str, blob_id: str) -> None:
+        async with self.session() as session:
+            try:
+                await session.execute(
+                    delete(SecretChunk).where(
+                        SecretChunk.application_id == application_id,
+                        SecretChunk.blob_id == blob_id,
+                    )
+                )
+                await session.commit()
+            except SQLAlchemyError as e:
+                raise RuntimeError(f"Ошибка удаления блоба: {e}")
+
+    async def iter_stored_values(
+        self, collection: str, after_id: str | None, batch_size: int
+    ) -> AsyncIterator[list[tuple[str, bytes]]]:
+        table = self._stored_value_tables[collection]
+        field = self._stored_value_fields[collection]
+        last_id = int(after_id) if after_id else 0
+        while True:
+            # Пагинация по ключу, чтобы не держать транзакцию открытой на всё время обхода
+            async with self.session() as session:
+                try:
+                    result = await session.execute(
+                        select(table.c.id, table.c[field])
+                        .filter(table.c.id > last_id)
+                        .order_by(table.c.id)
+                        .limit(batch_size)
+                    )
+                    rows = result.all()
+                except SQLAlchemyError as e:
+                    raise RuntimeError(f"Ошибка чтения данных: {e}")
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            yield [(str(record_id), value) for record_id, value in rows]
+
+    async def replace_stored_values(
+        self, collection: str, updates: list[tuple[str, bytes, bytes]]
+    ) -> int:
+        if not updates:
+            return 0
+        table = self._stored_value_tables[collection]
+        field = self._stored_value_fields[collection]
+        stmt = (
+            table.update()
+            .where(
+                table.c.id == bindparam("record_id"),
+                table.c[field] == bindparam("old_value"),
+            )
+            .values({field: bindparam("new_value")})
+        )
+        async with self.session() as session:
+            try:
+                result = await session.execute(
+                    stmt,
+                    [
+                        {"record_id": int(record_id), "old_value": old, "new_value": new}
+                        for record_id, old, new in updates
+                    ],
+                )
+                await session.commit()
+                return result.rowcount
+            except SQLAlchemyError as e:
+                raise RuntimeError(f"Ошибка обновления данных: {e}")
+
+    def pool_stats(self) -> dict[str, int] | None:
+        pool = self.engine.sync_engine.pool
+        return pool.stats() if isinstance(pool, InstrumentedQueuePool) else None
+
+    async def create_indexes(self) -> None:
+        # Индексы создаются миграциями вместе с таблицами
+        await self.create_tables()
+
+    async def read_checkpoint(self, name: str) -> dict | None:
+        async with self.session() as session:
+            try:
+                checkpoint = await session.get(JobCheckpoint, name)
+                return json.loads(checkpoint.state) if checkpoint else None
+            except SQLAlchemyError as e:
+                raise RuntimeError(f"Ошибка чтения контрольной точки: {e}")
+
+    async def write_checkpoint(self, name: str, state: dict) -> None:
+        async with self.session() as session:
+            try:
+                await session.merge(
+                    JobCheckpoint(name=name, state=json.dumps(state), updated_at=datetime.now(UTC))
+                )
+                await session.commit()
+            except SQLAlchemyError as e:
+                raise RuntimeError(f"Ошибка записи контрольной точки: {e}")
+
+    async def _read_key_app(self, application_id: str) -> bytes | None:
         """Асинхронное чтение ключа приложения"""
-        pass
+        async with self.session() as session:
+            try:
+                result = await session.execute(
+                    select(AppKey.app_key).filter(AppKey.application_id == application_id)
+                )
+                return result.scalar_one_or_none()
+            except SQLAlchemyError as e:
+                raise RuntimeError(f"Ошибка чтения ключа приложения: {e}")
 
-    async def _write_key_app(self, application_id: str, app_key: bytes):
+    async def _write_key_app(self, application_id: str, app_key: bytes) -> bytes:
         """Асинхронная запись ключа приложения"""
-        pass
+        now = datetime.now(UTC)
+        async with self.session() as session:
+            try:
+                session.add(
+                    AppKey(
+                        application_id=application_id,
+                        app_key=app_key,
+                        created_at=now,
+                        updated_at=now,
+                    )
+                )
+                await session.commit()
+                return app_key
+            except IntegrityError:
+                # Параллельный запрос записал ключ первым: возвращаем сохранённый ключ
+                await session.rollback()
+            except SQLAlchemyError as e:
+                raise RuntimeError(f"Ошибка записи ключа приложения: {e}")
+        stored_key = await self._read_key_app(application_id)
+        if stored_key is None:
+            raise RuntimeError(f"Ключ приложения для '{application_id}' не записан.")
+        return stored_key
 
     async def _update_key_app(self, application_id: str, app_key: bytes):
         """Асинхронное обновление ключа приложения"""
-        pass
+        async with self.session() as session:
+            try:
+                result = await session.execute(
+                    update(AppKey)
+                    .where(AppKey.application_id == application_id)
+                    .values(
+                        app_key=app_key,
+                        version=AppKey.version + 1,
+                        updated_at=datetime.now(UTC),
+                    )
+                )
+                await session.commit()
+            except SQLAlchemyError as e:
+                raise RuntimeError(f"Ошибка обновления ключа приложения: {e}")
+        if result.rowcount == 0:
+            raise ValueError(f"Ключ приложения для '{application_id}' не найден.")
 
     async def _delete_key_app(self, application_id: str):
         """Асинхронное удаление ключа приложения"""
-        pass
+        async with self.session() as session:
+            try:
+                result = await session.execute(
+                    delete(AppKey).where(AppKey.application_id == application_id)
+                )
+                await session.commit()
+            except SQLAlchemyError as e:
+                raise RuntimeError(f"Ошибка удаления ключа приложения: {e}")
+        if result.rowcount == 0:
+            raise ValueError(f"Ключ приложения для '{application_id}' не найден.")
 
 
 class MongoDBStorageBackend(AsyncStorageBackend):
+    # Число попыток записи новой версии при конкурентных обновлениях одного секрета
+    _put_attempts = 5
+    # Поля с зашифрованными значениями в коллекциях
+    _stored_value_fields = {"secrets": "secret_value", "apps_keys": "app_key"}
+
     def __init__(self):
         try:
             self.client = AsyncIOMotorClient(config.secret_db_uri)
             self.db = self.client[config.secret_db_name]
         except PyMongoError as e:
             raise RuntimeError(f"Ошибка подключения к MongoDB: {e}")
+        self._indexes_ready = False
+        # Сбрасывается, если сервер не поддерживает потоки изменений (не набор реплик)
+        self._change_streams = True
+        # Определяется при первой пакетной записи: транзакции есть у наборов реплик и mongos
+        self._transactions: bool | None = None
+
+    @staticmethod
+    def _unexpired() -> dict:
+        # TTL-монитор удаляет документы раз в минуту, до этого истёкшие версии скрываются
+        return {"$or": [{"expires_at": None}, {"expires_at": {"$gt": datetime.now(UTC)}}]}
 
     async def read_data(self, application_id: str, key: str) -> bytes | None:
         try:
@@ -276,95 +1160,550 @@ class MongoDBStorageBackend(AsyncStorageBackend):
                     "application_id": application_id,
                     "secret_key": key,
                     "is_deleted": False,
+                    **self._unexpired(),
                 },
                 sort=[("version", -1)],  # Сортировка по убыванию версии
             )
             if secret:
-                return secret["secret_value"]
+                return _stored_value(secret["secret_value"], secret.get("is_blob"))
             return None
         except PyMongoError as e:
             raise RuntimeError(f"Ошибка чтения из MongoDB: {e}")
 
-    async def write_data(self, application_id: str, key: str, value: bytes) -> None:
+    async def read_many(
+        self, application_id: str, keys: list[str] | None = None
+    ) -> dict[str, bytes]:
+        query = {"application_id": application_id, "is_deleted": False, **self._unexpired()}
+        if keys is not None:
+            query["secret_key"] = {"$in": keys}
+        # Прежние версии остаются живыми, поэтому сервер отдаёт только последнюю версию ключа:
+        # сортировка совпадает с уникальным индексом, $first берёт её значение
+        pipeline = [
+            {"$match": query},
+            {"$sort": {"secret_key": 1, "version": -1}},
+            {
+                "$group": {
+                    "_id": "$secret_key",
+                    "secret_value": {"$first": "$secret_value"},
+                    "is_blob": {"$first": "$is_blob"},
+                }
+            },
+        ]
         try:
-            # Проверяем, существует ли уже секрет с данным ключом
-            existing_secret = await self.db.secrets.find_one(
-                {"application_id": application_id, "secret_key": key}
+            cursor = self.db.secrets.aggregate(pipeline)
+            return {
+                secret["_id"]: _stored_value(secret["secret_value"], secret.get("is_blob"))
+                async for secret in cursor
+            }
+        except PyMongoError as e:
+            raise RuntimeError(f"Ошибка чтения из MongoDB: {e}")
+
+    async def create_indexes(self) -> None:
+        try:
+            # Уникальный индекс гарантирует, что параллельные записи не получат одну версию;
+            # его префиксы обслуживают все чтения секретов по приложению и ключу
+            await self._create_version_index()
+            # Для чтения на момент времени без перебора версий
+            await self.db.secrets.create_index(
+                [("application_id", 1), ("secret_key", 1), ("created_at", -1)]
             )
-            if existing_secret:
-                raise ValueError(f"Секрет с ключом '{key}' уже существует.")
+            # Для опроса изменений на серверах без потоков изменений
+            await self.db.secrets.create_index("updated_at")
+            # Истёкшие секреты удаляет сервер; документы без expires_at не истекают
+            await self.db.secrets.create_index("expires_at", expireAfterSeconds=0)
+            # Уникальный индекс не даёт параллельным запросам создать два ключа одного приложения
+            await self.db.apps_keys.create_index("application_id", unique=True)
+            # Чанки блоба читаются по порядку одним проходом по индексу
+            await self.db.secret_chunks.create_index(
+                [("application_id", 1), ("blob_id", 1), ("chunk_index", 1)], unique=True
+            )
+            # Чанки получают срок действия манифеста, чанки без expires_at не истекают
+            await self.db.secret_chunks.create_index("expires_at", expireAfterSeconds=0)
+        except PyMongoError as e:
+            raise RuntimeError(f"Ошибка создания индексов в MongoDB: {e}")
+        self._indexes_ready = True
+
+    async def _create_version_index(self) -> None:
+        try:
+            await self.db.secrets.create_index(
+                [("application_id", 1), ("secret_key", 1), ("version", -1)], unique=True
+            )
+        except OperationFailure as e:
+            if e.code != DUPLICATE_KEY_ERROR:
+                raise
+            # Версии, записанные до появления индекса, могли повториться. Какую из них оставить,
+            # решает администратор: сервис не удаляет значения секретов сам
+            duplicates = await self.db.secrets.aggregate(
+                [
+                    {
+                        "$group": {
+                            "_id": {
+                                "application_id": "$application_id",
+                                "secret_key": "$secret_key",
+                                "version": "$version",
+                            },
+                            "count": {"$sum": 1},
+                        }
+                    },
+                    {"$match": {"count": {"$gt": 1}}},
+                    {"$limit": 10},
+                ],
+                allowDiskUse=True,
+            ).to_list(length=10)
+            found = ", ".join(
+                f"{d['_id']['application_id']}/{d['_id']['secret_key']} v{d['_id']['version']}"
+                for d in duplicates
+            )
+            raise RuntimeError(
+                "В коллекции secrets есть повторяющиеся версии секретов, уникальный индекс "
+                f"(application_id, secret_key, version) не создан: {found}. Удалите или "
+                "перенумеруйте лишние документы и перезапустите сервис."
+            )
+
+    async def _ensure_indexes(self) -> None:
+        # Записи, корректность которых держится на уникальных индексах, не выполняются без них
+        if not self._indexes_ready:
+            await self.create_indexes()
+
+    def _new_version(
+        self,
+        application_id: str,
+        key: str,
+        value: bytes,
+        version: int,
+        blob_id: str | None = None,
+        expires_at: datetime | None = None,
+    ) -> dict:
+        now = datetime.now(UTC)
+        return SecretVersion(
+            application_id=application_id,
+            secret_key=key,
+            secret_value=value,
+            is_blob=blob_id is not None,
+            blob_id=blob_id,
+            version=version,
+            created_at=now,
+            updated_at=now,
+            expires_at=expires_at,
+        ).model_dump()
+
+    async def write_data(self, application_id: str, key: str, value: bytes) -> None:
+        try:
+            await self._ensure_indexes()
+            # Версия 1 уже есть у любого существующего секрета: вставка и проверка за один запрос
+            await self.db.secrets.insert_one(self._new_version(application_id, key, value, 1))
+        except DuplicateKeyError:
+            raise ValueError(f"Секрет с ключом '{key}' уже существует.")
+        except PyMongoError as e:
+            raise RuntimeError(f"Ошибка записи в MongoDB: {e}")
 
-            # Создаем новую запись с версией 1
-            new_secret = SecretVersion(
+    async def write_many(
+        self, application_id: str, values: dict[str, bytes], expires_at: datetime | None = None
+    ) -> None:
+        if not values:
+            return
+        now = datetime.now(UTC)
+        new_secrets = [
+            SecretVersion(
                 application_id=application_id,
                 secret_key=key,
                 secret_value=value,
                 version=1,
-                created_at=datetime.now(UTC),
-                updated_at=datetime.now(UTC),
-            )
-
-            # Вставляем новую запись в коллекцию
-            await self.db.secrets.insert_one(new_secret.dict())
+                created_at=now,
+                updated_at=now,
+                expires_at=expires_at,
+            ).model_dump()
+            for key, value in values.items()
+        ]
+        transaction = False
+        try:
+            await self._ensure_indexes()
+            transaction = await self._supports_transactions()
+            if transaction:
+                async with await self.client.start_session() as session:
+                    async with session.start_transaction():
+                        await self.db.secrets.insert_many(
+                            new_secrets, ordered=True, session=session
+                        )
+            else:
+                # На отдельном сервере транзакций нет: упорядоченная вставка останавливается на
+                # первом конфликте уникального индекса, вставленное до него удаляется. Между
+                # вставкой и откатом часть секретов видна другим запросам
+                await self.db.secrets.insert_many(new_secrets, ordered=True)
+        except BulkWriteError as e:
+            if not transaction:
+                await self._delete_inserted(new_secrets[: e.details["nInserted"]])
+            write_errors = e.details["writeErrors"]
+            if write_errors and write_errors[0]["code"] == DUPLICATE_KEY_ERROR:
+                key = new_secrets[write_errors[0]["index"]]["secret_key"]
+                raise ValueError(f"Секрет с ключом '{key}' уже существует.")
+            raise StorageUnavailableError(f"Ошибка записи в MongoDB: {e}")
         except PyMongoError as e:
-            raise RuntimeError(f"Ошибка записи в MongoDB: {e}")
+            if not transaction:
+                await self._delete_inserted(new_secrets)
+            raise StorageUnavailableError(f"Ошибка записи в MongoDB: {e}")
+
+    async def _supports_transactions(self) -> bool:
+        if self._transactions is None:
+            hello = await self.client.admin.command("hello")
+            self._transactions = "setName" in hello or hello.get("msg") == "isdbgrid"
+        return self._transactions
+
+    async def _delete_inserted(self, documents: list[dict]) -> None:
+        # insert_many проставляет _id в переданные документы, в том числе не вставленные
+        ids = [document["_id"] for document in documents if "_id" in document]
+        if ids:
+            try:
+                await self.db.secrets.delete_many({"_id": {"$in": ids}})
+            except PyMongoError as e:
+                raise StorageUnavailableError(f"Ошибка отката записи в MongoDB: {e}")
 
     async def update_data(self, application_id: str, key: str, value: bytes) -> None:
+        await self.put_data(application_id, key, value)
+
+    async def put_data(
+        self, application_id: str, key: str, value: bytes, blob_id: str | None = None
+    ) -> int:
+        try:
+            await self._ensure_indexes()
+            # Последняя версия читается из базы при каждой записи: версии, запомненные в процессе,
+            # устаревают, когда TTL-индекс удаляет секрет, а другой экземпляр создаёт его заново
+            for _ in range(self._put_attempts):
+                # Новая версия наследует срок действия последней, пока он не истёк
+                last_secret = await self.db.secrets.find_one(
+                    {"application_id": application_id, "secret_key": key},
+                    {"_id": 0, "version": 1, "expires_at": 1, "blob_id": 1},
+                    sort=[("version", -1)],
+                )
+                last_secret = last_secret or {"version": 0}
+                version = last_secret["version"] + 1
+                expires_at = last_secret.get("expires_at")
+                if expires_at is not None and expires_at.replace(tzinfo=UTC) <= datetime.now(UTC):
+                    expires_at = None
+                try:
+                    await self.db.secrets.insert_one(
+                        self._new_version(application_id, key, value, version, blob_id, expires_at)
+                    )
+                except DuplicateKeyError:
+                    # Версию заняла параллельная запись или другой экземпляр сервиса
+                    continue
+                if blob_id is not None and expires_at is not None:
+                    await self._set_chunks_expiry(application_id, [blob_id], expires_at)
+                # Версия вытеснила прежнюю только после вставки, поэтому чанки удаляются после неё
+                last_blob_id = last_secret.get("blob_id")
+                if last_blob_id is not None and last_blob_id != blob_id:
+                    await self._delete_chunks(application_id, [last_blob_id])
+                return version
+            raise RuntimeError(f"Не удалось записать новую версию секрета '{key}'.")
+        except PyMongoError as e:
+            raise RuntimeError(f"Ошибка обновления в MongoDB: {e}")
+
+    async def delete_data(self, application_id: str, key: str) -> None:
         try:
-            # Помечаем текущую версию как удаленную
-            await self.db.secrets.update_one(
+            # Помечаем удалёнными все версии секрета: обновление не снимает отметку со старых
+            result = await self.db.secrets.update_many(
                 {
                     "application_id": application_id,
                     "secret_key": key,
                     "is_deleted": False,
                 },
-                {"$set": {"is_deleted": True}},
+                {
+                    "$set": {
+                        "is_deleted": True,
+                        "deleted_at": datetime.now(UTC),
+                        "updated_at": datetime.now(UTC),
+                    }
+                },
             )
+            if result.matched_count == 0:
+                raise ValueError(f"Секрет с ключом '{key}' не найден или уже удален.")
+            # Чанки блобов всех версий секрета больше не прочитать
+            await self._delete_chunks(application_id, await self._blob_ids(application_id, key))
+        except PyMongoError as e:
+            raise RuntimeError(f"Ошибка удаления в MongoDB: {e}")
 
-            # Находим последнюю версию секрета
-            last_version = await self.db.secrets.find_one(
+    async def set_expiry(self, application_id: str, key: str, expires_at: datetime | None) -> bool:
+        try:
+            # Срок меняется у всех версий, иначе старые версии истекут по прежнему сроку
+            result = await self.db.secrets.update_many(
                 {
                     "application_id": application_id,
                     "secret_key": key,
+                    "is_deleted": False,
+                    **self._unexpired(),
                 },
-                sort=[("version", -1)],  # Сортировка по убыванию версии
+                {"$set": {"expires_at": expires_at}},
+            )
+            if result.matched_count > 0:
+                await self._set_chunks_expiry(
+                    application_id, await self._blob_ids(application_id, key), expires_at
+                )
+            return result.matched_count > 0
+        except PyMongoError as e:
+            raise RuntimeError(f"Ошибка обновления срока действия в MongoDB: {e}")
+
+    async def _blob_ids(self, application_id: str, key: str) -> list[str]:
+        return await self.db.secrets.distinct(
+            "blob_id",
+            {"application_id": application_id, "secret_key": key, "blob_id": {"$ne": None}},
+        )
+
+    async def _delete_chunks(self, application_id: str, blob_ids: list[str]) -> None:
+        if blob_ids:
+            await self.db.secret_chunks.delete_many(
+                {"application_id": application_id, "blob_id": {"$in": blob_ids}}
             )
 
-            # Добавляем новую версию
-            new_version = last_version["version"] + 1 if last_version else 1
-            new_secret = SecretVersion(
-                application_id=application_id,
-                secret_key=key,
-                secret_value=value,
-                version=new_version,
-                created_at=datetime.now(UTC),
-                updated_at=datetime.now(UTC),
+    async def _set_chunks_expiry(
+        self, application_id: str, blob_ids: list[str], expires_at: datetime | None
+    ) -> None:
+        # Чанки истекают вместе с манифестом: TTL-индекс удаляет только документы, а манифест
+        # не знает, какие чанки на него ссылаются
+        if blob_ids:
+            await self.db.secret_chunks.update_many(
+                {"application_id": application_id, "blob_id": {"$in": blob_ids}},
+                {"$set": {"expires_at": expires_at}},
             )
 
-            await self.db.secrets.insert_one(new_secret.dict())
+    async def reap_expired(self, limit: int) -> int:
+        # Истёкшие секреты и чанки их блобов удаляют TTL-индексы на стороне сервера
+        return 0
+
+    async def list_versions(
+        self, application_id: str, key: str, before_version: int | None, limit: int
+    ) -> list[dict]:
+        query = {"application_id": application_id, "secret_key": key}
+        if before_version is not None:
+            query["version"] = {"$lt": before_version}
+        try:
+            cursor = self.db.secrets.find(
+                query,
+                {"_id": 0, "version": 1, "created_at": 1, "is_deleted": 1},
+                sort=[("version", -1)],
+                limit=limit,
+            )
+            return await cursor.to_list(length=limit)
         except PyMongoError as e:
-            raise RuntimeError(f"Ошибка обновления в MongoDB: {e}")
+            raise RuntimeError(f"Ошибка чтения версий из MongoDB: {e}")
 
-    async def delete_data(self, application_id: str, key: str) -> None:
+    async def read_version(self, application_id: str, key: str, version: int) -> bytes | None:
         try:
-            # Находим последнюю версию секрета, которая не помечена как удаленная
-            result = await self.db.secrets.update_one(
+            secret = await self.db.secrets.find_one(
                 {
                     "application_id": application_id,
                     "secret_key": key,
+                    "version": version,
                     "is_deleted": False,
+                    **self._unexpired(),
                 },
+                {"secret_value": 1, "is_blob": 1},
+            )
+            return _stored_value(secret["secret_value"], secret.get("is_blob")) if secret else None
+        except PyMongoError as e:
+            raise RuntimeError(f"Ошибка чтения версии из MongoDB: {e}")
+
+    async def read_as_of(self, application_id: str, key: str, timestamp: datetime) -> bytes | None:
+        try:
+            # Последняя версия, созданная не позже момента времени
+            secret = await self.db.secrets.find_one(
                 {
-                    "$set": {
-                        "is_deleted": True,
-                        "deleted_at": datetime.now(UTC),
-                    }
+                    "application_id": application_id,
+                    "secret_key": key,
+                    "created_at": {"$lte": timestamp},
+                    **self._unexpired(),
                 },
+                {"secret_value": 1, "is_blob": 1, "is_deleted": 1},
+                sort=[("created_at", -1)],
             )
-            if result.matched_count == 0:
-                raise ValueError(f"Секрет с ключом '{key}' не найден или уже удален.")
+            if not secret or secret["is_deleted"]:
+                return None
+            return _stored_value(secret["secret_value"], secret.get("is_blob"))
         except PyMongoError as e:
-            raise RuntimeError(f"Ошибка удаления в MongoDB: {e}")
+            raise RuntimeError(f"Ошибка чтения версии из MongoDB: {e}")
+
+    async def watch_changes(
+        self, position: dict | datetime | None = None
+    ) -> AsyncIterator[tuple[dict | datetime, dict]]:
+        if not self._change_streams or isinstance(position, datetime):
+            async for change in self._poll_changes(position):
+                yield change
+            return
+        # Сервер отдаёт только метаданные версий, значения секретов в поток не попадают
+        pipeline = [
+            {"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}},
+            {
+                "$project": {
+                    "fullDocument.application_id": 1,
+                    "fullDocument.secret_key": 1,
+                    "fullDocument.version": 1,
+                    "fullDocument.is_deleted": 1,
+                }
+            },
+        ]
+        try:
+            async with self.db.secrets.watch(
+                pipeline, full_document="updateLookup", resume_after=position
+            ) as stream:
+                async for change in stream:
+                    document = change.get("fullDocument")
+                    # Версия могла быть удалена до того, как сервер её прочитал
+                    if document is None:
+                        continue
+                    yield (
+                        stream.resume_token,
+                        {
+                            "application_id": document["application_id"],
+                            "key": document["secret_key"],
+                            "version": document["version"],
+                            "deleted": document["is_deleted"],
+                        },
+                    )
+        except OperationFailure as e:
+            # Отдельный сервер не поддерживает потоки изменений: дальше изменения опрашиваются.
+            # Позиция потока к опросу неприменима, поэтому ошибка всё равно поднимается
+            if e.code == CHANGE_STREAM_NOT_SUPPORTED or "only supported on replica sets" in str(e):
+                self._change_streams = False
+            raise RuntimeError(f"Ошибка чтения потока изменений MongoDB: {e}")
+        except PyMongoError as e:
+            raise RuntimeError(f"Ошибка чтения потока изменений MongoDB: {e}")
+
+    async def _poll_changes(
+        self, position: datetime | None = None
+    ) -> AsyncIterator[tuple[datetime, dict]]:
+        # Опрос по индексу updated_at, как в реляционных БД
+        since = position if isinstance(position, datetime) else datetime.now(UTC)
+        while True:
+            try:
+                cursor = self.db.secrets.find(
+                    {"updated_at": {"$gt": since}},
+                    {
+                        "_id": 0,
+                        "application_id": 1,
+                        "secret_key": 1,
+                        "version": 1,
+                        "is_deleted": 1,
+                        "updated_at": 1,
+                    },
+                    sort=[("updated_at", 1)],
+                )
+                documents = await cursor.to_list(None)
+            except PyMongoError as e:
+                raise RuntimeError(f"Ошибка чтения изменений из MongoDB: {e}")
+            for document in documents:
+                since = document["updated_at"]
+                yield (
+                    since,
+                    {
+                        "application_id": document["application_id"],
+                        "key": document["secret_key"],
+                        "version": document["version"],
+                        "deleted": document["is_deleted"],
+                    },
+                )
+            await asyncio.sleep(Config.WATCH_POLL_INTERVAL)
+
+    async def list_secret_keys(self, application_id: str) -> list[str]:
+        try:
+            return await self.db.secrets.distinct(
+                "secret_key",
+                {"application_id": application_id, "is_deleted": False, **self._unexpired()},
+            )
+        except PyMongoError as e:
+            raise RuntimeError(f"Ошибка чтения списка ключей из MongoDB: {e}")
+
+    async def write_blob_chunks(
+        self, application_id: str, blob_id: str, chunks: AsyncIterator[bytes]
+    ) -> int:
+        count = 0
+        try:
+            async for chunk in chunks:
+                new_chunk = SecretChunkMongo(
+                    application_id=application_id,
+                    blob_id=blob_id,
+                    chunk_index=count,
+                    data=chunk,
+                )
+                await self.db.secret_chunks.insert_one(new_chunk.model_dump())
+                count += 1
+            return count
+        except PyMongoError as e:
+            raise RuntimeError(f"Ошибка записи блоба в MongoDB: {e}")
+
+    async def read_blob_chunks(self, application_id: str, blob_id: str) -> AsyncIterator[bytes]:
+        try:
+            # Небольшой batch_size, чтобы в памяти одновременно было лишь несколько чанков
+            cursor = self.db.secret_chunks.find(
+                {"application_id": application_id, "blob_id": blob_id},
+                sort=[("chunk_index", 1)],
+                batch_size=4,
+            )
+            async for chunk in cursor:
+                yield chunk["data"]
+        except PyMongoError as e:
+            raise RuntimeError(f"Ошибка чтения блоба из MongoDB: {e}")
+
+    async def delete_blob_chunks(self, application_id: str, blob_id: str) -> None:
+        try:
+            await self.db.secret_chunks.delete_many(
+                {"application_id": application_id, "blob_id": blob_id}
+            )
+        except PyMongoError as e:
+            raise RuntimeError(f"Ошибка удаления блоба из MongoDB: {e}")
+
+    async def iter_stored_values(
+        self, collection: str, after_id: str | None, batch_size: int
+    ) -> AsyncIterator[list[tuple[str, bytes]]]:
+        field = self._stored_value_fields[collection]
+        query = {"_id": {"$gt": ObjectId(after_id)}} if after_id else {}
+        try:
+            cursor = self.db[collection].find(
+                query, {field: 1}, sort=[("_id", 1)], batch_size=batch_size
+            )
+            batch = []
+            async for record in cursor:
+                batch.append((str(record["_id"]), record[field]))
+                if len(batch) == batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+        except PyMongoError as e:
+            raise RuntimeError(f"Ошибка чтения из MongoDB: {e}")
+
+    async def replace_stored_values(
+        self, collection: str, updates: list[tuple[str, bytes, bytes]]
+    ) -> int:
+        if not updates:
+            return 0
+        field = self._stored_value_fields[collection]
+        try:
+            result = await self.db[collection].bulk_write(
+                [
+                    UpdateOne({"_id": ObjectId(record_id), field: old}, {"$set": {field: new}})
+                    for record_id, old, new in updates
+                ],
+                ordered=False,
+            )
+            return result.modified_count
+        except PyMongoError as e:
+            raise RuntimeError(f"Ошибка обновления в MongoDB: {e}")
+
+    async def read_checkpoint(self, name: str) -> dict | None:
+        try:
+            checkpoint = await self.db.job_checkpoints.find_one({"_id": name})
+            return checkpoint["state"] if checkpoint else None
+        except PyMongoError as e:
+            raise RuntimeError(f"Ошибка чтения контрольной точки из MongoDB: {e}")
+
+    async def write_checkpoint(self, name: str, state: dict) -> None:
+        try:
+            await self.db.job_checkpoints.replace_one(
+                {"_id": name},
+                {"state": state, "updated_at": datetime.now(UTC)},
+                upsert=True,
+            )
+        except PyMongoError as e:
+            raise RuntimeError(f"Ошибка записи контрольной точки в MongoDB: {e}")
 
     async def _read_key_app(self, application_id: str) -> bytes | None:
         try:
@@ -373,15 +1712,27 @@ class MongoDBStorageBackend(AsyncStorageBackend):
         except PyMongoError as e:
             raise RuntimeError(f"Ошибка чтения ключа приложения из MongoDB: {e}")
 
-    async def _write_key_app(self, application_id: str, app_key: bytes):
+    async def _write_key_app(self, application_id: str, app_key: bytes) -> bytes:
         try:
+            await self._ensure_indexes()
             new_app_key = AppsKeyMongo(
                 application_id=application_id,
                 app_key=app_key,
                 created_at=datetime.now(UTC),
                 updated_at=datetime.now(UTC),
             )
-            await self.db.apps_keys.insert_one(new_app_key.model_dump())
+            # Вставляем ключ, только если его ещё нет, и возвращаем сохранённый ключ
+            try:
+                record = await self.db.apps_keys.find_one_and_update(
+                    {"application_id": application_id},
+                    {"$setOnInsert": new_app_key.model_dump(exclude={"application_id"})},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER,
+                )
+            except DuplicateKeyError:
+                # Параллельный upsert вставил документ первым
+                record = await self.db.apps_keys.find_one({"application_id": application_id})
+            return record["app_key"]
         except PyMongoError as e:
             raise RuntimeError(f"Ошибка записи ключа приложения в MongoDB: {e}")
 
@@ -415,33 +1766,121 @@ class SecretStorage:
     def __init__(self):
         _type_db = {"rbdstorage": RDBStorageBackend, "mongodb": MongoDBStorageBackend}
         self.db_conn = _type_db[config.secret_db_type]()
+        self._key_change_listeners: list[Callable[[str, bytes], None]] = []
+
+    def add_key_change_listener(self, listener: Callable[[str, bytes], None]) -> None:
+        """Register a callback invoked with the application ID and the previous stored key
+        after an application key is updated or deleted."""
+        self._key_change_listeners.append(listener)
 
     async def read_data(self, application_id: str, key: str) -> bytes | None:
         return await self.db_conn.read_data(application_id, key)
 
+    async def read_many(
+        self, application_id: str, keys: list[str] | None = None
+    ) -> dict[str, bytes]:
+        return await self.db_conn.read_many(application_id, keys)
+
     async def write_data(self, application_id: str, key: str, value: bytes) -> dict[str, str]:
         await self.db_conn.write_data(application_id, key, value)
         return {"status": "success"}
 
+    async def write_many(
+        self, application_id: str, values: dict[str, bytes], expires_at: datetime | None = None
+    ) -> dict[str, str]:
+        await self.db_conn.write_many(application_id, values, expires_at)
+        return {"status": "success"}
+
     async def update_data(self, application_id: str, key: str, value: bytes) -> dict[str, str]:
         await self.db_conn.update_data(application_id, key, value)
         return {"status": "success"}
 
+    async def put_data(
+        self, application_id: str, key: str, value: bytes, blob_id: str | None = None
+    ) -> int:
+        return await self.db_conn.put_data(application_id, key, value, blob_id)
+
     async def delete_data(self, application_id: str, key: str) -> dict[str, str]:
         await self.db_conn.delete_data(application_id, key)
         return {"status": "success"}
 
+    async def set_expiry(self, application_id: str, key: str, expires_at: datetime | None) -> bool:
+        return await self.db_conn.set_expiry(application_id, key, expires_at)
+
+    async def reap_expired(self, limit: int) -> int:
+        return await self.db_conn.reap_expired(limit)
+
+    async def list_versions(
+        self, application_id: str, key: str, before_version: int | None, limit: int
+    ) -> list[dict]:
+        return await self.db_conn.list_versions(application_id, key, before_version, limit)
+
+    async def read_version(self, application_id: str, key: str, version: int) -> bytes | None:
+        return await self.db_conn.read_version(application_id, key, version)
+
+    async def read_as_of(self, application_id: str, key: str, timestamp: datetime) -> bytes | None:
+        return await self.db_conn.read_as_of(application_id, key, timestamp)
+
+    def watch_changes(self, position: object | None = None) -> AsyncIterator[tuple[object, dict]]:
+        return self.db_conn.watch_changes(position)
+
+    async def list_secret_keys(self, application_id: str) -> list[str]:
+        return await self.db_conn.list_secret_keys(application_id)
+
+    async def write_blob_chunks(
+        self, application_id: str, blob_id: str, chunks: AsyncIterator[bytes]
+    ) -> int:
+        return await self.db_conn.write_blob_chunks(application_id, blob_id, chunks)
+
+    def read_blob_chunks(self, application_id: str, blob_id: str) -> AsyncIterator[bytes]:
+        return self.db_conn.read_blob_chunks(application_id, blob_id)
+
+    async def delete_blob_chunks(self, application_id: str, blob_id: str) -> None:
+        await self.db_conn.delete_blob_chunks(application_id, blob_id)
+
+    def iter_stored_values(
+        self, collection: str, after_id: str | None, batch_size: int
+    ) -> AsyncIterator[list[tuple[str, bytes]]]:
+        return self.db_conn.iter_stored_values(collection, after_id, batch_size)
+
+    async def replace_stored_values(
+        self, collection: str, updates: list[tuple[str, bytes, bytes]]
+    ) -> int:
+        return await self.db_conn.replace_stored_values(collection, updates)
+
+    def pool_stats(self) -> dict[str, int] | None:
+        return self.db_conn.pool_stats()
+
+    async def create_indexes(self) -> None:
+        await self.db_conn.create_indexes()
+
+    async def read_checkpoint(self, name: str) -> dict | None:
+        return await self.db_conn.read_checkpoint(name)
+
+    async def write_checkpoint(self, name: str, state: dict) -> None:
+        await self.db_conn.write_checkpoint(name, state)
+
     async def _read_key_app(self, application_id: str) -> bytes | None:
         return await self.db_conn._read_key_app(application_id)
 
-    async def _write_key_app(self, application_id: str, app_key: bytes) -> None:
-        await self.db_conn._write_key_app(application_id, app_key)
+    async def _write_key_app(self, application_id: str, app_key: bytes) -> bytes:
+        return await self.db_conn._write_key_app(application_id, app_key)
 
     async def _update_key_app(self, application_id: str, app_key: bytes) -> None:
+        old_app_key = await self.db_conn._read_key_app(application_id)
         await self.db_conn._update_key_app(application_id, app_key)
+        self._notify_key_change(application_id, old_app_key)
 
     async def _delete_key_app(self, application_id: str) -> None:
+        old_app_key = await self.db_conn._read_key_app(application_id)
         await self.db_conn._delete_key_app(application_id)
+        self._notify_key_change(application_id, old_app_key)
+
+    def _notify_key_change(self, application_id: str, old_app_key: bytes | None) -> None:
+        # Сообщаем подписчикам (кешам ключей), что старый ключ больше не используется
+        if old_app_key:
+            for listener in self._key_change_listeners:
+                listener(application_id, old_app_key)
 
     @staticmethod
     async def create_storage(storage_type: str, /) -> AsyncStorageBackend:
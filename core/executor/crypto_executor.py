@@ -0,0 +1,151 @@
+import asyncio
+import multiprocessing
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any
+
+from core.config import Config
+
+
+class CryptoExecutorBusyError(RuntimeError):
+    """Raised when the crypto executor queue is full."""
+
+
+class CryptoExecutor:
+    """Runs CPU-bound cryptographic work outside of the event loop.
+
+    Supported modes:
+    - ``inline``: run the function directly in the calling coroutine.
+    - ``thread``: dispatch to a thread pool (OpenSSL releases the GIL for heavy operations).
+    - ``process``: dispatch to a process pool; functions and arguments must be picklable.
+
+    Work on payloads smaller than `inline_threshold` bytes always runs inline, since the
+    dispatch overhead would exceed the cost of the operation itself.
+    """
+
+    _modes = {"inline", "thread", "process"}
+
+    def __init__(
+        self,
+        mode: str = "thread",
+        max_workers: int | None = None,
+        max_queue_depth: int = 0,
+        inline_threshold: int = 0,
+    ):
+        """
+        Parameters
+        ----------
+        mode : str, optional
+            One of ``inline``, ``thread`` or ``process`` (default is ``thread``).
+        max_workers : int, optional
+            Size of the pool (default is None, which uses the executor's default).
+        max_queue_depth : int, optional
+            Maximum number of tasks submitted to the pool at once; 0 means unlimited.
+        inline_threshold : int, optional
+            Payload size in bytes below which work runs inline (default is 0).
+
+        Raises
+        ------
+        ValueError
+            If the specified mode is unsupported.
+        """
+        if mode not in self._modes:
+            raise ValueError(f"Unsupported crypto executor mode: {mode}")
+        self.mode = mode
+        self.max_workers = max_workers
+        self.max_queue_depth = max_queue_depth
+        self.inline_threshold = inline_threshold
+        self._executor: Executor | None = None
+        self._pending = 0
+        self._inline_runs = 0
+        self._offloaded_runs = 0
+        self._rejected = 0
+
+    @classmethod
+    def from_config(cls) -> "CryptoExecutor":
+        """Creates an executor from the ``CRYPTO_*`` settings in `Config`."""
+        return cls(
+            mode=Config.CRYPTO_EXECUTOR_MODE,
+            max_workers=Config.CRYPTO_EXECUTOR_WORKERS,
+            max_queue_depth=Config.CRYPTO_EXECUTOR_MAX_QUEUE,
+            inline_threshold=Config.CRYPTO_INLINE_THRESHOLD,
+        )
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="crypto"
+                )
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any, payload_size: int | None = None):
+        """Runs `func(*args)` according to the executor mode.
+
+        Parameters
+        ----------
+        func : Callable[..., Any]
+            The function to run. Must be picklable in ``process`` mode.
+        *args : Any
+            Positional arguments for `func`.
+        payload_size : int, optional
+            Size of the processed data in bytes. None means the work is expensive regardless
+            of size (e.g. key generation) and is never run inline by the threshold.
+
+        Returns
+        -------
+        Any
+            The value returned by `func`.
+
+        Raises
+        ------
+        CryptoExecutorBusyError
+            If `max_queue_depth` tasks are already waiting for the pool.
+        """
+        if self.mode == "inline" or (
+            payload_size is not None and payload_size < self.inline_threshold
+        ):
+            self._inline_runs += 1
+            return func(*args)
+
+        if self.max_queue_depth and self._pending >= self.max_queue_depth:
+            self._rejected += 1
+            raise CryptoExecutorBusyError("Crypto executor queue is full")
+
+        self._pending += 1
+        self._offloaded_runs += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self._pending -= 1
+
+    def stats(self) -> dict[str, int | str]:
+        """Returns executor counters.
+
+        Returns
+        -------
+        dict[str, int | str]
+            Mode, pending tasks and the number of inline, offloaded and rejected runs.
+        """
+        return {
+            "mode": self.mode,
+            "pending": self._pending,
+            "inline_runs": self._inline_runs,
+            "offloaded_runs": self._offloaded_runs,
+            "rejected": self._rejected,
+        }
+
+    def shutdown(self) -> None:
+        """Shuts down the underlying pool, if it was started."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+crypto_executor = CryptoExecutor.from_config()
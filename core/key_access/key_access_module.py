@@ -4,6 +4,9 @@ from abc import ABC, abstractmethod
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
 
+from core.executor.crypto_executor import crypto_executor
+from core.key_access.key_pool import key_pool
+
 
 class KeyGenerationStrategy(ABC):
     """Base interface for key generation strategies."""
@@ -103,6 +106,14 @@ class Ed25519KeyGenerationStrategy(KeyGenerationStrategy):
     def generate_key(self) -> ed25519.Ed25519PrivateKey:
         return ed25519.Ed25519PrivateKey.generate()
 
+    def serialize_key(self, key: ed25519.Ed25519PrivateKey) -> bytes:
+        # Ed25519 keys have no traditional OpenSSL encoding, only PKCS#8
+        return key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption(),
+        )
+
 
 class HMACKeyGenerationStrategy(KeyGenerationStrategy):
     """Key generation strategy for HMAC."""
@@ -111,6 +122,13 @@ class HMACKeyGenerationStrategy(KeyGenerationStrategy):
         return os.urandom(32)
 
 
+def _generate_serialized_key(strategy: KeyGenerationStrategy) -> bytes:
+    key = strategy.generate_key()
+    if hasattr(strategy, "serialize_key"):
+        key = strategy.serialize_key(key)
+    return key
+
+
 class KeyAccessModule:
     _default_algorithm = "aes256-gcm96"
     _strategies = {
@@ -120,10 +138,10 @@ class KeyAccessModule:
         "rsa-2048": RSAKeyGenerationStrategy(2048),
         "rsa-3072": RSAKeyGenerationStrategy(3072),
         "rsa-4096": RSAKeyGenerationStrategy(4096),
-        # "ed25519": Ed25519KeyGenerationStrategy(),
-        # "ecdsa-p256": ECDSAKeyGenerationStrategy(ec.SECP256R1()),
-        # "ecdsa-p384": ECDSAKeyGenerationStrategy(ec.SECP384R1()),
-        # "ecdsa-p521": ECDSAKeyGenerationStrategy(ec.SECP521R1()),
+        "ed25519": Ed25519KeyGenerationStrategy(),
+        "ecdsa-p256": ECDSAKeyGenerationStrategy(ec.SECP256R1()),
+        "ecdsa-p384": ECDSAKeyGenerationStrategy(ec.SECP384R1()),
+        "ecdsa-p521": ECDSAKeyGenerationStrategy(ec.SECP521R1()),
         # "hmac": HMACKeyGenerationStrategy(),
     }
 
@@ -151,9 +169,9 @@ class KeyAccessModule:
         if not strategy:
             raise ValueError(f"Unsupported algorithm: {algorithm}")
 
-        key_app = strategy.generate_key()
-
-        if hasattr(strategy, "serialize_key"):
-            key_app = strategy.serialize_key(key_app)
+        # Slow keys (RSA) are pre-generated in the background; generate inline only on a miss
+        key_app = key_pool.take(algorithm)
+        if key_app is None:
+            key_app = await crypto_executor.run(_generate_serialized_key, strategy)
 
         return algorithm, key_app
@@ -0,0 +1,199 @@
+import asyncio
+import multiprocessing
+import os
+from collections import deque
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+
+from core.config import Config
+
+
+class KeyPool:
+    """Pool of pre-generated serialized keys, refilled in the background.
+
+    Keys for the pooled algorithms in use are generated in a dedicated low-priority process
+    pool, which is created only once a refill is needed. When the number of ready keys of an
+    algorithm drops below `low_watermark`, the pool is refilled up to `high_watermark`. Taking
+    a key never blocks: an empty pool returns None and the caller generates the key itself.
+    """
+
+    def __init__(
+        self,
+        algorithms: list[str],
+        low_watermark: int = 2,
+        high_watermark: int = 8,
+        max_workers: int = 1,
+    ):
+        """
+        Parameters
+        ----------
+        algorithms : list[str]
+            Algorithms from `KeyAccessModule._strategies` whose keys are pre-generated.
+        low_watermark : int, optional
+            Depth below which a refill starts (default is 2).
+        high_watermark : int, optional
+            Depth up to which the pool is refilled (default is 8).
+        max_workers : int, optional
+            Number of processes generating keys (default is 1).
+
+        Raises
+        ------
+        ValueError
+            If `high_watermark` is lower than `low_watermark`.
+        """
+        if high_watermark < low_watermark:
+            raise ValueError("High watermark must not be lower than low watermark")
+        self.low_watermark = low_watermark
+        self.high_watermark = high_watermark
+        self.max_workers = max_workers
+        self._keys: dict[str, deque[bytes]] = {algorithm: deque() for algorithm in algorithms}
+        self._hits = dict.fromkeys(algorithms, 0)
+        self._misses = dict.fromkeys(algorithms, 0)
+        self._generated = dict.fromkeys(algorithms, 0)
+        self._errors = 0
+        self._refills: dict[str, asyncio.Task] = {}
+        # Algorithms kept filled: those in use at start and those taken since
+        self._active: set[str] = set()
+        self._executor: ProcessPoolExecutor | None = None
+        self._started = False
+
+    @classmethod
+    def from_config(cls) -> "KeyPool":
+        """Creates a pool from the ``KEY_POOL_*`` settings in `Config`."""
+        algorithms = [a.strip() for a in Config.KEY_POOL_ALGORITHMS.split(",") if a.strip()]
+        return cls(
+            algorithms,
+            low_watermark=Config.KEY_POOL_LOW_WATERMARK,
+            high_watermark=Config.KEY_POOL_HIGH_WATERMARK,
+            max_workers=Config.KEY_POOL_WORKERS,
+        )
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Key generation is background work: yield the CPU to request handling
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=os.nice,
+                initargs=(10,),
+            )
+        return self._executor
+
+    def supports(self, algorithm: str) -> bool:
+        """Returns whether keys of `algorithm` are pre-generated."""
+        return algorithm in self._keys
+
+    def start(self, algorithms: Iterable[str] | None = None) -> None:
+        """Starts filling the pool. Must be called from a running event loop.
+
+        Parameters
+        ----------
+        algorithms : Iterable[str], optional
+            Algorithms in use, filled right away (default is None, which fills every pooled
+            algorithm). Other pooled algorithms are filled after their first `take`.
+        """
+        self._started = True
+        in_use = self._keys if algorithms is None else set(algorithms)
+        self._active.update(algorithm for algorithm in in_use if algorithm in self._keys)
+        for algorithm in self._active:
+            self._schedule_refill(algorithm)
+
+    def take(self, algorithm: str) -> bytes | None:
+        """Takes a pre-generated serialized key.
+
+        Parameters
+        ----------
+        algorithm : str
+            The key algorithm.
+
+        Returns
+        -------
+        bytes | None
+            The serialized key, or None if the algorithm is not pooled or no key is ready.
+        """
+        keys = self._keys.get(algorithm)
+        if keys is None:
+            return None
+
+        if keys:
+            key = keys.popleft()
+            self._hits[algorithm] += 1
+        else:
+            key = None
+            self._misses[algorithm] += 1
+        self._active.add(algorithm)
+        self._schedule_refill(algorithm)
+        return key
+
+    def _schedule_refill(self, algorithm: str) -> None:
+        if (
+            self._started
+            and algorithm in self._active
+            and algorithm not in self._refills
+            and len(self._keys[algorithm]) < self.low_watermark
+        ):
+            self._refills[algorithm] = asyncio.create_task(self._refill(algorithm))
+
+    async def _refill(self, algorithm: str) -> None:
+        # Imported here to avoid a circular import with the key access module
+        from core.key_access.key_access_module import KeyAccessModule, _generate_serialized_key
+
+        strategy = KeyAccessModule._strategies[algorithm]
+        keys = self._keys[algorithm]
+        loop = asyncio.get_running_loop()
+        try:
+            while len(keys) < self.high_watermark:
+                key = await loop.run_in_executor(
+                    self._get_executor(), _generate_serialized_key, strategy
+                )
+                keys.append(key)
+                self._generated[algorithm] += 1
+        except Exception:
+            # The next take() schedules a new refill; until then callers generate inline
+            self._errors += 1
+        finally:
+            self._refills.pop(algorithm, None)
+
+    async def join(self) -> None:
+        """Waits for the running refills to finish."""
+        while self._refills:
+            await asyncio.gather(*self._refills.values())
+
+    def stats(self) -> dict:
+        """Returns pool counters.
+
+        Returns
+        -------
+        dict
+            Watermarks, the number of failed refills and, per algorithm, the depth, hits,
+            misses, generated keys and hit ratio.
+        """
+        algorithms = {}
+        for algorithm, keys in self._keys.items():
+            hits, misses = self._hits[algorithm], self._misses[algorithm]
+            algorithms[algorithm] = {
+                "depth": len(keys),
+                "hits": hits,
+                "misses": misses,
+                "generated": self._generated[algorithm],
+                "hit_ratio": hits / (hits + misses) if hits + misses else None,
+            }
+        return {
+            "low_watermark": self.low_watermark,
+            "high_watermark": self.high_watermark,
+            "errors": self._errors,
+            "algorithms": algorithms,
+        }
+
+    def shutdown(self) -> None:
+        """Stops the refills and shuts down the process pool."""
+        self._started = False
+        for task in self._refills.values():
+            task.cancel()
+        self._refills.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+key_pool = KeyPool.from_config()
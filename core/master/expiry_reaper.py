@@ -0,0 +1,94 @@
+import asyncio
+
+from core.config import Config
+from core.db_conn.storage_backend import SecretStorage
+
+
+class ExpiryReaper:
+    """Background removal of secrets whose lease has ended.
+
+    Expired secrets are removed in batches of at most `batch_size`, with a pause between
+    full batches, so a large number of simultaneously expiring secrets never turns into one
+    long transaction. Backends that expire data natively (a TTL index on MongoDB) report
+    nothing to remove and the reaper only wakes up once per `interval`.
+    """
+
+    def __init__(
+        self,
+        storage: SecretStorage,
+        interval: float = 30,
+        batch_size: int = 500,
+        batch_pause: float = 0.1,
+    ):
+        """
+        Parameters
+        ----------
+        storage : SecretStorage
+            The storage to remove expired secrets from.
+        interval : float, optional
+            Seconds between checks once no expired secrets are left (default is 30).
+        batch_size : int, optional
+            The maximum number of secrets removed by one query (default is 500).
+        batch_pause : float, optional
+            Seconds between full batches (default is 0.1).
+        """
+        self.storage = storage
+        self.interval = interval
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+        self._task: asyncio.Task | None = None
+        self._reaped = 0
+        self._batches = 0
+        self._errors = 0
+
+    @classmethod
+    def from_config(cls, storage: SecretStorage) -> "ExpiryReaper":
+        """Creates a reaper from the ``LEASE_REAPER_*`` settings in `Config`."""
+        return cls(
+            storage,
+            interval=Config.LEASE_REAPER_INTERVAL,
+            batch_size=Config.LEASE_REAPER_BATCH_SIZE,
+            batch_pause=Config.LEASE_REAPER_BATCH_PAUSE,
+        )
+
+    def start(self) -> None:
+        """Starts the reaper. Must be called from a running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def reap(self) -> int:
+        """Removes expired secrets batch by batch until none are left.
+
+        Returns
+        -------
+        int
+            The number of removed secrets.
+        """
+        reaped = 0
+        while True:
+            removed = await self.storage.reap_expired(self.batch_size)
+            self._batches += 1
+            self._reaped += removed
+            reaped += removed
+            if removed < self.batch_size:
+                return reaped
+            await asyncio.sleep(self.batch_pause)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.reap()
+            except Exception:
+                # The remaining secrets are removed on the next run
+                self._errors += 1
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> dict[str, int]:
+        """Returns the numbers of removed secrets, executed batches and failed runs."""
+        return {"reaped": self._reaped, "batches": self._batches, "errors": self._errors}
+
+    def shutdown(self) -> None:
+        """Stops the reaper."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
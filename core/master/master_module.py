@@ -1,6 +1,19 @@
-from core.db_conn.storage_backend import SecretStorage
+import asyncio
+import base64
+import json
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime, timedelta
+from uuid import uuid4
+
+from core.cache import LRUCache
+from core.config import Config
+from core.db_conn.storage_backend import BlobManifest, SecretStorage
 from core.key_access.key_access_module import KeyAccessModule
-from core.secret_engines.secret_module import SecretEngineModule
+from core.master.expiry_reaper import ExpiryReaper
+from core.master.secret_watcher import SecretWatcher
+from core.secret_engines.secret_module import RSAEncryptionStrategy, SecretEngineModule
+from core.secret_engines.signing_module import SigningEngineModule
+from core.secret_engines.stream_module import StreamCipher
 
 
 class SecretManagerModule:
@@ -12,13 +25,207 @@ class SecretManagerModule:
         - SecretStorage for managing secret data.
         - KeyAccessModule for generating and managing application keys.
         - SecretEngineModule for encrypting and decrypting secret values.
+        - SigningEngineModule for signing data with applications' signing keys.
+        - A TTL+LRU cache of application keys, so that the hot path does not read the key
+          from the database on every request. Keys are cached wrapped with the master key.
+        - An optional TTL+LRU cache of decrypted secrets for frequently read values, disabled
+          when ``SECRET_CACHE_SIZE`` is 0 and for namespaces in
+          ``SECRET_CACHE_EXCLUDED_NAMESPACES``.
+        - SecretWatcher notifying subscribers of secret version changes. While it runs,
+          changes made by other instances also drop the cached decrypted secrets.
+        - ExpiryReaper removing secrets whose lease has ended, once started.
         """
         self.secret_storage = SecretStorage()
         self.key_access = KeyAccessModule()
         self.secret_engine = SecretEngineModule()
+        self.signing_engine = SigningEngineModule()
+        self._app_key_cache = LRUCache(Config.APP_KEY_CACHE_SIZE, ttl=Config.APP_KEY_CACHE_TTL)
+        self._app_key_invalidations = 0
+        self._app_key_creations: dict[str, asyncio.Task] = {}
+        self._secret_cache = LRUCache(Config.SECRET_CACHE_SIZE, ttl=Config.SECRET_CACHE_TTL)
+        self._secret_cache_invalidations = 0
+        self._secret_cache_excluded_namespaces = {
+            namespace.strip()
+            for namespace in Config.SECRET_CACHE_EXCLUDED_NAMESPACES.split(",")
+            if namespace.strip()
+        }
+        self.secret_storage.add_key_change_listener(self._on_app_key_changed)
+        self.secret_watcher = SecretWatcher(self.secret_storage, Config.WATCH_QUEUE_SIZE)
+        self.secret_watcher.add_listener(self._on_secret_changed)
+        self.expiry_reaper = ExpiryReaper.from_config(self.secret_storage)
+
+    def _on_app_key_changed(self, app_id: str, old_stored_key: bytes) -> None:
+        """Drop cached objects derived from an application key that was replaced or deleted.
+
+        Parameters
+        ----------
+        app_id : str
+            ID of the application.
+        old_stored_key : bytes
+            The previous key in its stored (possibly wrapped) form.
+        """
+        self._app_key_cache.invalidate(app_id)
+        self._app_key_invalidations += 1
+        self._invalidate_secrets(app_id)
+        old_key = self.secret_engine.unwrap_app_key(old_stored_key)
+        RSAEncryptionStrategy.invalidate_key(old_key)
+        SigningEngineModule.invalidate_key(old_key)
+
+    def _on_secret_changed(self, change: dict) -> None:
+        """Drop the cached decrypted value of a secret that changed in the storage.
+
+        Parameters
+        ----------
+        change : dict
+            The change produced by the storage, see `SecretStorage.watch_changes`.
+        """
+        self._invalidate_secrets(change["application_id"], [change["key"]])
+
+    def app_key_cache_stats(self) -> dict[str, int | float | None]:
+        """Returns application key cache counters.
+
+        Returns
+        -------
+        dict[str, int | float | None]
+            The `LRUCache.stats` counters and the hit rate, or None before the first lookup.
+        """
+        stats = self._app_key_cache.stats()
+        lookups = stats["hits"] + stats["misses"]
+        return {**stats, "hit_rate": stats["hits"] / lookups if lookups else None}
+
+    def secret_cache_allowed(self, namespace_id: str | None) -> bool:
+        """Returns whether decrypted secrets of applications in the namespace may be cached.
+
+        Parameters
+        ----------
+        namespace_id : str, optional
+            ID of the namespace of the application.
+        """
+        return (
+            self._secret_cache.max_size > 0
+            and str(namespace_id) not in self._secret_cache_excluded_namespaces
+        )
+
+    def secret_cache_stats(self) -> dict[str, int | float | None]:
+        """Returns decrypted secret cache counters.
+
+        Returns
+        -------
+        dict[str, int | float | None]
+            The `LRUCache.stats` counters and the hit rate, or None before the first lookup.
+        """
+        stats = self._secret_cache.stats()
+        lookups = stats["hits"] + stats["misses"]
+        return {**stats, "hit_rate": stats["hits"] / lookups if lookups else None}
+
+    def _invalidate_secrets(self, app_id: str, keys: list[str] | None = None) -> None:
+        """Drop cached decrypted secrets of an application.
+
+        Parameters
+        ----------
+        app_id : str
+            ID of the application.
+        keys : list[str], optional
+            The keys of the secrets (default is None, which drops every secret).
+        """
+        self._secret_cache_invalidations += 1
+        if keys is None:
+            self._secret_cache.invalidate_matching(lambda cache_key: cache_key[0] == app_id)
+        else:
+            for key in keys:
+                self._secret_cache.invalidate((app_id, key))
+
+    async def _read_stored_key(self, app_id: str) -> bytes | None:
+        """Return the stored application key, from the cache when possible.
+
+        Parameters
+        ----------
+        app_id : str
+            ID of the application.
+
+        Returns
+        -------
+        bytes | None
+            The key wrapped with the master key, or None if the application has no key yet.
+        """
+        stored_key = self._app_key_cache.get(app_id)
+        if stored_key is not None:
+            return stored_key
+
+        invalidations = self._app_key_invalidations
+        stored_key = await self.secret_storage._read_key_app(app_id)
+        if not stored_key:
+            return None
+        if not self.secret_engine.is_wrapped_key(stored_key):
+            # Raw keys of double encryption mode are not kept in memory unprotected
+            stored_key = self.secret_engine.wrap_app_key(stored_key)
+        # A key replaced while it was being read must not be put back into the cache
+        if invalidations == self._app_key_invalidations:
+            self._app_key_cache.put(app_id, stored_key)
+        return stored_key
+
+    async def _get_app_key(self, app_id: str, algorithm: str | None) -> bytes:
+        """Return the raw application key, generating and storing it on first use.
+
+        In key wrapping mode the key is stored wrapped with the master key. Concurrent first
+        requests for an application share a single key creation.
+
+        Parameters
+        ----------
+        app_id : str
+            ID of the application.
+        algorithm : str, optional
+            The encryption algorithm used to generate a new key.
+
+        Returns
+        -------
+        bytes
+            The raw application key.
+        """
+        stored_key = await self._read_stored_key(app_id)
+        if stored_key:
+            return self.secret_engine.unwrap_app_key(stored_key)
+
+        creation = self._app_key_creations.get(app_id)
+        if creation is None:
+            creation = asyncio.create_task(self._create_app_key(app_id, algorithm))
+            self._app_key_creations[app_id] = creation
+            creation.add_done_callback(lambda _: self._app_key_creations.pop(app_id, None))
+        # A cancelled waiter must not cancel the creation other requests are waiting for
+        return await asyncio.shield(creation)
+
+    async def _create_app_key(self, app_id: str, algorithm: str | None) -> bytes:
+        """Generate and store a new application key.
+
+        Parameters
+        ----------
+        app_id : str
+            ID of the application.
+        algorithm : str, optional
+            The encryption algorithm used to generate the key.
+
+        Returns
+        -------
+        bytes
+            The raw application key. If another instance stored a key first, that key is
+            returned instead of the generated one.
+        """
+        _, app_key = await self.key_access.generate_app_key(algorithm=algorithm)
+        if self.secret_engine.key_wrapping:
+            stored_key = self.secret_engine.wrap_app_key(app_key)
+        else:
+            stored_key = app_key
+        stored_key = await self.secret_storage._write_key_app(app_id, stored_key)
+        return self.secret_engine.unwrap_app_key(stored_key)
 
     async def process_request(
-        self, app_id: str, data: dict[str, str] | str, algorithm: str = None
+        self,
+        app_id: str,
+        data: dict[str, str] | str,
+        algorithm: str = None,
+        decode: bool = True,
+        cache: bool = False,
+        ttl: int | None = None,
     ) -> dict[str, str]:
         """
         Process a request from another module.
@@ -32,51 +239,54 @@ class SecretManagerModule:
             retrieving a secret.
         algorithm : str, optional
             The encryption algorithm to use (default is None).
+        decode : bool, optional
+            Whether a retrieved secret is decoded to `str` (default is True). See
+            `retrieve_secret`.
+        cache : bool, optional
+            Whether a retrieved secret may be served from and stored in the decrypted secret
+            cache (default is False). See `secret_cache_allowed`.
+        ttl : int, optional
+            Lease of saved secrets in seconds (default is None, which never expires).
 
         Returns
         -------
         dict[str, str]
             Result from the secret engine, either a success status or the retrieved secret.
         """
+        if cache and not isinstance(data, dict):
+            value = self._secret_cache.get((app_id, data))
+            if value is not None:
+                return {data: value.decode() if decode else value}
 
-        app_key = await self.secret_storage._read_key_app(app_id)
-
-        if not app_key:
-            algorithm, app_key = await self.key_access.generate_app_key(algorithm=algorithm)
-            await self.secret_storage._write_key_app(app_id, app_key)
+        algorithm = algorithm or self.key_access._default_algorithm
+        app_key = await self._get_app_key(app_id, algorithm)
 
         if isinstance(data, dict):
             try:
-                # Attempt to save all secrets
-                result = await self.save_secrets(app_id, app_key, data, algorithm)
-            except Exception as e:
-                # If there is an error, you might want to handle a rollback
-                await self.rollback_secrets(app_id, data)
+                # The secrets are written all or nothing, so a rejected batch leaves nothing behind
+                result = await self.save_secrets(app_id, app_key, data, algorithm, ttl)
+            except ValueError as e:
+                # Storage failures (RuntimeError) propagate to the caller
                 return {"error": str(e)}
         else:
-            result = await self.retrieve_secret(app_id, app_key, data, algorithm)
+            result = await self.retrieve_secret(app_id, app_key, data, algorithm, decode, cache)
 
         return result
 
-    async def rollback_secrets(self, app_id: str, secrets: dict[str, str]) -> None:
-        """Rollback the changes made during a save operation.
-
-        Parameters
-        ----------
-        app_id : str
-            ID of the application.
-        secrets : dict[str, str]
-            The secrets that were attempted to be saved.
-        """
-        for key in secrets.keys():
-            await self.secret_storage.delete_data(app_id, key)
-
     async def save_secrets(
-        self, app_id: str, app_key: bytes, secrets: dict[str, str], algorithm: str
+        self,
+        app_id: str,
+        app_key: bytes,
+        secrets: dict[str, str],
+        algorithm: str,
+        ttl: int | None = None,
     ) -> dict[str, str]:
         """
         Save secrets using the secret engine.
 
+        All values are encrypted in one batch and written in one storage call: either every
+        secret is saved or none is.
+
         Parameters
         ----------
         app_id : str
@@ -87,22 +297,36 @@ class SecretManagerModule:
             Dictionary containing keys and their corresponding secret values.
         algorithm : str
             The encryption algorithm to use for encrypting the secrets.
+        ttl : int, optional
+            Lease of the secrets in seconds (default is None, which never expires).
 
         Returns
         -------
         dict[str, str]
             Status indicating the success of the operation.
         """
-        for key, value in secrets.items():
-            encrypted_key_value = await self.secret_engine.encrypt(
-                algorithm=algorithm, key=app_key, value=value.encode()
-            )
-            await self.secret_storage.write_data(app_id, key, encrypted_key_value)
-
-        return {"status": "success"}
+        encrypted_values = await self.secret_engine.encrypt_many(
+            algorithm=algorithm,
+            key=app_key,
+            values=[value.encode() for value in secrets.values()],
+            fan_out=True,
+        )
+        expires_at = datetime.now(UTC) + timedelta(seconds=ttl) if ttl else None
+        result = await self.secret_storage.write_many(
+            app_id, dict(zip(secrets.keys(), encrypted_values)), expires_at
+        )
+        # Invalidated after the write: a read racing with it may have cached the old value
+        self._invalidate_secrets(app_id, list(secrets))
+        return result
 
     async def retrieve_secret(
-        self, app_id: str, app_key: bytes, key: str, algorithm: str
+        self,
+        app_id: str,
+        app_key: bytes,
+        key: str,
+        algorithm: str,
+        decode: bool = True,
+        cache: bool = False,
     ) -> dict[str, str]:
         """
         Retrieve a secret from the secret engine.
@@ -117,21 +341,529 @@ class SecretManagerModule:
             The key for the secret to be retrieved.
         algorithm : str
             The encryption algorithm used for decrypting the secret.
+        decode : bool, optional
+            Whether to decode the secret to `str` (default is True). Otherwise the decrypted
+            buffer is returned as is, to be written to the response without copies.
+        cache : bool, optional
+            Whether to store the decrypted secret in the decrypted secret cache (default is
+            False).
 
         Returns
         -------
         dict[str, str]
             The decrypted secret or an error message if the secret is not found.
         """
+        invalidations = self._secret_cache_invalidations
         encrypted_value = await self.secret_storage.read_data(app_id, key)
 
+        if isinstance(encrypted_value, BlobManifest):
+            return {"error": "Secret is a blob, use the blobs endpoint"}
         if encrypted_value:
             decrypted_value = await self.secret_engine.decrypt(
                 algorithm=algorithm, key=app_key, encrypted_value=encrypted_value
             )
-            return {key: decrypted_value.decode()}
+            # A secret changed while it was being read must not be put into the cache
+            if cache and invalidations == self._secret_cache_invalidations:
+                decrypted_value = bytes(decrypted_value)
+                self._secret_cache.put((app_id, key), decrypted_value)
+            return {key: decrypted_value.decode() if decode else decrypted_value}
+        else:
+            return {"error": "Secret not found"}
+
+    async def retrieve_secrets(
+        self,
+        app_id: str,
+        keys: list[str] | None = None,
+        algorithm: str | None = None,
+        decode: bool = True,
+    ) -> dict[str, dict[str, str] | list[str]]:
+        """
+        Retrieve several secrets in one storage query and one decryption batch.
+
+        Parameters
+        ----------
+        app_id : str
+            ID of the application.
+        keys : list[str], optional
+            The keys of the secrets (default is None, which retrieves every secret).
+        algorithm : str, optional
+            The encryption algorithm of the application (default is None).
+        decode : bool, optional
+            Whether to decode the secrets to `str` (default is True). See `retrieve_secret`.
+
+        Returns
+        -------
+        dict[str, dict[str, str] | list[str]]
+            The decrypted secrets by key under ``secrets``, the requested keys that were not
+            found under ``missing`` and the keys holding blobs under ``blobs``.
+        """
+        algorithm = algorithm or self.key_access._default_algorithm
+        stored_key = await self._read_stored_key(app_id)
+        stored_values = await self.secret_storage.read_many(app_id, keys) if stored_key else {}
+        missing = [key for key in keys or () if key not in stored_values]
+        # Blob manifests are not decrypted: the storage marks them
+        blobs = [key for key, value in stored_values.items() if isinstance(value, BlobManifest)]
+        encrypted_values = {
+            key: value
+            for key, value in stored_values.items()
+            if not isinstance(value, BlobManifest)
+        }
+        if not encrypted_values:
+            return {"secrets": {}, "missing": missing, "blobs": blobs}
+
+        decrypted_values = await self.secret_engine.decrypt_many(
+            algorithm,
+            self.secret_engine.unwrap_app_key(stored_key),
+            list(encrypted_values.values()),
+            fan_out=True,
+        )
+        secrets = {
+            key: value.decode() if decode else value
+            for key, value in zip(encrypted_values, decrypted_values)
+        }
+        return {"secrets": secrets, "missing": missing, "blobs": blobs}
+
+    async def list_secret_versions(
+        self, app_id: str, key: str, before_version: int | None = None, limit: int = 50
+    ) -> dict[str, list[dict] | int | None]:
+        """
+        List the versions of a secret, newest first, one page at a time.
+
+        Parameters
+        ----------
+        app_id : str
+            ID of the application.
+        key : str
+            The key of the secret.
+        before_version : int, optional
+            The ``next_before`` value of the previous page (default is None, which starts from
+            the newest version).
+        limit : int, optional
+            The maximum number of versions in the page (default is 50).
+
+        Returns
+        -------
+        dict[str, list[dict] | int | None]
+            The versions under ``versions`` and the cursor of the next page under
+            ``next_before``, None on the last page.
+        """
+        # One extra version tells whether another page exists without a count query
+        versions = await self.secret_storage.list_versions(app_id, key, before_version, limit + 1)
+        next_before = versions[limit - 1]["version"] if len(versions) > limit else None
+        return {"versions": versions[:limit], "next_before": next_before}
+
+    async def retrieve_secret_version(
+        self,
+        app_id: str,
+        key: str,
+        version: int | None = None,
+        as_of: datetime | None = None,
+        algorithm: str | None = None,
+        decode: bool = True,
+    ) -> dict[str, str]:
+        """
+        Retrieve a specific version of a secret, or the version current at a point in time.
+
+        Historical reads bypass the decrypted secret cache.
+
+        Parameters
+        ----------
+        app_id : str
+            ID of the application.
+        key : str
+            The key of the secret.
+        version : int, optional
+            The version to retrieve.
+        as_of : datetime, optional
+            The point in time, used when `version` is not given.
+        algorithm : str, optional
+            The encryption algorithm of the application (default is None).
+        decode : bool, optional
+            Whether to decode the secret to `str` (default is True). See `retrieve_secret`.
+
+        Returns
+        -------
+        dict[str, str]
+            The decrypted secret or an error message if the version is not found.
+        """
+        algorithm = algorithm or self.key_access._default_algorithm
+        stored_key = await self._read_stored_key(app_id)
+        if not stored_key:
+            return {"error": "Secret not found"}
+        if version is not None:
+            encrypted_value = await self.secret_storage.read_version(app_id, key, version)
         else:
+            encrypted_value = await self.secret_storage.read_as_of(app_id, key, as_of)
+        if not encrypted_value:
             return {"error": "Secret not found"}
+        if isinstance(encrypted_value, BlobManifest):
+            return {"error": "Secret is a blob, use the blobs endpoint"}
+
+        decrypted_value = await self.secret_engine.decrypt(
+            algorithm=algorithm,
+            key=self.secret_engine.unwrap_app_key(stored_key),
+            encrypted_value=encrypted_value,
+        )
+        return {key: decrypted_value.decode() if decode else decrypted_value}
+
+    async def transit_encrypt(
+        self, app_id: str, plaintexts: list[bytes], algorithm: str | None = None
+    ) -> list[bytes]:
+        """
+        Encrypt caller-supplied values with the application key without storing them.
+
+        The whole batch is encrypted in one pass: the key is read once and the engine
+        reuses key-scheduled contexts across the batch.
+
+        Parameters
+        ----------
+        app_id : str
+            ID of the application.
+        plaintexts : list[bytes]
+            The values to encrypt.
+        algorithm : str, optional
+            The encryption algorithm of the application (default is None).
+
+        Returns
+        -------
+        list[bytes]
+            The encrypted values, in the same order as `plaintexts`.
+        """
+        algorithm = algorithm or self.key_access._default_algorithm
+        app_key = await self._get_app_key(app_id, algorithm)
+        return await self.secret_engine.encrypt_many(algorithm, app_key, plaintexts, fan_out=True)
+
+    async def transit_decrypt(
+        self, app_id: str, ciphertexts: list[bytes], algorithm: str | None = None
+    ) -> list[bytes]:
+        """
+        Decrypt values produced by `transit_encrypt`.
+
+        Parameters
+        ----------
+        app_id : str
+            ID of the application.
+        ciphertexts : list[bytes]
+            The values to decrypt.
+        algorithm : str, optional
+            The encryption algorithm of the application (default is None).
+
+        Returns
+        -------
+        list[bytes]
+            The decrypted values, in the same order as `ciphertexts`.
+        """
+        algorithm = algorithm or self.key_access._default_algorithm
+        app_key = await self._get_app_key(app_id, algorithm)
+        return await self.secret_engine.decrypt_many(algorithm, app_key, ciphertexts, fan_out=True)
+
+    async def sign(self, app_id: str, messages: list[bytes], algorithm: str) -> list[bytes]:
+        """
+        Sign a batch of messages with the application's signing key.
+
+        Parameters
+        ----------
+        app_id : str
+            ID of the application.
+        messages : list[bytes]
+            The data to be signed, e.g. artifact digests.
+        algorithm : str
+            The signing algorithm of the application.
+
+        Returns
+        -------
+        list[bytes]
+            The signatures, in the same order as `messages`.
+        """
+        app_key = await self._get_app_key(app_id, algorithm)
+        return await self.signing_engine.sign_many(algorithm, app_key, messages)
+
+    async def verify(
+        self, app_id: str, messages: list[bytes], signatures: list[bytes], algorithm: str
+    ) -> list[bool]:
+        """
+        Verify a batch of signatures made with the application's signing key.
+
+        Parameters
+        ----------
+        app_id : str
+            ID of the application.
+        messages : list[bytes]
+            The signed data.
+        signatures : list[bytes]
+            The signatures, one per message.
+        algorithm : str
+            The signing algorithm of the application.
+
+        Returns
+        -------
+        list[bool]
+            Whether each signature is valid.
+        """
+        app_key = await self._get_app_key(app_id, algorithm)
+        return await self.signing_engine.verify_many(algorithm, app_key, messages, signatures)
+
+    async def get_public_key(self, app_id: str, algorithm: str) -> bytes:
+        """
+        Return the public part of the application's signing key.
+
+        Parameters
+        ----------
+        app_id : str
+            ID of the application.
+        algorithm : str
+            The signing algorithm of the application.
+
+        Returns
+        -------
+        bytes
+            The PEM encoded public key.
+        """
+        app_key = await self._get_app_key(app_id, algorithm)
+        return self.signing_engine.public_key(app_key)
+
+    async def renew_secret(self, app_id: str, key: str, ttl: int) -> datetime | None:
+        """
+        Extend the lease of a secret.
+
+        Parameters
+        ----------
+        app_id : str
+            ID of the application.
+        key : str
+            The key of the secret.
+        ttl : int
+            The new lease in seconds, counted from now.
+
+        Returns
+        -------
+        datetime | None
+            The new end of the lease, or None if there is no live secret with the key.
+        """
+        expires_at = datetime.now(UTC) + timedelta(seconds=ttl)
+        if not await self.secret_storage.set_expiry(app_id, key, expires_at):
+            return None
+        return expires_at
+
+    async def revoke_secret(self, app_id: str, key: str) -> bool:
+        """
+        End the lease of a secret now. The secret stops being readable immediately and is
+        removed by the expiry reaper or the storage's TTL index.
+
+        Parameters
+        ----------
+        app_id : str
+            ID of the application.
+        key : str
+            The key of the secret.
+
+        Returns
+        -------
+        bool
+            Whether a live secret with the key was found.
+        """
+        found = await self.secret_storage.set_expiry(app_id, key, datetime.now(UTC))
+        self._invalidate_secrets(app_id, [key])
+        return found
 
     async def delete_secret(self, app_id: str, key: str):
         await self.secret_storage.delete_data(app_id, key)
+        self._invalidate_secrets(app_id, [key])
+
+    async def migrate_key_wrapping(self, app_id: str, algorithm: str) -> dict[str, int]:
+        """Migrate an application from double encryption to the key wrapping layout.
+
+        Wraps the stored application key with the master key and re-seals every
+        double-encrypted value with the application key only. Values of algorithms without
+        authentication are moved to the double layout instead, since only the master layer
+        detects their tampering. Values already in the target layout are skipped, so the
+        migration can be interrupted and run again. Runs only with ``KEY_WRAPPING_MODE=wrap``,
+        otherwise values would be sealed in both layers again.
+
+        Parameters
+        ----------
+        app_id : str
+            ID of the application.
+        algorithm : str
+            The encryption algorithm of the application.
+
+        Returns
+        -------
+        dict[str, int]
+            Number of migrated and skipped secrets.
+
+        Raises
+        ------
+        RuntimeError
+            If the engine is not in key wrapping mode.
+        """
+        if not self.secret_engine.key_wrapping:
+            raise RuntimeError("Key wrapping migration requires KEY_WRAPPING_MODE=wrap")
+
+        stored_key = await self.secret_storage._read_key_app(app_id)
+        if not stored_key:
+            return {"migrated": 0, "skipped": 0}
+
+        app_key = self.secret_engine.unwrap_app_key(stored_key)
+        if not self.secret_engine.is_wrapped_key(stored_key):
+            await self.secret_storage._update_key_app(
+                app_id, self.secret_engine.wrap_app_key(app_key)
+            )
+
+        single_layer = self.secret_engine.seals_single_layer(algorithm)
+        migrated = skipped = 0
+        for key in await self.secret_storage.list_secret_keys(app_id):
+            encrypted_value = await self.secret_storage.read_data(app_id, key)
+            if (
+                not encrypted_value
+                or self.secret_engine.is_single_layer(encrypted_value) == single_layer
+            ):
+                skipped += 1
+                continue
+            value = await self.secret_engine.decrypt(algorithm, app_key, encrypted_value)
+            blob_id = (
+                json.loads(value)["blob_id"] if isinstance(encrypted_value, BlobManifest) else None
+            )
+            await self.secret_storage.put_data(
+                app_id,
+                key,
+                await self.secret_engine.encrypt(algorithm, app_key, value),
+                blob_id=blob_id,
+            )
+            migrated += 1
+
+        return {"migrated": migrated, "skipped": skipped}
+
+    async def save_blob(
+        self, app_id: str, key: str, stream: AsyncIterator[bytes], algorithm: str | None = None
+    ) -> dict[str, str | int]:
+        """
+        Save a large secret from a stream, encrypting it chunk by chunk.
+
+        The blob is sealed with a fresh data key using the STREAM construction and each chunk
+        is stored as a separate record. The data key and chunk layout are kept in a manifest,
+        encrypted with the application key and stored as a secret version that the storage
+        marks as a blob manifest. The chunks of the blob it replaces are deleted by the
+        storage once the new manifest is stored.
+
+        Parameters
+        ----------
+        app_id : str
+            ID of the application.
+        key : str
+            The key of the secret.
+        stream : AsyncIterator[bytes]
+            The plaintext blob, in pieces of any size.
+        algorithm : str, optional
+            The encryption algorithm of the application (default is None).
+
+        Returns
+        -------
+        dict[str, str | int]
+            Status and the size of the stored blob in bytes.
+        """
+        algorithm = algorithm or self.key_access._default_algorithm
+        app_key = await self._get_app_key(app_id, algorithm)
+        cipher = StreamCipher.generate()
+        blob_id = uuid4().hex
+        size = 0
+
+        async def counted_stream() -> AsyncIterator[bytes]:
+            nonlocal size
+            async for piece in stream:
+                size += len(piece)
+                yield piece
+
+        try:
+            chunk_count = await self.secret_storage.write_blob_chunks(
+                app_id, blob_id, cipher.encrypt_stream(counted_stream(), Config.BLOB_CHUNK_SIZE)
+            )
+        except Exception:
+            await self.secret_storage.delete_blob_chunks(app_id, blob_id)
+            raise
+
+        manifest = {
+            "blob_id": blob_id,
+            "data_key": base64.b64encode(cipher.data_key).decode(),
+            "nonce_prefix": base64.b64encode(cipher.nonce_prefix).decode(),
+            "chunk_count": chunk_count,
+            "size": size,
+        }
+        encrypted_manifest = await self.secret_engine.encrypt(
+            algorithm=algorithm, key=app_key, value=json.dumps(manifest).encode()
+        )
+        await self.secret_storage.put_data(app_id, key, encrypted_manifest, blob_id=blob_id)
+        self._invalidate_secrets(app_id, [key])
+
+        return {"status": "success", "size": size}
+
+    async def open_blob(
+        self, app_id: str, key: str, algorithm: str | None = None
+    ) -> tuple[int, AsyncIterator[bytes]] | None:
+        """
+        Open a blob for streaming download.
+
+        Only the manifest is decrypted up front; chunks are read and decrypted lazily while
+        the returned iterator is consumed.
+
+        Parameters
+        ----------
+        app_id : str
+            ID of the application.
+        key : str
+            The key of the secret.
+        algorithm : str, optional
+            The encryption algorithm of the application (default is None).
+
+        Returns
+        -------
+        tuple[int, AsyncIterator[bytes]] | None
+            The blob size and an iterator over plaintext chunks, or None if there is no blob
+            with this key.
+        """
+        manifest = await self._read_blob_manifest(app_id, key, algorithm)
+        if manifest is None:
+            return None
+
+        cipher = StreamCipher(
+            base64.b64decode(manifest["data_key"]), base64.b64decode(manifest["nonce_prefix"])
+        )
+        chunks = self.secret_storage.read_blob_chunks(app_id, manifest["blob_id"])
+        return manifest["size"], cipher.decrypt_stream(chunks, manifest["chunk_count"])
+
+    async def delete_blob(self, app_id: str, key: str, algorithm: str | None = None) -> None:
+        """
+        Delete a blob and the chunks of all its versions.
+
+        Parameters
+        ----------
+        app_id : str
+            ID of the application.
+        key : str
+            The key of the secret.
+        algorithm : str, optional
+            The encryption algorithm of the application (default is None).
+        """
+        manifest = await self._read_blob_manifest(app_id, key, algorithm)
+        if manifest is None:
+            raise ValueError(f"Blob '{key}' not found")
+        # The storage deletes the chunks of every manifest version; the chunks of the latest
+        # one are deleted explicitly, since manifests stored before blob IDs were recorded
+        # are not linked to them
+        await self.secret_storage.delete_data(app_id, key)
+        await self.secret_storage.delete_blob_chunks(app_id, manifest["blob_id"])
+
+    async def _read_blob_manifest(
+        self, app_id: str, key: str, algorithm: str | None
+    ) -> dict | None:
+        stored_key = await self._read_stored_key(app_id)
+        encrypted_manifest = await self.secret_storage.read_data(app_id, key)
+        if not stored_key or not isinstance(encrypted_manifest, BlobManifest):
+            return None
+
+        manifest = await self.secret_engine.decrypt(
+            algorithm=algorithm or self.key_access._default_algorithm,
+            key=self.secret_engine.unwrap_app_key(stored_key),
+            encrypted_value=encrypted_manifest,
+        )
+        return json.loads(manifest)
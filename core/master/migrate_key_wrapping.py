@@ -0,0 +1,31 @@
+"""Migrate applications from double encryption to the key wrapping layout.
+
+Usage: python -m core.master.migrate_key_wrapping [APPLICATION_ID ...]
+
+Without arguments every application is migrated. Requires ``KEY_WRAPPING_MODE=wrap``. The
+migration is idempotent and can be re-run after an interruption.
+"""
+
+import asyncio
+import sys
+
+from bson import ObjectId
+
+from auth.db import db
+from core.config import Config
+from core.master.master_module import SecretManagerModule
+
+
+async def migrate(application_ids: list[str]) -> None:
+    secret_manager = SecretManagerModule()
+    query = {"_id": {"$in": [ObjectId(app_id) for app_id in application_ids]}}
+    async for application in db.applications.find(query if application_ids else {}):
+        app_id = str(application["_id"])
+        result = await secret_manager.migrate_key_wrapping(app_id, application["algorithm"])
+        print(f"{app_id}: migrated={result['migrated']} skipped={result['skipped']}")
+
+
+if __name__ == "__main__":
+    if Config.KEY_WRAPPING_MODE != "wrap":
+        sys.exit("Set KEY_WRAPPING_MODE=wrap before migrating, otherwise values are sealed twice.")
+    asyncio.run(migrate(sys.argv[1:]))
@@ -0,0 +1,195 @@
+"""Re-encrypt stored data with the active master key after a master key rotation.
+
+Usage: python -m core.master.rewrap_master_key [--batch-size N] [--concurrency N]
+                                               [--max-rate N] [--restart]
+
+Rotation steps:
+1. Add the new key to ``MASTER_KEYS`` on every node, keeping the old one, and make it active
+   (the highest version is active unless ``MASTER_KEY_VERSION`` is set).
+2. Run this job. Application keys and the master layer of secret values are re-encrypted;
+   application-level ciphertexts are not touched.
+3. Once the job reports ``done`` for every collection, remove the old key.
+
+Progress is checkpointed after every batch, so an interrupted job resumes where it stopped.
+"""
+
+import argparse
+import asyncio
+import time
+from collections import deque
+from collections.abc import Callable
+
+from core.config import Config
+from core.db_conn.storage_backend import SecretStorage
+from core.secret_engines.secret_module import SecretEngineModule
+
+
+class MasterKeyRewrapJob:
+    """Streams stored values through a cursor and re-encrypts them with the active master key.
+
+    Up to `concurrency` batches are processed at once: each batch is re-encrypted on the
+    crypto executor and written back with one bulk compare-and-set operation. The checkpoint
+    only advances past batches whose predecessors have all completed, so after a failure no
+    record before the checkpoint is left under an old key. The scan is throttled to
+    `max_rate` records per second to leave capacity for serving traffic.
+    """
+
+    COLLECTIONS = ("apps_keys", "secrets")
+
+    def __init__(
+        self,
+        secret_storage: SecretStorage,
+        secret_engine: SecretEngineModule,
+        batch_size: int = Config.MASTER_REWRAP_BATCH_SIZE,
+        concurrency: int = Config.MASTER_REWRAP_CONCURRENCY,
+        max_rate: float = Config.MASTER_REWRAP_MAX_RATE,
+        progress: Callable[[dict], None] | None = None,
+    ):
+        """
+        Parameters
+        ----------
+        secret_storage : SecretStorage
+            The storage holding the secrets and application keys.
+        secret_engine : SecretEngineModule
+            The engine configured with the new master key as the active version.
+        batch_size : int, optional
+            Records per batch.
+        concurrency : int, optional
+            Maximum number of batches processed at once.
+        max_rate : float, optional
+            Maximum number of scanned records per second; 0 disables throttling.
+        progress : Callable[[dict], None], optional
+            Called with the collection state after every checkpoint.
+        """
+        self.secret_storage = secret_storage
+        self.secret_engine = secret_engine
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_rate = max_rate
+        self.progress = progress
+
+    def _checkpoint_name(self, collection: str) -> str:
+        return f"master_rewrap:{collection}:v{self.secret_engine.master_key_version}"
+
+    async def run(self, restart: bool = False) -> dict[str, dict]:
+        """Re-encrypts every collection.
+
+        Parameters
+        ----------
+        restart : bool, optional
+            Whether to ignore saved checkpoints and scan from the beginning (default is
+            False).
+
+        Returns
+        -------
+        dict[str, dict]
+            The final state of each collection: ``scanned``, ``rewrapped`` and ``conflicts``
+            (records changed concurrently, which are already under the active key).
+        """
+        return {
+            collection: await self._run_collection(collection, restart)
+            for collection in self.COLLECTIONS
+        }
+
+    async def _run_collection(self, collection: str, restart: bool) -> dict:
+        name = self._checkpoint_name(collection)
+        state = None if restart else await self.secret_storage.read_checkpoint(name)
+        if state is None:
+            state = {"last_id": None, "scanned": 0, "rewrapped": 0, "conflicts": 0}
+        if state.get("done"):
+            return state
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        pending: deque[tuple[asyncio.Task, str, int]] = deque()
+        started = time.monotonic()
+        scheduled = 0
+        try:
+            async for batch in self.secret_storage.iter_stored_values(
+                collection, state["last_id"], self.batch_size
+            ):
+                await semaphore.acquire()
+                task = asyncio.create_task(self._process_batch(collection, batch))
+                task.add_done_callback(lambda _: semaphore.release())
+                pending.append((task, batch[-1][0], len(batch)))
+
+                while pending and pending[0][0].done():
+                    await self._commit(collection, state, *pending.popleft())
+
+                scheduled += len(batch)
+                if self.max_rate:
+                    delay = started + scheduled / self.max_rate - time.monotonic()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+
+            while pending:
+                await self._commit(collection, state, *pending.popleft())
+        finally:
+            for task, _, _ in pending:
+                task.cancel()
+
+        state["done"] = True
+        await self.secret_storage.write_checkpoint(name, state)
+        self._report(collection, state)
+        return state
+
+    async def _process_batch(
+        self, collection: str, batch: list[tuple[str, bytes]]
+    ) -> tuple[int, int]:
+        values = [value for _, value in batch]
+        if collection == "apps_keys":
+            rewrapped = await self.secret_engine.rewrap_app_keys(values)
+        else:
+            rewrapped = await self.secret_engine.rewrap_values(values)
+
+        updates = [
+            (record_id, old, new)
+            for (record_id, old), new in zip(batch, rewrapped)
+            if new is not None
+        ]
+        modified = await self.secret_storage.replace_stored_values(collection, updates)
+        return modified, len(updates) - modified
+
+    async def _commit(
+        self, collection: str, state: dict, task: asyncio.Task, last_id: str, scanned: int
+    ) -> None:
+        rewrapped, conflicts = await task
+        state["last_id"] = last_id
+        state["scanned"] += scanned
+        state["rewrapped"] += rewrapped
+        state["conflicts"] += conflicts
+        await self.secret_storage.write_checkpoint(self._checkpoint_name(collection), state)
+        self._report(collection, state)
+
+    def _report(self, collection: str, state: dict) -> None:
+        if self.progress:
+            self.progress({"collection": collection, **state})
+
+
+async def rewrap(args: argparse.Namespace) -> None:
+    job = MasterKeyRewrapJob(
+        SecretStorage(),
+        SecretEngineModule(),
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        max_rate=args.max_rate,
+        progress=lambda state: print(
+            f"{state['collection']}: scanned={state['scanned']} "
+            f"rewrapped={state['rewrapped']} conflicts={state['conflicts']}"
+            + (" done" if state.get("done") else "")
+        ),
+    )
+    await job.run(restart=args.restart)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=Config.MASTER_REWRAP_BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=Config.MASTER_REWRAP_CONCURRENCY)
+    parser.add_argument(
+        "--max-rate",
+        type=float,
+        default=Config.MASTER_REWRAP_MAX_RATE,
+        help="records per second, 0 for unlimited",
+    )
+    parser.add_argument("--restart", action="store_true", help="ignore saved checkpoints")
+    asyncio.run(rewrap(parser.parse_args()))
@@ -0,0 +1,124 @@
+import asyncio
+from collections.abc import Callable
+
+from core.config import Config
+from core.db_conn.storage_backend import SecretStorage
+
+# Delivered instead of the dropped changes when a subscriber falls behind
+RESYNC_EVENT = {"resync": True}
+
+
+class SecretWatcher:
+    """Fan-out of secret version changes to per-application subscribers.
+
+    A single storage feed (change streams on MongoDB replica sets, an ``updated_at`` poller on
+    standalone MongoDB servers and relational backends) serves every subscriber of the process.
+    The feed runs only while there are subscribers, so without watchers it puts no load on the
+    storage.
+    """
+
+    def __init__(self, storage: SecretStorage, queue_size: int = 1000):
+        """
+        Parameters
+        ----------
+        storage : SecretStorage
+            The storage whose changes are watched.
+        queue_size : int, optional
+            Number of undelivered changes kept per subscriber (default is 1000). A subscriber
+            that falls further behind receives `RESYNC_EVENT` instead of the changes.
+        """
+        self.storage = storage
+        self.queue_size = queue_size
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+        self._listeners: list[Callable[[dict], None]] = []
+        self._task: asyncio.Task | None = None
+        self._events = 0
+        self._dropped = 0
+        self._errors = 0
+
+    def add_listener(self, listener: Callable[[dict], None]) -> None:
+        """Register a callback invoked with every change while the feed runs."""
+        self._listeners.append(listener)
+
+    def subscribe(self, application_id: str) -> asyncio.Queue:
+        """Subscribes to the changes of an application's secrets.
+
+        Must be called from a running event loop; starts the feed if it is not running.
+
+        Parameters
+        ----------
+        application_id : str
+            ID of the application.
+
+        Returns
+        -------
+        asyncio.Queue
+            The queue receiving the changes. Pass it to `unsubscribe` when done.
+        """
+        queue = asyncio.Queue(self.queue_size)
+        self._subscribers.setdefault(application_id, set()).add(queue)
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        return queue
+
+    def unsubscribe(self, application_id: str, queue: asyncio.Queue) -> None:
+        """Removes a subscription; stops the feed after the last one."""
+        queues = self._subscribers.get(application_id, set())
+        queues.discard(queue)
+        if not queues:
+            self._subscribers.pop(application_id, None)
+        if not self._subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _publish(self, event: dict) -> None:
+        self._events += 1
+        for listener in self._listeners:
+            listener(event)
+        change = {key: event[key] for key in ("key", "version", "deleted")}
+        for queue in self._subscribers.get(event["application_id"], ()):
+            try:
+                queue.put_nowait(change)
+            except asyncio.QueueFull:
+                self._dropped += 1
+                self._resync(queue)
+
+    @staticmethod
+    def _resync(queue: asyncio.Queue) -> None:
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(RESYNC_EVENT)
+
+    async def _run(self) -> None:
+        position = None
+        while True:
+            try:
+                async for position, event in self.storage.watch_changes(position):
+                    self._publish(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # The feed continues from the last delivered change when the storage can resume
+                # from it; otherwise (e.g. MongoDB falling back from change streams to polling)
+                # changes may be missed, so every subscriber is told to re-read
+                self._errors += 1
+                for queues in self._subscribers.values():
+                    for queue in queues:
+                        self._resync(queue)
+                await asyncio.sleep(Config.WATCH_POLL_INTERVAL)
+
+    def stats(self) -> dict[str, int]:
+        """Returns the numbers of subscribers, delivered changes, dropped changes and feed
+        errors."""
+        return {
+            "subscribers": sum(len(queues) for queues in self._subscribers.values()),
+            "events": self._events,
+            "dropped": self._dropped,
+            "errors": self._errors,
+        }
+
+    def shutdown(self) -> None:
+        """Stops the feed."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
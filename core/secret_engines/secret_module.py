@@ -1,16 +1,30 @@
+import asyncio
+import time
 from abc import ABC, abstractmethod
+from collections.abc import Callable
+from hashlib import sha256
 from os import urandom
+from typing import Any
 
 from cryptography.hazmat.primitives import hashes, hmac, serialization
-from cryptography.hazmat.primitives.asymmetric import padding
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
 
+from core.cache import LRUCache
 from core.config import Config
+from core.executor.crypto_executor import crypto_executor
 
 
 class EncryptionStrategy(ABC):
     """Base interface for encryption strategies."""
 
+    # Strategies whose cost does not depend on the payload size are always offloaded
+    cpu_bound = False
+    # Whether tampered ciphertexts fail to decrypt. Values of other strategies rely on the
+    # master AEAD layer and are never sealed with the application key alone
+    authenticated = True
+
     @abstractmethod
     def encrypt(self, key: bytes, plaintext: bytes) -> bytes:
         """Encrypts plaintext using the specified key.
@@ -47,6 +61,42 @@ class EncryptionStrategy(ABC):
         """
         raise NotImplementedError
 
+    def encrypt_many(self, key: bytes, plaintexts: list[bytes]) -> list[bytes]:
+        """Encrypts several plaintexts with the same key.
+
+        Strategies override this to reuse key-scheduled contexts across the batch.
+
+        Parameters
+        ----------
+        key : bytes
+            The key used for encryption.
+        plaintexts : list[bytes]
+            The data to be encrypted.
+
+        Returns
+        -------
+        list[bytes]
+            The encrypted data, in the same order as `plaintexts`.
+        """
+        return [self.encrypt(key, plaintext) for plaintext in plaintexts]
+
+    def decrypt_many(self, key: bytes, ciphertexts: list[bytes]) -> list[bytes]:
+        """Decrypts several ciphertexts with the same key.
+
+        Parameters
+        ----------
+        key : bytes
+            The key used for decryption.
+        ciphertexts : list[bytes]
+            The data to be decrypted.
+
+        Returns
+        -------
+        list[bytes]
+            The decrypted data, in the same order as `ciphertexts`.
+        """
+        return [self.decrypt(key, ciphertext) for ciphertext in ciphertexts]
+
 
 class AESEncryptionStrategy(EncryptionStrategy):
     """Encryption strategy for AES-GCM."""
@@ -75,28 +125,69 @@ class AESEncryptionStrategy(EncryptionStrategy):
     def decrypt(self, key: bytes, ciphertext: bytes) -> bytes:
         """Decrypts ciphertext using AES-GCM.
 
+        The ciphertext is read through a memoryview and the plaintext is written into a
+        single preallocated buffer, so no intermediate copies are made.
+
         Parameters
         ----------
         key : bytes
             The AES key used for decryption.
         ciphertext : bytes
             The data to be decrypted, consisting of nonce, ciphertext, and authentication tag.
+            Any bytes-like object is accepted.
 
         Returns
         -------
         bytes
-            The decrypted data (plaintext).
+            The decrypted data (plaintext), as a bytearray.
         """
-        nonce = ciphertext[:12]
-        tag = ciphertext[-16:]
-        encrypted_data = ciphertext[12:-16]
+        data = memoryview(ciphertext)
+        nonce = data[:12]
+        tag = bytes(data[-16:])
+        encrypted_data = data[12:-16]
         cipher = Cipher(algorithms.AES(key), modes.GCM(nonce, tag))
         decryptor = cipher.decryptor()
-        return decryptor.update(encrypted_data) + decryptor.finalize()
+        # update_into needs room for one extra block minus one byte
+        plaintext = bytearray(len(encrypted_data) + 15)
+        size = decryptor.update_into(encrypted_data, plaintext)
+        decryptor.finalize()
+        del plaintext[size:]
+        return plaintext
+
+    def encrypt_many(self, key: bytes, plaintexts: list[bytes]) -> list[bytes]:
+        """Encrypts several plaintexts reusing one key-scheduled AES-GCM context.
+
+        The output format is the same as in `encrypt`.
+        """
+        aead = AESGCM(key)
+        ciphertexts = []
+        for plaintext in plaintexts:
+            nonce = urandom(12)
+            ciphertexts.append(nonce + aead.encrypt(nonce, plaintext, None))
+        return ciphertexts
+
+    def decrypt_many(self, key: bytes, ciphertexts: list[bytes]) -> list[bytes]:
+        """Decrypts several ciphertexts reusing one key-scheduled AES-GCM context.
+
+        Ciphertexts are sliced through memoryviews, so the only allocation per value is the
+        plaintext itself.
+        """
+        aead = AESGCM(key)
+        plaintexts = []
+        for ciphertext in ciphertexts:
+            data = memoryview(ciphertext)
+            plaintexts.append(aead.decrypt(data[:12], data[12:], None))
+        return plaintexts
 
 
 class ChaCha20EncryptionStrategy(EncryptionStrategy):
-    """Encryption strategy for ChaCha20-Poly1305."""
+    """Encryption strategy for ChaCha20-Poly1305.
+
+    The application layer is raw ChaCha20 without a tag; integrity comes from the master
+    layer.
+    """
+
+    authenticated = False
 
     def encrypt(self, key: bytes, plaintext: bytes) -> bytes:
         """Encrypts plaintext using ChaCha20-Poly1305.
@@ -134,15 +225,126 @@ class ChaCha20EncryptionStrategy(EncryptionStrategy):
         bytes
             The decrypted data (plaintext).
         """
-        nonce = ciphertext[:16]
-        encrypted_data = ciphertext[16:]
-        cipher = Cipher(algorithms.ChaCha20(key, nonce), mode=None)
+        data = memoryview(ciphertext)
+        cipher = Cipher(algorithms.ChaCha20(key, bytes(data[:16])), mode=None)
         decryptor = cipher.decryptor()
-        return decryptor.update(encrypted_data) + decryptor.finalize()
+        plaintext = bytearray(len(data) - 16)
+        decryptor.update_into(data[16:], plaintext)
+        decryptor.finalize()
+        return plaintext
 
 
 class RSAEncryptionStrategy(EncryptionStrategy):
-    """Encryption strategy for RSA."""
+    """Encryption strategy for RSA.
+
+    Parsed private keys are kept in an LRU cache shared by all instances and keyed by the
+    SHA-256 fingerprint of the PEM, so each key is deserialized only once.
+
+    In hybrid mode the value is sealed with AES-256-GCM under a fresh data key and only the
+    data key is encrypted with RSA-OAEP. The result is laid out as
+    ``HYBRID_MAGIC || version || wrapped data key || nonce || ciphertext || tag``, where the
+    first three fields are authenticated as associated data. Plain RSA-OAEP ciphertexts are
+    always exactly the size of the modulus, so they are still recognised and decrypted.
+    Unwrapped data keys are cached per RSA key, so repeated reads skip the RSA operation.
+    """
+
+    cpu_bound = True
+    HYBRID_MAGIC = b"RSAH"
+    HYBRID_VERSION = 1
+    _oaep = padding.OAEP(
+        mgf=padding.MGF1(algorithm=hashes.SHA256()),
+        algorithm=hashes.SHA256(),
+        label=None,
+    )
+    _key_cache = LRUCache(Config.RSA_KEY_CACHE_SIZE)
+    _data_key_cache = LRUCache(Config.RSA_DATA_KEY_CACHE_SIZE)
+
+    def __init__(self, hybrid: bool = Config.RSA_HYBRID_MODE):
+        """
+        Parameters
+        ----------
+        hybrid : bool, optional
+            Whether new values are sealed with an RSA-wrapped AES-GCM data key
+            (default is taken from ``Config.RSA_HYBRID_MODE``).
+        """
+        self.hybrid = hybrid
+
+    @classmethod
+    def load_private_key(cls, key: bytes) -> rsa.RSAPrivateKey:
+        """Returns the parsed RSA private key, loading it from PEM on a cache miss.
+
+        Parameters
+        ----------
+        key : bytes
+            The PEM encoded RSA private key.
+
+        Returns
+        -------
+        rsa.RSAPrivateKey
+            The deserialized private key.
+        """
+        fingerprint = sha256(key).digest()
+        private_key = cls._key_cache.get(fingerprint)
+        if private_key is None:
+            private_key = serialization.load_pem_private_key(key, password=None)
+            cls._key_cache.put(fingerprint, private_key)
+        return private_key
+
+    @classmethod
+    def invalidate_key(cls, key: bytes) -> None:
+        """Drops the parsed key and its unwrapped data keys from the caches.
+
+        Parameters
+        ----------
+        key : bytes
+            The PEM encoded RSA private key that was changed or removed.
+        """
+        fingerprint = sha256(key).digest()
+        cls._key_cache.invalidate(fingerprint)
+        cls._data_key_cache.invalidate_matching(lambda cached: cached[0] == fingerprint)
+
+    @classmethod
+    def cache_stats(cls) -> dict[str, int]:
+        """Returns hit/miss counters of the shared key cache."""
+        return cls._key_cache.stats()
+
+    def new_data_key(self, key: bytes) -> tuple[bytes, bytes]:
+        """Generates an AES-256 data key and wraps it with the RSA public key.
+
+        Parameters
+        ----------
+        key : bytes
+            The PEM encoded RSA private key.
+
+        Returns
+        -------
+        tuple[bytes, bytes]
+            The plaintext data key and its RSA-OAEP wrapped form.
+        """
+        data_key = AESGCM.generate_key(bit_length=256)
+        wrapped = self.load_private_key(key).public_key().encrypt(data_key, self._oaep)
+        return data_key, wrapped
+
+    def seal(self, data_key: bytes, wrapped: bytes, plaintext: bytes) -> bytes:
+        """Seals plaintext under an already wrapped data key.
+
+        Parameters
+        ----------
+        data_key : bytes
+            The plaintext AES-256 data key.
+        wrapped : bytes
+            The RSA wrapped form of `data_key`.
+        plaintext : bytes
+            The data to be encrypted.
+
+        Returns
+        -------
+        bytes
+            The hybrid envelope.
+        """
+        header = self.HYBRID_MAGIC + bytes([self.HYBRID_VERSION]) + wrapped
+        nonce = urandom(12)
+        return header + nonce + AESGCM(data_key).encrypt(nonce, plaintext, header)
 
     def encrypt(self, key: bytes, plaintext: bytes) -> bytes:
         """Encrypts plaintext using RSA with the public key.
@@ -157,18 +359,23 @@ class RSAEncryptionStrategy(EncryptionStrategy):
         Returns
         -------
         bytes
-            The encrypted data (ciphertext).
+            The hybrid envelope, or the raw RSA-OAEP ciphertext if hybrid mode is disabled.
         """
-        private_key = serialization.load_pem_private_key(key, password=None)
-        public_key = private_key.public_key()
-        return public_key.encrypt(
-            plaintext,
-            padding.OAEP(
-                mgf=padding.MGF1(algorithm=hashes.SHA256()),
-                algorithm=hashes.SHA256(),
-                label=None,
-            ),
-        )
+        if self.hybrid:
+            data_key, wrapped = self.new_data_key(key)
+            return self.seal(data_key, wrapped, plaintext)
+        return self.load_private_key(key).public_key().encrypt(plaintext, self._oaep)
+
+    def encrypt_many(self, key: bytes, plaintexts: list[bytes]) -> list[bytes]:
+        """Encrypts several plaintexts under a single RSA-wrapped data key.
+
+        In hybrid mode the whole batch pays for one RSA operation; on read the shared data
+        key is unwrapped once and then served from the data key cache.
+        """
+        if not self.hybrid:
+            return super().encrypt_many(key, plaintexts)
+        data_key, wrapped = self.new_data_key(key)
+        return [self.seal(data_key, wrapped, plaintext) for plaintext in plaintexts]
 
     def decrypt(self, key: bytes, ciphertext: bytes) -> bytes:
         """Decrypts ciphertext using RSA with the private key.
@@ -178,22 +385,39 @@ class RSAEncryptionStrategy(EncryptionStrategy):
         key : bytes
             The PEM encoded RSA private key used for decryption.
         ciphertext : bytes
-            The data to be decrypted.
+            The hybrid envelope or a raw RSA-OAEP ciphertext.
 
         Returns
         -------
         bytes
             The decrypted data (plaintext).
         """
-        private_key = serialization.load_pem_private_key(key, password=None)
-        return private_key.decrypt(
-            ciphertext,
-            padding.OAEP(
-                mgf=padding.MGF1(algorithm=hashes.SHA256()),
-                algorithm=hashes.SHA256(),
-                label=None,
-            ),
-        )
+        private_key = self.load_private_key(key)
+        modulus_size = private_key.key_size // 8
+        if len(ciphertext) == modulus_size:
+            return private_key.decrypt(bytes(ciphertext), self._oaep)
+
+        # The envelope holds at least the header, the nonce and the GCM tag
+        header_size = len(self.HYBRID_MAGIC) + 1 + modulus_size
+        if len(ciphertext) < header_size + 12 + 16:
+            raise ValueError("RSA ciphertext is too short")
+        if bytes(ciphertext[: len(self.HYBRID_MAGIC)]) != self.HYBRID_MAGIC:
+            raise ValueError("Unknown RSA ciphertext format")
+        version = ciphertext[len(self.HYBRID_MAGIC)]
+        if version != self.HYBRID_VERSION:
+            raise ValueError(f"Unsupported RSA envelope version: {version}")
+
+        data = memoryview(ciphertext)
+        header = data[:header_size]
+        wrapped = bytes(header[-modulus_size:])
+        nonce = data[header_size : header_size + 12]
+
+        cache_key = (sha256(key).digest(), sha256(wrapped).digest())
+        data_key = self._data_key_cache.get(cache_key)
+        if data_key is None:
+            data_key = private_key.decrypt(wrapped, self._oaep)
+            self._data_key_cache.put(cache_key, data_key)
+        return AESGCM(data_key).decrypt(nonce, data[header_size + 12 :], header)
 
 
 class HMACStrategy(EncryptionStrategy):
@@ -238,8 +462,413 @@ class HMACStrategy(EncryptionStrategy):
         return h.finalize()
 
 
+class MasterKeyring:
+    """Versioned master keys.
+
+    Version 0 is the unversioned ``MASTER_KEY``; further versions come from
+    ``MASTER_KEYS``. New values are encrypted with the active version, and every version
+    that may still be referenced by stored values must stay in the keyring until the
+    rewrap job has moved them to the active one.
+    """
+
+    MAX_VERSION = 0xFFFF
+
+    def __init__(self, keys: dict[int, bytes], active_version: int):
+        """
+        Parameters
+        ----------
+        keys : dict[int, bytes]
+            Master keys by version.
+        active_version : int
+            The version used to encrypt new values.
+
+        Raises
+        ------
+        ValueError
+            If a version is out of range or the active version is not in `keys`.
+        """
+        if any(not 0 <= version <= self.MAX_VERSION for version in keys):
+            raise ValueError(f"Master key versions must be between 0 and {self.MAX_VERSION}")
+        if active_version not in keys:
+            raise ValueError(f"Active master key version {active_version} is not configured")
+        self._keys = dict(keys)
+        self.active_version = active_version
+
+    @classmethod
+    def from_config(cls) -> "MasterKeyring":
+        """Creates the keyring from ``MASTER_KEY``, ``MASTER_KEYS`` and ``MASTER_KEY_VERSION``.
+
+        ``MASTER_KEYS`` is a comma-separated list of ``version:hex key`` pairs. The active
+        version defaults to the highest configured one.
+        """
+        keys = {}
+        if Config.MASTER_KEY:
+            keys[0] = bytes.fromhex(Config.MASTER_KEY.strip())
+        for item in (Config.MASTER_KEYS or "").split(","):
+            if item.strip():
+                version, _, key = item.partition(":")
+                if int(version) == 0:
+                    raise ValueError("Master key version 0 is reserved for MASTER_KEY")
+                keys[int(version)] = bytes.fromhex(key.strip())
+        if not keys:
+            raise ValueError("MASTER_KEY or MASTER_KEYS must be set")
+        if Config.MASTER_KEY_VERSION:
+            active_version = int(Config.MASTER_KEY_VERSION)
+        else:
+            active_version = max(keys)
+        return cls(keys, active_version)
+
+    @property
+    def versions(self) -> list[int]:
+        return sorted(self._keys)
+
+    @property
+    def active_key(self) -> bytes:
+        return self._keys[self.active_version]
+
+    def get(self, version: int) -> bytes:
+        """Returns the master key of `version`.
+
+        Raises
+        ------
+        ValueError
+            If the version is not configured.
+        """
+        key = self._keys.get(version)
+        if key is None:
+            raise ValueError(f"Master key version {version} is not configured")
+        return key
+
+
+class MasterLayerStrategy(EncryptionStrategy):
+    """Master-layer strategy that records the AEAD and master key version in every
+    ciphertext.
+
+    The key passed to this strategy is a `MasterKeyring`. Output is laid out as
+    ``MASTER_MAGIC || 2 || cipher id || key version (2 bytes) || nonce || ciphertext || tag``.
+    With master key version 0 and no selected cipher (a fixed ``TYPE_ENCRYPT``), values are
+    encrypted by `fallback` in the legacy header-less format, and with version 0 and a
+    selected cipher the shorter version 1 header without the key version is written, so
+    nodes that do not know about versioned keys can still read them.
+
+    Decryption always honours the header, so nodes that selected different ciphers or
+    master key versions read each other's data; header-less values are decrypted with
+    `fallback` and master key version 0.
+    """
+
+    MASTER_MAGIC = b"VMTM"
+    MASTER_VERSION = 1
+    MASTER_VERSION_KEYED = 2
+    NONCE_SIZE = 12
+    CIPHERS = {
+        1: ("aes256-gcm96", AESGCM),
+        2: ("chacha20-poly1305", ChaCha20Poly1305),
+    }
+
+    def __init__(self, fallback: EncryptionStrategy, cipher_id: int | None = None):
+        """
+        Parameters
+        ----------
+        fallback : EncryptionStrategy
+            The strategy for header-less values.
+        cipher_id : int, optional
+            Key of `CIPHERS` used for new values (default is None, which encrypts with
+            `fallback`; only allowed while master key version 0 is active).
+        """
+        if cipher_id is not None and cipher_id not in self.CIPHERS:
+            raise ValueError(f"Unsupported master cipher id: {cipher_id}")
+        self.fallback = fallback
+        self.cipher_id = cipher_id
+
+    @classmethod
+    def cipher_id_by_name(cls, name: str) -> int:
+        for cipher_id, (cipher_name, _) in cls.CIPHERS.items():
+            if cipher_name == name:
+                return cipher_id
+        raise ValueError(f"Unsupported master cipher: {name}")
+
+    def _header(self, cipher_id: int, key_version: int) -> bytes:
+        if key_version == 0:
+            return self.MASTER_MAGIC + bytes([self.MASTER_VERSION, cipher_id])
+        return (
+            self.MASTER_MAGIC
+            + bytes([self.MASTER_VERSION_KEYED, cipher_id])
+            + key_version.to_bytes(2, "big")
+        )
+
+    def _parse_header(self, ciphertext: bytes) -> tuple[int, int, int] | None:
+        """Returns the header size, cipher id and master key version, or None if the
+        ciphertext has no header."""
+        magic_size = len(self.MASTER_MAGIC)
+        header = bytes(ciphertext[: magic_size + 4])
+        if len(header) < magic_size + 2 or not header.startswith(self.MASTER_MAGIC):
+            return None
+        version, cipher_id = header[magic_size : magic_size + 2]
+        if cipher_id not in self.CIPHERS:
+            return None
+        if version == self.MASTER_VERSION:
+            return magic_size + 2, cipher_id, 0
+        if version == self.MASTER_VERSION_KEYED and len(header) == magic_size + 4:
+            return magic_size + 4, cipher_id, int.from_bytes(header[magic_size + 2 :], "big")
+        return None
+
+    def key_version(self, ciphertext: bytes) -> int:
+        """Returns the master key version the ciphertext was encrypted with."""
+        parsed = self._parse_header(ciphertext)
+        return parsed[2] if parsed else 0
+
+    def _seal(self, aead: AESGCM | ChaCha20Poly1305, header: bytes, plaintext: bytes) -> bytes:
+        nonce = urandom(self.NONCE_SIZE)
+        return header + nonce + aead.encrypt(nonce, plaintext, header)
+
+    def _open(self, aead: AESGCM | ChaCha20Poly1305, header_size: int, ciphertext: bytes) -> bytes:
+        data = memoryview(ciphertext)
+        nonce_end = header_size + self.NONCE_SIZE
+        return aead.decrypt(data[header_size:nonce_end], data[nonce_end:], data[:header_size])
+
+    def _sealer(self, keyring: MasterKeyring) -> tuple[AESGCM | ChaCha20Poly1305, bytes]:
+        if self.cipher_id is None:
+            raise ValueError("A master cipher must be selected for versioned master keys")
+        aead = self.CIPHERS[self.cipher_id][1](keyring.active_key)
+        return aead, self._header(self.cipher_id, keyring.active_version)
+
+    def _is_legacy(self, keyring: MasterKeyring) -> bool:
+        return self.cipher_id is None and keyring.active_version == 0
+
+    def encrypt(self, key: MasterKeyring, plaintext: bytes) -> bytes:
+        """Encrypts plaintext with the active master key."""
+        if self._is_legacy(key):
+            return self.fallback.encrypt(key.active_key, plaintext)
+        return self._seal(*self._sealer(key), plaintext)
+
+    def decrypt(self, key: MasterKeyring, ciphertext: bytes) -> bytes:
+        """Decrypts ciphertext with the cipher and key version recorded in its header, or
+        with `fallback` and key version 0."""
+        parsed = self._parse_header(ciphertext)
+        if parsed is None:
+            return self.fallback.decrypt(key.get(0), ciphertext)
+        header_size, cipher_id, key_version = parsed
+        aead = self.CIPHERS[cipher_id][1](key.get(key_version))
+        return self._open(aead, header_size, ciphertext)
+
+    def encrypt_many(self, key: MasterKeyring, plaintexts: list[bytes]) -> list[bytes]:
+        """Encrypts several plaintexts reusing one key-scheduled AEAD context."""
+        if self._is_legacy(key):
+            return self.fallback.encrypt_many(key.active_key, plaintexts)
+        aead, header = self._sealer(key)
+        return [self._seal(aead, header, plaintext) for plaintext in plaintexts]
+
+    def decrypt_many(self, key: MasterKeyring, ciphertexts: list[bytes]) -> list[bytes]:
+        """Decrypts several ciphertexts, reusing one AEAD context per cipher and key version."""
+        parsed_headers = [self._parse_header(ciphertext) for ciphertext in ciphertexts]
+        plaintexts: list[bytes | None] = [None] * len(ciphertexts)
+        aeads = {}
+        for i, parsed in enumerate(parsed_headers):
+            if parsed is not None:
+                header_size, cipher_id, key_version = parsed
+                if (cipher_id, key_version) not in aeads:
+                    aeads[cipher_id, key_version] = self.CIPHERS[cipher_id][1](
+                        key.get(key_version)
+                    )
+                aead = aeads[cipher_id, key_version]
+                plaintexts[i] = self._open(aead, header_size, ciphertexts[i])
+
+        legacy_indexes = [i for i, parsed in enumerate(parsed_headers) if parsed is None]
+        if legacy_indexes:
+            legacy_values = self.fallback.decrypt_many(
+                key.get(0), [ciphertexts[i] for i in legacy_indexes]
+            )
+            for i, value in zip(legacy_indexes, legacy_values):
+                plaintexts[i] = value
+        return plaintexts
+
+
+def calibrate_master_cipher(
+    key: bytes, payload_size: int = 4096, min_time: float = 0.05, rounds: int = 5
+) -> dict[str, Any]:
+    """Measures the throughput of the master-layer AEADs on this host.
+
+    Ciphers are run in alternating rounds so that warm-up and frequency scaling do not favour
+    the one measured first; the best round of each cipher is compared.
+
+    Parameters
+    ----------
+    key : bytes
+        The master key. ChaCha20-Poly1305 is only considered for 256-bit keys.
+    payload_size : int, optional
+        Size of the encrypted test payload in bytes (default is 4096).
+    min_time : float, optional
+        Total time budget per cipher in seconds (default is 0.05).
+    rounds : int, optional
+        Number of alternating rounds (default is 5).
+
+    Returns
+    -------
+    dict[str, Any]
+        The selected cipher name and id, bytes/sec per cipher and calibration parameters.
+    """
+    candidates = {
+        cipher_id: factory(key)
+        for cipher_id, (name, factory) in MasterLayerStrategy.CIPHERS.items()
+        if factory is AESGCM or len(key) == 32
+    }
+    payload = urandom(payload_size)
+    nonce = urandom(MasterLayerStrategy.NONCE_SIZE)
+    best = dict.fromkeys(candidates, 0.0)
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for cipher_id, aead in candidates.items():
+            iterations = 0
+            round_start = time.perf_counter()
+            deadline = round_start + min_time / rounds
+            while True:
+                aead.encrypt(nonce, payload, None)
+                iterations += 1
+                now = time.perf_counter()
+                if now >= deadline:
+                    break
+            best[cipher_id] = max(best[cipher_id], iterations * payload_size / (now - round_start))
+
+    selected = max(best, key=best.get)
+    return {
+        "selected": MasterLayerStrategy.CIPHERS[selected][0],
+        "cipher_id": selected,
+        "bytes_per_sec": {MasterLayerStrategy.CIPHERS[i][0]: rate for i, rate in best.items()},
+        "payload_bytes": payload_size,
+        "duration_ms": (time.perf_counter() - started) * 1000,
+    }
+
+
+# Values sealed only with the application key start with this header. Values written in the
+# legacy double-encryption mode have no header; they begin with the random master-layer
+# nonce, so a false match has a probability of 2**-40.
+VALUE_MAGIC = b"VMT"
+VALUE_FORMAT_VERSION = 1
+MODE_SINGLE_LAYER = 1
+SINGLE_LAYER_HEADER = VALUE_MAGIC + bytes([VALUE_FORMAT_VERSION, MODE_SINGLE_LAYER])
+
+# Application keys wrapped with the master key start with this header. Raw keys are either
+# random AES/ChaCha20 keys or PEM documents starting with "-----".
+WRAPPED_KEY_MAGIC = b"VMTK"
+WRAPPED_KEY_VERSION = 1
+WRAPPED_KEY_HEADER = WRAPPED_KEY_MAGIC + bytes([WRAPPED_KEY_VERSION])
+
+
+def _encrypt_values(
+    strategy: EncryptionStrategy,
+    key: bytes,
+    values: list[bytes],
+    master_strategy: MasterLayerStrategy,
+    master_key: MasterKeyring,
+    key_wrapping: bool,
+) -> list[bytes]:
+    encrypted_values = strategy.encrypt_many(key, values)
+    if key_wrapping and strategy.authenticated:
+        return [SINGLE_LAYER_HEADER + value for value in encrypted_values]
+    return master_strategy.encrypt_many(master_key, encrypted_values)
+
+
+def _decrypt_values(
+    strategy: EncryptionStrategy,
+    key: bytes,
+    encrypted_values: list[bytes],
+    master_strategy: MasterLayerStrategy,
+    master_key: MasterKeyring,
+) -> list[bytes]:
+    # Headers are stripped through memoryviews to avoid copying the value
+    inner_values = [
+        memoryview(value)[len(SINGLE_LAYER_HEADER) :]
+        if bytes(value[: len(SINGLE_LAYER_HEADER)]) == SINGLE_LAYER_HEADER
+        else None
+        for value in encrypted_values
+    ]
+    legacy_indexes = [i for i, value in enumerate(inner_values) if value is None]
+    if legacy_indexes:
+        legacy_values = master_strategy.decrypt_many(
+            master_key, [encrypted_values[i] for i in legacy_indexes]
+        )
+        for i, value in zip(legacy_indexes, legacy_values):
+            inner_values[i] = value
+    return strategy.decrypt_many(key, inner_values)
+
+
+def _encrypt_value(
+    strategy: EncryptionStrategy,
+    key: bytes,
+    value: bytes,
+    master_strategy: MasterLayerStrategy,
+    master_key: MasterKeyring,
+    key_wrapping: bool,
+) -> bytes:
+    return _encrypt_values(strategy, key, [value], master_strategy, master_key, key_wrapping)[0]
+
+
+def _decrypt_value(
+    strategy: EncryptionStrategy,
+    key: bytes,
+    encrypted_value: bytes,
+    master_strategy: MasterLayerStrategy,
+    master_key: MasterKeyring,
+) -> bytes:
+    return _decrypt_values(strategy, key, [encrypted_value], master_strategy, master_key)[0]
+
+
+def _rewrap_values(
+    master_strategy: MasterLayerStrategy,
+    master_key: MasterKeyring,
+    values: list[bytes],
+    header: bytes,
+) -> list[bytes | None]:
+    """Re-encrypts the master layer of values that are not under the active master key.
+
+    Values are expected to start with `header`, which is kept as is; values without it and
+    values already under the active key are skipped and returned as None.
+    """
+    results: list[bytes | None] = [None] * len(values)
+    indexes = []
+    for i, value in enumerate(values):
+        if not value.startswith(header):
+            continue
+        inner = memoryview(value)[len(header) :]
+        if header == b"" and bytes(inner[: len(SINGLE_LAYER_HEADER)]) == SINGLE_LAYER_HEADER:
+            continue
+        if master_strategy.key_version(inner) != master_key.active_version:
+            indexes.append(i)
+
+    if indexes:
+        plaintexts = master_strategy.decrypt_many(
+            master_key, [memoryview(values[i])[len(header) :] for i in indexes]
+        )
+        for i, value in zip(indexes, master_strategy.encrypt_many(master_key, plaintexts)):
+            results[i] = header + value
+    return results
+
+
 class SecretEngineModule:
-    """Module for managing secrets with different encryption strategies."""
+    """Module for managing secrets with different encryption strategies.
+
+    Two layouts are supported, selected by ``Config.KEY_WRAPPING_MODE``:
+    - ``double``: the value is encrypted with the application key and the result is
+      encrypted again with the master key.
+    - ``wrap``: the master key only wraps the application key (KEK/DEK) and values are
+      sealed once with the application key. Values of ``chacha20-poly1305`` keep the
+      master layer, since its application layer has no tag.
+
+    Both layouts are always readable, so an installation can switch modes and migrate
+    existing values gradually.
+
+    Master keys are versioned (see `MasterKeyring`); the master layer records the key
+    version, so values under older versions stay readable until they are re-encrypted by
+    `rewrap_values` and `rewrap_app_keys`.
+
+    With ``TYPE_ENCRYPT=auto`` the master-layer cipher is chosen by a short calibration
+    the first time the module is created in the process (see `calibrate_master_cipher`) and
+    recorded in each master-layer ciphertext. Header-less values written before are read
+    with ``TYPE_ENCRYPT_FALLBACK``.
+    """
+
+    _calibration: dict[str, Any] | None = None
 
     def __init__(self):
         """Initializes the SecretEngineModule and loads encryption strategies."""
@@ -250,14 +879,171 @@ class SecretEngineModule:
             "rsa-2048": RSAEncryptionStrategy(),
             "rsa-3072": RSAEncryptionStrategy(),
             "rsa-4096": RSAEncryptionStrategy(),
-            # "ed25519": Ed25519KeyEncryptionStrategy(),
-            # "ecdsa-p256": ECDSAKeyEncryptionStrategy(),
-            # "ecdsa-p384": ECDSAKeyEncryptionStrategy(),
-            # "ecdsa-p521": ECDSAKeyEncryptionStrategy(),
+            # ed25519 and ecdsa-* keys are signing keys, see SigningEngineModule
             # "hmac": HMACStrategy(),
         }
-        self.__master_key = bytes.fromhex(Config().MASTER_KEY.strip())
-        self.__master_encrypt_decrypt = self._encryption_strategies.get(Config().TYPE_ENCRYPT)
+        self.batch_chunk_size = Config.CRYPTO_BATCH_CHUNK_SIZE
+        self.key_wrapping = Config.KEY_WRAPPING_MODE == "wrap"
+        self.__master_keyring = MasterKeyring.from_config()
+        self.__master_encrypt_decrypt = self._create_master_strategy(Config().TYPE_ENCRYPT)
+
+    def _create_master_strategy(self, type_encrypt: str) -> MasterLayerStrategy:
+        if type_encrypt != "auto":
+            fallback = self._get_strategy(type_encrypt)
+            if self.__master_keyring.active_version == 0:
+                return MasterLayerStrategy(fallback)
+            # Versioned keys are recorded in the header, so the AEAD matching the fixed
+            # type is used for new values
+            cipher = "aes256-gcm96" if type_encrypt.startswith("aes") else type_encrypt
+            return MasterLayerStrategy(fallback, MasterLayerStrategy.cipher_id_by_name(cipher))
+
+        fallback = self._get_strategy(Config.TYPE_ENCRYPT_FALLBACK)
+        if Config.MASTER_CIPHER:
+            cipher_id = MasterLayerStrategy.cipher_id_by_name(Config.MASTER_CIPHER)
+            return MasterLayerStrategy(fallback, cipher_id)
+        if SecretEngineModule._calibration is None:
+            SecretEngineModule._calibration = calibrate_master_cipher(
+                self.__master_keyring.active_key
+            )
+        return MasterLayerStrategy(fallback, SecretEngineModule._calibration["cipher_id"])
+
+    @property
+    def master_key_version(self) -> int:
+        """The master key version used for new values."""
+        return self.__master_keyring.active_version
+
+    def master_layer_info(self) -> dict[str, Any]:
+        """Returns the master-layer configuration and the calibration result.
+
+        Returns
+        -------
+        dict[str, Any]
+            ``type_encrypt``, the cipher used for new master-layer values (``cipher``), the
+            strategy used for header-less values (``fallback``), the active and configured
+            master key versions and ``calibration``, which is None unless the cipher was
+            chosen by calibration.
+        """
+        master = self.__master_encrypt_decrypt
+        if master.cipher_id is None:
+            cipher = Config.TYPE_ENCRYPT
+        else:
+            cipher = master.CIPHERS[master.cipher_id][0]
+        fallback = next(
+            name
+            for name, strategy in self._encryption_strategies.items()
+            if strategy is master.fallback
+        )
+        return {
+            "type_encrypt": Config.TYPE_ENCRYPT,
+            "cipher": cipher,
+            "fallback": fallback,
+            "master_key_version": self.__master_keyring.active_version,
+            "master_key_versions": self.__master_keyring.versions,
+            "calibration": self._calibration if Config.TYPE_ENCRYPT == "auto" else None,
+        }
+
+    def wrap_app_key(self, app_key: bytes) -> bytes:
+        """Encrypts an application key with the master key for storage.
+
+        Parameters
+        ----------
+        app_key : bytes
+            The raw application key.
+
+        Returns
+        -------
+        bytes
+            The wrapped key, prefixed with the wrapped key header.
+        """
+        return WRAPPED_KEY_HEADER + self.__master_encrypt_decrypt.encrypt(
+            self.__master_keyring, app_key
+        )
+
+    def unwrap_app_key(self, stored_key: bytes) -> bytes:
+        """Returns the raw application key from its stored form.
+
+        Parameters
+        ----------
+        stored_key : bytes
+            The key as stored by `_write_key_app`, either wrapped or raw (legacy).
+
+        Returns
+        -------
+        bytes
+            The raw application key.
+        """
+        if not self.is_wrapped_key(stored_key):
+            return stored_key
+        return bytes(
+            self.__master_encrypt_decrypt.decrypt(
+                self.__master_keyring, memoryview(stored_key)[len(WRAPPED_KEY_HEADER) :]
+            )
+        )
+
+    async def rewrap_values(self, values: list[bytes]) -> list[bytes | None]:
+        """Re-encrypts the master layer of stored values with the active master key.
+
+        The application layer is left untouched, so no application keys are needed.
+
+        Parameters
+        ----------
+        values : list[bytes]
+            Stored secret values in either layout.
+
+        Returns
+        -------
+        list[bytes | None]
+            The re-encrypted values; None for values that are already under the active key
+            or have no master layer (``wrap`` layout).
+        """
+        return await crypto_executor.run(
+            _rewrap_values,
+            self.__master_encrypt_decrypt,
+            self.__master_keyring,
+            values,
+            b"",
+            payload_size=sum(map(len, values)),
+        )
+
+    async def rewrap_app_keys(self, stored_keys: list[bytes]) -> list[bytes | None]:
+        """Re-wraps stored application keys with the active master key.
+
+        Parameters
+        ----------
+        stored_keys : list[bytes]
+            Application keys as stored by `_write_key_app`.
+
+        Returns
+        -------
+        list[bytes | None]
+            The re-wrapped keys; None for keys that are already under the active key or are
+            stored raw (``double`` layout).
+        """
+        return await crypto_executor.run(
+            _rewrap_values,
+            self.__master_encrypt_decrypt,
+            self.__master_keyring,
+            stored_keys,
+            WRAPPED_KEY_HEADER,
+            payload_size=sum(map(len, stored_keys)),
+        )
+
+    @staticmethod
+    def is_wrapped_key(stored_key: bytes) -> bool:
+        """Returns whether the stored application key is wrapped with the master key."""
+        return stored_key.startswith(WRAPPED_KEY_HEADER)
+
+    def seals_single_layer(self, algorithm: str) -> bool:
+        """Returns whether new values of the algorithm are sealed only with the application key.
+
+        In ``wrap`` mode values of strategies without authentication keep the master layer.
+        """
+        return self.key_wrapping and self._get_strategy(algorithm).authenticated
+
+    @staticmethod
+    def is_single_layer(encrypted_value: bytes) -> bool:
+        """Returns whether the value is sealed only with the application key."""
+        return bytes(encrypted_value[: len(SINGLE_LAYER_HEADER)]) == SINGLE_LAYER_HEADER
 
     async def encrypt(self, algorithm: str, key: bytes, value: bytes) -> bytes:
         """Encrypts data using the specified algorithm and returns the encrypted value.
@@ -267,7 +1053,7 @@ class SecretEngineModule:
         algorithm : str
             The encryption algorithm to use.
         key : bytes
-            The key used for the encryption strategy.
+            The raw application key used for the encryption strategy.
         value : bytes
             The data to be encrypted.
 
@@ -276,11 +1062,16 @@ class SecretEngineModule:
         bytes
             The encrypted data.
         """
-        strategy = self._encryption_strategies.get(algorithm)
-        if not strategy:
-            raise ValueError(f"Unsupported algorithm: {algorithm}")
-        return self.__master_encrypt_decrypt.encrypt(
-            self.__master_key, strategy.encrypt(key, value)
+        strategy = self._get_strategy(algorithm)
+        return await crypto_executor.run(
+            _encrypt_value,
+            strategy,
+            key,
+            value,
+            self.__master_encrypt_decrypt,
+            self.__master_keyring,
+            self.key_wrapping,
+            payload_size=None if strategy.cpu_bound else len(value),
         )
 
     async def decrypt(self, algorithm: str, key: bytes, encrypted_value: bytes) -> bytes:
@@ -292,18 +1083,117 @@ class SecretEngineModule:
         algorithm : str
             The encryption algorithm to use.
         key : bytes
-            The key used for the decryption strategy.
+            The raw application key used for the decryption strategy.
         encrypted_value : bytes
-            The encrypted data to be decrypted.
+            The encrypted data to be decrypted, in either layout.
 
         Returns
         -------
         bytes
             The decrypted data (plaintext).
         """
+        strategy = self._get_strategy(algorithm)
+        return await crypto_executor.run(
+            _decrypt_value,
+            strategy,
+            key,
+            encrypted_value,
+            self.__master_encrypt_decrypt,
+            self.__master_keyring,
+            payload_size=None if strategy.cpu_bound else len(encrypted_value),
+        )
+
+    async def encrypt_many(
+        self, algorithm: str, key: bytes, values: list[bytes], fan_out: bool = False
+    ) -> list[bytes]:
+        """Encrypts a batch of values with the same application key.
+
+        The strategy is looked up once and the key-scheduled contexts of both layers are
+        reused for the whole batch.
+
+        Parameters
+        ----------
+        algorithm : str
+            The encryption algorithm to use.
+        key : bytes
+            The raw application key used for the encryption strategy.
+        values : list[bytes]
+            The data to be encrypted.
+        fan_out : bool, optional
+            Whether to split the batch into chunks of `batch_chunk_size` values and process
+            them concurrently on the crypto executor (default is False).
+
+        Returns
+        -------
+        list[bytes]
+            The encrypted data, in the same order as `values`.
+        """
+        strategy = self._get_strategy(algorithm)
+        return await self._run_batch(
+            _encrypt_values, strategy, key, values, fan_out, self.key_wrapping
+        )
+
+    async def decrypt_many(
+        self, algorithm: str, key: bytes, encrypted_values: list[bytes], fan_out: bool = False
+    ) -> list[bytes]:
+        """Decrypts a batch of values encrypted with the same application key.
+
+        Parameters
+        ----------
+        algorithm : str
+            The encryption algorithm to use.
+        key : bytes
+            The raw application key used for the decryption strategy.
+        encrypted_values : list[bytes]
+            The encrypted data to be decrypted, in either layout.
+        fan_out : bool, optional
+            Whether to split the batch into chunks and process them concurrently on the
+            crypto executor (default is False).
+
+        Returns
+        -------
+        list[bytes]
+            The decrypted data, in the same order as `encrypted_values`.
+        """
+        strategy = self._get_strategy(algorithm)
+        return await self._run_batch(_decrypt_values, strategy, key, encrypted_values, fan_out)
+
+    def _get_strategy(self, algorithm: str) -> EncryptionStrategy:
         strategy = self._encryption_strategies.get(algorithm)
         if not strategy:
             raise ValueError(f"Unsupported algorithm: {algorithm}")
-        return strategy.decrypt(
-            key, self.__master_encrypt_decrypt.decrypt(self.__master_key, encrypted_value)
+        return strategy
+
+    async def _run_batch(
+        self,
+        func: Callable[..., list[bytes]],
+        strategy: EncryptionStrategy,
+        key: bytes,
+        values: list[bytes],
+        fan_out: bool,
+        *args: Any,
+    ) -> list[bytes]:
+        if fan_out and len(values) > self.batch_chunk_size:
+            chunks = [
+                values[i : i + self.batch_chunk_size]
+                for i in range(0, len(values), self.batch_chunk_size)
+            ]
+        else:
+            chunks = [values]
+
+        results = await asyncio.gather(
+            *(
+                crypto_executor.run(
+                    func,
+                    strategy,
+                    key,
+                    chunk,
+                    self.__master_encrypt_decrypt,
+                    self.__master_keyring,
+                    *args,
+                    payload_size=None if strategy.cpu_bound else sum(map(len, chunk)),
+                )
+                for chunk in chunks
+            )
         )
+        return [value for chunk in results for value in chunk]
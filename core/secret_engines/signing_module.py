@@ -0,0 +1,268 @@
+import asyncio
+from abc import ABC, abstractmethod
+from hashlib import sha256
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+from core.cache import LRUCache
+from core.config import Config
+from core.executor.crypto_executor import crypto_executor
+
+
+class SigningStrategy(ABC):
+    """Base interface for signing strategies."""
+
+    @abstractmethod
+    def sign(self, private_key, message: bytes) -> bytes:
+        """Signs a message with the private key.
+
+        Parameters
+        ----------
+        private_key
+            The deserialized private key.
+        message : bytes
+            The data to be signed, e.g. an artifact digest.
+
+        Returns
+        -------
+        bytes
+            The signature.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def verify(self, public_key, message: bytes, signature: bytes) -> bool:
+        """Verifies a signature with the public key.
+
+        Parameters
+        ----------
+        public_key
+            The deserialized public key.
+        message : bytes
+            The signed data.
+        signature : bytes
+            The signature to verify.
+
+        Returns
+        -------
+        bool
+            True if the signature is valid, False otherwise.
+        """
+        raise NotImplementedError
+
+
+class Ed25519SigningStrategy(SigningStrategy):
+    """Signing strategy for Ed25519."""
+
+    def sign(self, private_key: ed25519.Ed25519PrivateKey, message: bytes) -> bytes:
+        return private_key.sign(message)
+
+    def verify(
+        self, public_key: ed25519.Ed25519PublicKey, message: bytes, signature: bytes
+    ) -> bool:
+        try:
+            public_key.verify(signature, message)
+        except InvalidSignature:
+            return False
+        return True
+
+
+class ECDSASigningStrategy(SigningStrategy):
+    """Signing strategy for ECDSA with DER encoded signatures."""
+
+    def __init__(self, hash_algorithm: hashes.HashAlgorithm):
+        """
+        Parameters
+        ----------
+        hash_algorithm : hashes.HashAlgorithm
+            The hash applied to the message before signing.
+        """
+        self.signature_algorithm = ec.ECDSA(hash_algorithm)
+
+    def sign(self, private_key: ec.EllipticCurvePrivateKey, message: bytes) -> bytes:
+        return private_key.sign(message, self.signature_algorithm)
+
+    def verify(
+        self, public_key: ec.EllipticCurvePublicKey, message: bytes, signature: bytes
+    ) -> bool:
+        try:
+            public_key.verify(signature, message, self.signature_algorithm)
+        except InvalidSignature:
+            return False
+        return True
+
+
+def _load_key(key: bytes) -> None:
+    SigningEngineModule.load_private_key(key)
+
+
+def _sign_values(strategy: SigningStrategy, key: bytes, messages: list[bytes]) -> list[bytes]:
+    private_key = SigningEngineModule.load_private_key(key)
+    return [strategy.sign(private_key, message) for message in messages]
+
+
+def _verify_values(
+    strategy: SigningStrategy, key: bytes, pairs: list[tuple[bytes, bytes]]
+) -> list[bool]:
+    public_key = SigningEngineModule.load_private_key(key).public_key()
+    return [strategy.verify(public_key, message, signature) for message, signature in pairs]
+
+
+class SigningEngineModule:
+    """Module for signing and verifying data with application keys.
+
+    Deserialized private keys are kept in an LRU cache shared by all instances, so a key is
+    parsed from PEM once per process rather than once per signature. Batches are split into
+    chunks of ``Config.CRYPTO_BATCH_CHUNK_SIZE`` items that run concurrently on the crypto
+    executor.
+    """
+
+    _key_cache = LRUCache(Config.SIGNING_KEY_CACHE_SIZE)
+
+    def __init__(self):
+        """Initializes the SigningEngineModule and loads signing strategies."""
+        self._signing_strategies = {
+            "ed25519": Ed25519SigningStrategy(),
+            "ecdsa-p256": ECDSASigningStrategy(hashes.SHA256()),
+            "ecdsa-p384": ECDSASigningStrategy(hashes.SHA384()),
+            "ecdsa-p521": ECDSASigningStrategy(hashes.SHA512()),
+        }
+        self.batch_chunk_size = Config.CRYPTO_BATCH_CHUNK_SIZE
+
+    @classmethod
+    def load_private_key(
+        cls, key: bytes
+    ) -> ed25519.Ed25519PrivateKey | ec.EllipticCurvePrivateKey:
+        """Returns the parsed private key, loading it from PEM on a cache miss.
+
+        Keys are cached by the SHA-256 fingerprint of the PEM, so a replaced application
+        key never hits a stale entry.
+
+        Parameters
+        ----------
+        key : bytes
+            The PEM encoded private key of the application.
+
+        Returns
+        -------
+        ed25519.Ed25519PrivateKey | ec.EllipticCurvePrivateKey
+            The deserialized private key.
+        """
+        fingerprint = sha256(key).digest()
+        private_key = cls._key_cache.get(fingerprint)
+        if private_key is None:
+            private_key = serialization.load_pem_private_key(key, password=None)
+            cls._key_cache.put(fingerprint, private_key)
+        return private_key
+
+    @classmethod
+    def invalidate_key(cls, key: bytes) -> None:
+        """Drops the parsed key from the cache.
+
+        Parameters
+        ----------
+        key : bytes
+            The PEM encoded private key that was changed or removed.
+        """
+        cls._key_cache.invalidate(sha256(key).digest())
+
+    @classmethod
+    def cache_stats(cls) -> dict[str, int]:
+        """Returns hit/miss counters of the shared key cache."""
+        return cls._key_cache.stats()
+
+    def supports(self, algorithm: str) -> bool:
+        """Returns whether the algorithm is a signing algorithm."""
+        return algorithm in self._signing_strategies
+
+    def public_key(self, key: bytes) -> bytes:
+        """Returns the public key of an application key.
+
+        Parameters
+        ----------
+        key : bytes
+            The PEM encoded private key.
+
+        Returns
+        -------
+        bytes
+            The PEM encoded public key (SubjectPublicKeyInfo).
+        """
+        public_key = self.load_private_key(key).public_key()
+        return public_key.public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+
+    async def sign_many(self, algorithm: str, key: bytes, messages: list[bytes]) -> list[bytes]:
+        """Signs a batch of messages with the same application key.
+
+        Parameters
+        ----------
+        algorithm : str
+            The signing algorithm to use.
+        key : bytes
+            The PEM encoded private key.
+        messages : list[bytes]
+            The data to be signed.
+
+        Returns
+        -------
+        list[bytes]
+            The signatures, in the same order as `messages`.
+        """
+        strategy = self._get_strategy(algorithm)
+        return await self._run_batch(_sign_values, strategy, key, messages)
+
+    async def verify_many(
+        self, algorithm: str, key: bytes, messages: list[bytes], signatures: list[bytes]
+    ) -> list[bool]:
+        """Verifies a batch of signatures made with the same application key.
+
+        Parameters
+        ----------
+        algorithm : str
+            The signing algorithm to use.
+        key : bytes
+            The PEM encoded private key.
+        messages : list[bytes]
+            The signed data.
+        signatures : list[bytes]
+            The signatures, one per message.
+
+        Returns
+        -------
+        list[bool]
+            Whether each signature is valid, in the same order as `messages`.
+
+        Raises
+        ------
+        ValueError
+            If the numbers of messages and signatures differ.
+        """
+        if len(messages) != len(signatures):
+            raise ValueError("Number of messages and signatures must match")
+        strategy = self._get_strategy(algorithm)
+        pairs = list(zip(messages, signatures))
+        return await self._run_batch(_verify_values, strategy, key, pairs)
+
+    def _get_strategy(self, algorithm: str) -> SigningStrategy:
+        strategy = self._signing_strategies.get(algorithm)
+        if not strategy:
+            raise ValueError(f"Unsupported signing algorithm: {algorithm}")
+        return strategy
+
+    async def _run_batch(self, func, strategy: SigningStrategy, key: bytes, items: list) -> list:
+        chunks = [
+            items[i : i + self.batch_chunk_size]
+            for i in range(0, len(items), self.batch_chunk_size)
+        ]
+        if len(chunks) > 1:
+            # Parse the key once before the chunks run concurrently and race on the cache
+            await crypto_executor.run(_load_key, key)
+        results = await asyncio.gather(
+            *(crypto_executor.run(func, strategy, key, chunk) for chunk in chunks)
+        )
+        return [value for chunk in results for value in chunk]
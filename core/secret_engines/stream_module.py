@@ -0,0 +1,160 @@
+import struct
+from collections.abc import AsyncIterator
+from os import urandom
+
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from core.executor.crypto_executor import crypto_executor
+
+
+class StreamCipher:
+    """Chunked authenticated encryption following the STREAM construction.
+
+    Each chunk is sealed with AES-256-GCM under the blob data key. The 96-bit nonce is built
+    from a random per-blob prefix, the chunk counter and a flag marking the final chunk, so
+    reordered, duplicated, dropped or truncated chunks fail authentication.
+    """
+
+    NONCE_PREFIX_SIZE = 7
+    TAG_SIZE = 16
+
+    def __init__(self, data_key: bytes, nonce_prefix: bytes):
+        """
+        Parameters
+        ----------
+        data_key : bytes
+            The 256-bit data key of the blob.
+        nonce_prefix : bytes
+            The random nonce prefix of the blob, `NONCE_PREFIX_SIZE` bytes long.
+        """
+        if len(nonce_prefix) != self.NONCE_PREFIX_SIZE:
+            raise ValueError("Invalid nonce prefix size")
+        self._data_key = data_key
+        self._aead = AESGCM(data_key)
+        self._nonce_prefix = nonce_prefix
+
+    def __reduce__(self):
+        # The AEAD context itself is not picklable; rebuild it in process pool workers
+        return self.__class__, (self._data_key, self._nonce_prefix)
+
+    @classmethod
+    def generate(cls) -> "StreamCipher":
+        """Creates a cipher with a fresh data key and nonce prefix."""
+        return cls(AESGCM.generate_key(bit_length=256), urandom(cls.NONCE_PREFIX_SIZE))
+
+    @property
+    def data_key(self) -> bytes:
+        return self._data_key
+
+    @property
+    def nonce_prefix(self) -> bytes:
+        return self._nonce_prefix
+
+    def _nonce(self, index: int, last: bool) -> bytes:
+        return self._nonce_prefix + struct.pack(">I?", index, last)
+
+    def encrypt_chunk(self, index: int, chunk: bytes, last: bool) -> bytes:
+        """Encrypts one chunk of the stream.
+
+        Parameters
+        ----------
+        index : int
+            Position of the chunk in the stream, starting at 0.
+        chunk : bytes
+            The plaintext chunk.
+        last : bool
+            Whether this is the final chunk of the stream.
+
+        Returns
+        -------
+        bytes
+            The ciphertext followed by the authentication tag.
+        """
+        return self._aead.encrypt(self._nonce(index, last), chunk, None)
+
+    def decrypt_chunk(self, index: int, chunk: bytes, last: bool) -> bytes:
+        """Decrypts one chunk of the stream.
+
+        Parameters
+        ----------
+        index : int
+            Position of the chunk in the stream, starting at 0.
+        chunk : bytes
+            The ciphertext followed by the authentication tag.
+        last : bool
+            Whether this is the final chunk of the stream.
+
+        Returns
+        -------
+        bytes
+            The plaintext chunk.
+        """
+        return self._aead.decrypt(self._nonce(index, last), chunk, None)
+
+    async def encrypt_stream(
+        self, source: AsyncIterator[bytes], chunk_size: int
+    ) -> AsyncIterator[bytes]:
+        """Re-chunks an incoming byte stream and yields encrypted chunks.
+
+        At most two chunks of plaintext are held in memory at any time.
+
+        Parameters
+        ----------
+        source : AsyncIterator[bytes]
+            The plaintext stream, in pieces of any size.
+        chunk_size : int
+            Size of plaintext chunks.
+
+        Yields
+        ------
+        bytes
+            Encrypted chunks. An empty stream yields a single empty final chunk.
+        """
+        buffer = bytearray()
+        index = 0
+        async for piece in source:
+            buffer += piece
+            # The chunk is only emitted once more data follows, so the final chunk is known
+            while len(buffer) > chunk_size:
+                chunk = bytes(buffer[:chunk_size])
+                del buffer[:chunk_size]
+                yield await crypto_executor.run(
+                    self.encrypt_chunk, index, chunk, False, payload_size=len(chunk)
+                )
+                index += 1
+        yield await crypto_executor.run(
+            self.encrypt_chunk, index, bytes(buffer), True, payload_size=len(buffer)
+        )
+
+    async def decrypt_stream(
+        self, source: AsyncIterator[bytes], chunk_count: int
+    ) -> AsyncIterator[bytes]:
+        """Decrypts a stream of encrypted chunks.
+
+        Parameters
+        ----------
+        source : AsyncIterator[bytes]
+            Encrypted chunks in order.
+        chunk_count : int
+            Total number of chunks in the stream.
+
+        Yields
+        ------
+        bytes
+            Plaintext chunks.
+
+        Raises
+        ------
+        ValueError
+            If the stream has fewer or more chunks than `chunk_count`.
+        """
+        index = 0
+        async for chunk in source:
+            if index >= chunk_count:
+                raise ValueError("Stream has more chunks than expected")
+            yield await crypto_executor.run(
+                self.decrypt_chunk, index, chunk, index == chunk_count - 1, payload_size=len(chunk)
+            )
+            index += 1
+        if index != chunk_count:
+            raise ValueError("Stream is truncated")
@@ -0,0 +1,59 @@
+import asyncio
+import unittest
+
+from core.executor.crypto_executor import CryptoExecutor, CryptoExecutorBusyError
+
+
+def _blocking(event_name: str) -> str:
+    return event_name
+
+
+class TestCryptoExecutor(unittest.IsolatedAsyncioTestCase):
+    async def test_small_payload_runs_inline(self):
+        """
+        Тест на выполнение небольших операций без пула
+        """
+        executor = CryptoExecutor(mode="thread", inline_threshold=1024)
+        self.assertEqual(await executor.run(_blocking, "small", payload_size=10), "small")
+        self.assertEqual(await executor.run(_blocking, "large", payload_size=4096), "large")
+
+        stats = executor.stats()
+        self.assertEqual(stats["inline_runs"], 1)
+        self.assertEqual(stats["offloaded_runs"], 1)
+        executor.shutdown()
+
+    async def test_queue_depth_limit(self):
+        """
+        Тест на отказ при переполнении очереди
+        """
+        executor = CryptoExecutor(mode="thread", max_workers=1, max_queue_depth=1)
+        release = asyncio.Event()
+        loop = asyncio.get_running_loop()
+
+        def wait_for_release():
+            asyncio.run_coroutine_threadsafe(release.wait(), loop).result()
+
+        first = asyncio.create_task(executor.run(wait_for_release))
+        await asyncio.sleep(0.05)
+        with self.assertRaises(CryptoExecutorBusyError):
+            await executor.run(_blocking, "rejected")
+
+        release.set()
+        await first
+        self.assertEqual(executor.stats()["rejected"], 1)
+        executor.shutdown()
+
+    async def test_process_mode(self):
+        """
+        Тест на выполнение в пуле процессов
+        """
+        executor = CryptoExecutor(mode="process", max_workers=1)
+        self.assertEqual(await executor.run(_blocking, "process"), "process")
+        executor.shutdown()
+
+    def test_unsupported_mode(self):
+        """
+        Тест на неподдерживаемый режим
+        """
+        with self.assertRaises(ValueError):
+            CryptoExecutor(mode="gpu")
@@ -0,0 +1,34 @@
+import unittest
+from unittest.mock import AsyncMock
+
+from core.master.expiry_reaper import ExpiryReaper
+
+
+class TestExpiryReaper(unittest.IsolatedAsyncioTestCase):
+    async def test_reap_until_empty(self):
+        """
+        Тест на удаление истёкших секретов пакетами до последнего неполного пакета
+        """
+        storage = AsyncMock()
+        storage.reap_expired.side_effect = [3, 3, 1]
+        reaper = ExpiryReaper(storage, batch_size=3, batch_pause=0)
+
+        self.assertEqual(await reaper.reap(), 7)
+        self.assertEqual(storage.reap_expired.await_count, 3)
+        storage.reap_expired.assert_awaited_with(3)
+        self.assertEqual(reaper.stats(), {"reaped": 7, "batches": 3, "errors": 0})
+
+    async def test_native_expiry(self):
+        """
+        Тест на один пустой запрос, если хранилище удаляет истёкшие секреты само
+        """
+        storage = AsyncMock()
+        storage.reap_expired.return_value = 0
+        reaper = ExpiryReaper(storage, batch_size=500)
+
+        self.assertEqual(await reaper.reap(), 0)
+        storage.reap_expired.assert_awaited_once_with(500)
+
+
+if __name__ == "__main__":
+    unittest.main()
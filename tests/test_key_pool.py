@@ -0,0 +1,102 @@
+import unittest
+from unittest.mock import patch
+
+from core.key_access.key_access_module import KeyAccessModule
+from core.key_access.key_pool import KeyPool
+
+
+class TestKeyPool(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.pool = KeyPool(["aes256-gcm96"], low_watermark=1, high_watermark=3)
+
+    async def asyncTearDown(self):
+        self.pool.shutdown()
+
+    async def test_fill_and_take(self):
+        """
+        Тест на заполнение пула до верхней границы и выдачу ключей из него
+        """
+        self.pool.start()
+        await self.pool.join()
+        self.assertEqual(self.pool.stats()["algorithms"]["aes256-gcm96"]["depth"], 3)
+
+        keys = {self.pool.take("aes256-gcm96") for _ in range(3)}
+        self.assertEqual(len(keys), 3)
+        self.assertTrue(all(len(key) == 32 for key in keys))
+
+        # Пул опустел ниже нижней границы и пополняется в фоне
+        await self.pool.join()
+        stats = self.pool.stats()["algorithms"]["aes256-gcm96"]
+        self.assertEqual(stats["depth"], 3)
+        self.assertEqual(stats["hits"], 3)
+        self.assertEqual(stats["generated"], 6)
+        self.assertEqual(stats["hit_ratio"], 1.0)
+
+    async def test_empty_pool(self):
+        """
+        Тест на промах при пустом пуле и неподдерживаемом алгоритме
+        """
+        self.assertIsNone(self.pool.take("aes256-gcm96"))
+        self.assertIsNone(self.pool.take("rsa-2048"))
+        self.assertFalse(self.pool.supports("rsa-2048"))
+
+        stats = self.pool.stats()["algorithms"]["aes256-gcm96"]
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hit_ratio"], 0.0)
+
+    async def test_generate_app_key_uses_pool(self):
+        """
+        Тест на получение ключа приложения из пула и генерацию при промахе
+        """
+        self.pool.start()
+        await self.pool.join()
+        pooled = set(self.pool._keys["aes256-gcm96"])
+
+        with patch("core.key_access.key_access_module.key_pool", self.pool):
+            _, first = await KeyAccessModule.generate_app_key("aes256-gcm96")
+            _, other = await KeyAccessModule.generate_app_key("aes128-gcm96")
+
+        self.assertIn(first, pooled)
+        self.assertEqual(len(other), 16)
+        self.assertEqual(self.pool.stats()["algorithms"]["aes256-gcm96"]["hits"], 1)
+
+    async def test_fill_algorithms_in_use(self):
+        """
+        Тест на заполнение пула только используемыми алгоритмами
+        """
+        pool = KeyPool(["aes256-gcm96", "aes128-gcm96"], low_watermark=1, high_watermark=2)
+        try:
+            pool.start(["aes128-gcm96", "rsa-2048"])
+            await pool.join()
+            self.assertEqual(pool.stats()["algorithms"]["aes128-gcm96"]["depth"], 2)
+            self.assertEqual(pool.stats()["algorithms"]["aes256-gcm96"]["depth"], 0)
+
+            # Алгоритм начинает пополняться после первого запроса ключа
+            self.assertIsNone(pool.take("aes256-gcm96"))
+            await pool.join()
+            self.assertEqual(pool.stats()["algorithms"]["aes256-gcm96"]["depth"], 2)
+        finally:
+            pool.shutdown()
+
+    async def test_disabled_by_default(self):
+        """
+        Тест на выключенный по умолчанию пул без процессов генерации
+        """
+        with patch("core.key_access.key_pool.Config.KEY_POOL_ALGORITHMS", ""):
+            pool = KeyPool.from_config()
+        pool.start()
+
+        self.assertIsNone(pool.take("rsa-2048"))
+        self.assertEqual(pool.stats()["algorithms"], {})
+        self.assertIsNone(pool._executor)
+
+    def test_invalid_watermarks(self):
+        """
+        Тест на некорректные границы пула
+        """
+        with self.assertRaises(ValueError):
+            KeyPool(["rsa-2048"], low_watermark=4, high_watermark=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
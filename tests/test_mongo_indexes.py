@@ -0,0 +1,159 @@
+import os
+import unittest
+from datetime import UTC, datetime
+from unittest.mock import patch
+from uuid import uuid4
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import PyMongoError
+
+from core.db_conn.config import config
+from core.db_conn.storage_backend import MongoDBStorageBackend
+
+MONGO_TEST_URI = os.getenv("MONGO_TEST_URI", "mongodb://localhost:27017")
+
+
+def find_stages(plan: dict | list) -> set[str]:
+    """Collects the stage names of a query plan tree."""
+    stages = set()
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.add(plan["stage"])
+        for value in plan.values():
+            stages |= find_stages(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            stages |= find_stages(value)
+    return stages
+
+
+def find_winning_plans(explanation: dict | list) -> list[dict]:
+    """Collects the winning plans of an explanation, including those of nested stages."""
+    plans = []
+    if isinstance(explanation, dict):
+        for name, value in explanation.items():
+            if name == "winningPlan":
+                plans.append(value)
+            else:
+                plans.extend(find_winning_plans(value))
+    elif isinstance(explanation, list):
+        for value in explanation:
+            plans.extend(find_winning_plans(value))
+    return plans
+
+
+class TestMongoIndexes(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        client = AsyncIOMotorClient(MONGO_TEST_URI, serverSelectionTimeoutMS=1000)
+        try:
+            await client.admin.command("ping")
+        except PyMongoError:
+            client.close()
+            self.skipTest(f"MongoDB is not available at {MONGO_TEST_URI}")
+        client.close()
+
+        db_name = f"test_indexes_{uuid4().hex}"
+        with patch.multiple(config, secret_db_uri=MONGO_TEST_URI, secret_db_name=db_name):
+            self.backend = MongoDBStorageBackend()
+        self.addAsyncCleanup(self.backend.client.drop_database, db_name)
+        self.addCleanup(self.backend.client.close)
+        self.db = self.backend.db
+
+        await self.backend.create_indexes()
+        for i in range(20):
+            await self.backend.write_data(f"app-{i % 2}", f"key-{i}", b"value")
+            await self.backend.put_data(f"app-{i % 2}", f"key-{i}", b"value")
+        await self.backend._write_key_app("app-0", b"key")
+        await self.backend.write_blob_chunks("app-0", "blob", _chunks())
+
+    def assert_indexed(self, explanation: dict):
+        # У агрегации план запроса вложен в стадию $cursor
+        plans = find_winning_plans(explanation)
+        self.assertTrue(plans)
+        for plan in plans:
+            self.assertNotIn("COLLSCAN", find_stages(plan))
+
+    async def test_hot_queries_use_indexes(self):
+        """
+        Тест на выполнение частых запросов хранилища по индексам, без COLLSCAN
+        """
+        unexpired = self.backend._unexpired()
+        secret = {"application_id": "app-0", "secret_key": "key-0"}
+        queries = {
+            "read_data": self.db.secrets.find(
+                {**secret, "is_deleted": False, **unexpired}, sort=[("version", -1)], limit=1
+            ),
+            "put_data_last_version": self.db.secrets.find(
+                secret, {"_id": 0, "version": 1, "expires_at": 1}, sort=[("version", -1)], limit=1
+            ),
+            "list_versions": self.db.secrets.find(
+                {**secret, "version": {"$lt": 2}}, sort=[("version", -1)], limit=50
+            ),
+            "read_version": self.db.secrets.find(
+                {**secret, "version": 1, "is_deleted": False, **unexpired}, limit=1
+            ),
+            "read_as_of": self.db.secrets.find(
+                {**secret, "created_at": {"$lte": datetime.now(UTC)}, **unexpired},
+                sort=[("created_at", -1)],
+                limit=1,
+            ),
+            "read_key_app": self.db.apps_keys.find({"application_id": "app-0"}, limit=1),
+            "poll_changes": self.db.secrets.find(
+                {"updated_at": {"$gt": datetime.now(UTC)}}, sort=[("updated_at", 1)]
+            ),
+            "read_blob_chunks": self.db.secret_chunks.find(
+                {"application_id": "app-0", "blob_id": "blob"}, sort=[("chunk_index", 1)]
+            ),
+        }
+        for name, cursor in queries.items():
+            with self.subTest(query=name):
+                self.assert_indexed(await cursor.explain())
+
+        latest = [
+            {"$sort": {"secret_key": 1, "version": -1}},
+            {"$group": {"_id": "$secret_key", "secret_value": {"$first": "$secret_value"}}},
+        ]
+        live = {"application_id": "app-0", "is_deleted": False, **unexpired}
+        aggregations = {
+            "read_many": [{"$match": live}, *latest],
+            "read_many_keys": [
+                {"$match": {**live, "secret_key": {"$in": ["key-0", "key-2"]}}},
+                *latest,
+            ],
+        }
+        for name, pipeline in aggregations.items():
+            with self.subTest(query=name):
+                explanation = await self.db.command(
+                    "explain", {"aggregate": "secrets", "pipeline": pipeline, "cursor": {}}
+                )
+                self.assert_indexed(explanation)
+
+        with self.subTest(query="list_secret_keys"):
+            explanation = await self.db.command(
+                "explain",
+                {
+                    "distinct": "secrets",
+                    "key": "secret_key",
+                    "query": {"application_id": "app-0", "is_deleted": False, **unexpired},
+                },
+            )
+            self.assert_indexed(explanation)
+
+    async def test_create_indexes_idempotent(self):
+        """
+        Тест на повторное создание индексов при каждом запуске
+        """
+        await self.backend.create_indexes()
+
+        indexes = await self.db.secrets.index_information()
+        self.assertTrue(indexes["application_id_1_secret_key_1_version_-1"]["unique"])
+        self.assertEqual(indexes["expires_at_1"]["expireAfterSeconds"], 0)
+
+
+async def _chunks():
+    for chunk in (b"first", b"second"):
+        yield chunk
+
+
+if __name__ == "__main__":
+    unittest.main()
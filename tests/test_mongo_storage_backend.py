@@ -1,4 +1,10 @@
 import unittest
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+
 from core.db_conn.storage_backend import MongoDBStorageBackend
 
 
@@ -57,3 +63,216 @@ class TestMongoDBStorageBackend(unittest.IsolatedAsyncioTestCase):
         result = await self.backend.read(key, application_id)
 
         self.assertIsNone(result)
+
+
+class TestMongoDBPutData(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.backend = MongoDBStorageBackend()
+        self.backend.db = MagicMock()
+        self.secrets = self.backend.db.secrets
+        self.secrets.create_index = AsyncMock()
+        self.backend.db.apps_keys.create_index = AsyncMock()
+        self.backend.db.secret_chunks.create_index = AsyncMock()
+        self.secrets.insert_one = AsyncMock()
+        self.secrets.find_one = AsyncMock(return_value={"version": 3})
+
+    async def test_version_read_from_database(self):
+        """
+        Тест на чтение последней версии из базы: секрет мог пересоздать другой экземпляр
+        """
+        self.assertEqual(await self.backend.put_data("app", "key", b"v4"), 4)
+        # TTL-индекс удалил секрет, другой экземпляр записал его заново
+        self.secrets.find_one.return_value = {"version": 1}
+
+        self.assertEqual(await self.backend.put_data("app", "key", b"v2"), 2)
+        self.assertEqual(self.secrets.find_one.await_count, 2)
+        self.assertEqual(self.secrets.insert_one.await_args.args[0]["version"], 2)
+
+    async def test_concurrent_version_conflict(self):
+        """
+        Тест на повторную попытку, если версию заняла параллельная запись
+        """
+        self.secrets.find_one.side_effect = [{"version": 3}, {"version": 4}]
+        self.secrets.insert_one.side_effect = [DuplicateKeyError("duplicate"), None]
+
+        self.assertEqual(await self.backend.put_data("app", "key", b"value"), 5)
+        versions = [call.args[0]["version"] for call in self.secrets.insert_one.await_args_list]
+        self.assertEqual(versions, [4, 5])
+
+    async def test_blob_chunks_removed(self):
+        """
+        Тест на удаление чанков вытесненного и удалённого блоба и на срок действия чанков
+        """
+        expires_at = datetime.now(UTC) + timedelta(hours=1)
+        self.secrets.find_one.return_value = {
+            "version": 3,
+            "blob_id": "old",
+            "expires_at": expires_at,
+        }
+        chunks = self.backend.db.secret_chunks
+        chunks.delete_many = AsyncMock()
+        chunks.update_many = AsyncMock()
+
+        await self.backend.put_data("app", "blob", b"manifest", blob_id="new")
+
+        self.assertEqual(self.secrets.insert_one.await_args.args[0]["blob_id"], "new")
+        chunks.update_many.assert_awaited_once_with(
+            {"application_id": "app", "blob_id": {"$in": ["new"]}},
+            {"$set": {"expires_at": expires_at}},
+        )
+        chunks.delete_many.assert_awaited_once_with(
+            {"application_id": "app", "blob_id": {"$in": ["old"]}}
+        )
+
+        self.secrets.update_many = AsyncMock(return_value=MagicMock(matched_count=4))
+        self.secrets.distinct = AsyncMock(return_value=["old", "new"])
+        await self.backend.delete_data("app", "blob")
+        chunks.delete_many.assert_awaited_with(
+            {"application_id": "app", "blob_id": {"$in": ["old", "new"]}}
+        )
+
+    async def test_duplicate_versions_reported(self):
+        """
+        Тест на понятную ошибку запуска, если в базе есть повторяющиеся версии
+        """
+        self.secrets.create_index.side_effect = OperationFailure("duplicate", code=11000)
+        cursor = MagicMock()
+        cursor.to_list = AsyncMock(
+            return_value=[
+                {"_id": {"application_id": "app", "secret_key": "key", "version": 2}, "count": 2}
+            ]
+        )
+        self.secrets.aggregate.return_value = cursor
+
+        with self.assertRaisesRegex(RuntimeError, "app/key v2"):
+            await self.backend.create_indexes()
+        self.assertFalse(self.backend._indexes_ready)
+
+    async def test_list_versions_keyset(self):
+        """
+        Тест на выборку страницы версий по номеру версии без смещения
+        """
+        cursor = MagicMock()
+        cursor.to_list = AsyncMock(return_value=[{"version": 2}])
+        self.secrets.find.return_value = cursor
+
+        self.assertEqual(await self.backend.list_versions("app", "key", 3, 10), [{"version": 2}])
+        query, projection = self.secrets.find.call_args.args
+        self.assertEqual(query["version"], {"$lt": 3})
+        self.assertEqual(self.secrets.find.call_args.kwargs["sort"], [("version", -1)])
+        self.assertEqual(self.secrets.find.call_args.kwargs["limit"], 10)
+
+    async def test_write_many_rolls_back_on_conflict(self):
+        """
+        Тест на удаление уже вставленных секретов, если один из ключей существует
+        """
+
+        async def insert_many(documents, ordered):
+            for document in documents:
+                document["_id"] = ObjectId()
+            raise BulkWriteError(
+                {"nInserted": 1, "writeErrors": [{"index": 1, "code": 11000, "errmsg": "dup"}]}
+            )
+
+        self.secrets.insert_many = AsyncMock(side_effect=insert_many)
+        self.secrets.delete_many = AsyncMock()
+        # Отдельный сервер без транзакций
+        self.backend._transactions = False
+
+        with self.assertRaisesRegex(ValueError, "'second'"):
+            await self.backend.write_many("app", {"first": b"1", "second": b"2", "third": b"3"})
+
+        self.assertTrue(self.secrets.insert_many.await_args.kwargs["ordered"])
+        documents = self.secrets.insert_many.await_args.args[0]
+        query = self.secrets.delete_many.await_args.args[0]
+        self.assertEqual(query, {"_id": {"$in": [documents[0]["_id"]]}})
+
+    async def test_write_many_in_transaction(self):
+        """
+        Тест на запись нескольких секретов в транзакции на наборе реплик, без отката вручную
+        """
+        session = MagicMock()
+        session.__aenter__ = AsyncMock(return_value=session)
+        session.__aexit__ = AsyncMock(return_value=False)
+        transaction = session.start_transaction.return_value
+        transaction.__aenter__ = AsyncMock()
+        transaction.__aexit__ = AsyncMock(return_value=False)
+        self.backend.client = MagicMock()
+        self.backend.client.start_session = AsyncMock(return_value=session)
+        self.backend.client.admin.command = AsyncMock(return_value={"setName": "rs0"})
+        self.secrets.insert_many = AsyncMock(
+            side_effect=BulkWriteError(
+                {"nInserted": 1, "writeErrors": [{"index": 1, "code": 11000, "errmsg": "dup"}]}
+            )
+        )
+        self.secrets.delete_many = AsyncMock()
+
+        with self.assertRaisesRegex(ValueError, "'second'"):
+            await self.backend.write_many("app", {"first": b"1", "second": b"2"})
+
+        self.assertIs(self.secrets.insert_many.await_args.kwargs["session"], session)
+        # Транзакция прерывается при выходе с ошибкой, вставленное до конфликта не остаётся
+        self.assertIs(transaction.__aexit__.await_args.args[0], BulkWriteError)
+        self.secrets.delete_many.assert_not_awaited()
+
+    async def test_read_many_latest_versions(self):
+        """
+        Тест на чтение только последней версии каждого ключа
+        """
+
+        async def latest_versions():
+            for document in (
+                {"_id": "first", "secret_value": b"1"},
+                {"_id": "second", "secret_value": b"2"},
+            ):
+                yield document
+
+        self.secrets.aggregate = MagicMock(return_value=latest_versions())
+
+        self.assertEqual(
+            await self.backend.read_many("app", ["first", "second"]),
+            {"first": b"1", "second": b"2"},
+        )
+        match, sort, group = self.secrets.aggregate.call_args.args[0]
+        self.assertEqual(match["$match"]["secret_key"], {"$in": ["first", "second"]})
+        self.assertEqual(sort["$sort"], {"secret_key": 1, "version": -1})
+        self.assertEqual(group["$group"]["secret_value"], {"$first": "$secret_value"})
+
+    async def test_watch_changes_falls_back_to_polling(self):
+        """
+        Тест на опрос изменений, если сервер не поддерживает потоки изменений
+        """
+        self.secrets.watch = MagicMock(
+            side_effect=OperationFailure(
+                "The $changeStream stage is only supported on replica sets", 40573
+            )
+        )
+        with self.assertRaises(RuntimeError):
+            async for _ in self.backend.watch_changes():
+                pass
+
+        updated_at = datetime(2030, 1, 1)
+        cursor = MagicMock()
+        cursor.to_list = AsyncMock(
+            return_value=[
+                {
+                    "application_id": "app",
+                    "secret_key": "key",
+                    "version": 2,
+                    "is_deleted": False,
+                    "updated_at": updated_at,
+                }
+            ]
+        )
+        self.secrets.find.return_value = cursor
+
+        changes = self.backend.watch_changes({"_data": "token"})
+        position, change = await anext(changes)
+        await changes.aclose()
+
+        self.assertEqual(position, updated_at)
+        self.assertEqual(
+            change, {"application_id": "app", "key": "key", "version": 2, "deleted": False}
+        )
+        self.assertEqual(self.secrets.watch.call_count, 1)
+        self.assertEqual(self.secrets.find.call_args.kwargs["sort"], [("updated_at", 1)])
@@ -0,0 +1,185 @@
+import asyncio
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Integer,
+    LargeBinary,
+    MetaData,
+    String,
+    Table,
+    create_engine,
+)
+
+from alembic import command
+from core.db_conn.config import config
+from core.db_conn.migrations import alembic_config, upgrade_schema
+from core.db_conn.rdb_models import Base, JobCheckpoint, SecretChunk
+from core.db_conn.storage_backend import RDBStorageBackend
+
+# Схема первого выпуска, как её создавал create_all из прежней модели Secret
+BASELINE_METADATA = MetaData()
+Table(
+    "secrets",
+    BASELINE_METADATA,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("application_id", String, nullable=False),
+    Column("secret_key", String, nullable=False, unique=True),
+    Column("secret_value", LargeBinary, nullable=False),
+    Column("is_deleted", Boolean),
+    Column("is_destoyed", Boolean),
+    Column("version", Integer),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+    Column("deleted_at", DateTime),
+)
+
+
+class TestRDBMigrations(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "secrets.db"
+        self.uri = f"sqlite+aiosqlite:///{self.path}"
+        self.alembic_config = alembic_config()
+        self.alembic_config.set_main_option("sqlalchemy.url", self.uri)
+
+    async def migrate(self, revision: str):
+        # env.py запускает свой цикл событий, поэтому миграции выполняются в отдельном потоке
+        await asyncio.to_thread(command.upgrade, self.alembic_config, revision)
+
+    async def test_upgrade_keeps_existing_secrets(self):
+        """
+        Тест на перенос секретов из схемы с глобально уникальным secret_key в версионную
+        """
+        await self.migrate("0001")
+        with sqlite3.connect(self.path) as connection:
+            connection.execute(
+                "INSERT INTO secrets (application_id, secret_key, secret_value, is_deleted,"
+                " is_destoyed, version) VALUES ('app', 'key', x'01', 0, 0, 1)"
+            )
+        await self.migrate("head")
+
+        with patch.object(config, "secret_db_uri", self.uri):
+            backend = RDBStorageBackend()
+        self.addAsyncCleanup(backend.engine.dispose)
+
+        self.assertEqual(await backend.read_data("app", "key"), b"\x01")
+        await backend.put_data("app", "key", b"\x02")
+        await backend.write_data("other", "key", b"\x03")
+
+        self.assertEqual(await backend.read_data("app", "key"), b"\x02")
+        self.assertEqual(await backend.read_data("other", "key"), b"\x03")
+        self.assertEqual(await backend.read_version("app", "key", 1), b"\x01")
+
+        with sqlite3.connect(self.path) as connection:
+            indexes = {
+                row[1] for row in connection.execute("PRAGMA index_list('secrets')").fetchall()
+            }
+        self.assertIn("ix_secrets_latest_live", indexes)
+
+    def create_backend(self) -> RDBStorageBackend:
+        with patch.object(config, "secret_db_uri", self.uri):
+            backend = RDBStorageBackend()
+        self.addAsyncCleanup(backend.engine.dispose)
+        return backend
+
+    def revision(self) -> str:
+        with sqlite3.connect(self.path) as connection:
+            return connection.execute("SELECT version_num FROM alembic_version").fetchone()[0]
+
+    async def test_startup_on_fresh_database(self):
+        """
+        Тест на создание схемы при запуске сервиса миграциями, с записью ревизии
+        """
+        await self.create_backend().create_indexes()
+
+        self.assertEqual(self.revision(), "0010")
+        # Ручной запуск alembic после сервиса ничего не делает
+        await self.migrate("head")
+
+    async def test_startup_on_database_without_revision(self):
+        """
+        Тест на обновление базы, созданной create_all до появления миграций
+        """
+        await self.migrate("0001")
+        with sqlite3.connect(self.path) as connection:
+            connection.execute("DROP TABLE alembic_version")
+            connection.execute(
+                "INSERT INTO secrets (application_id, secret_key, secret_value, is_deleted,"
+                " is_destoyed, version) VALUES ('app', 'key', x'01', 0, 0, 1)"
+            )
+
+        backend = self.create_backend()
+        await backend.create_tables()
+
+        self.assertEqual(self.revision(), "0010")
+        self.assertEqual(await backend.read_data("app", "key"), b"\x01")
+
+    async def test_startup_on_current_schema_without_revision(self):
+        """
+        Тест на пометку текущей ревизией базы со схемой из моделей, но без alembic_version
+        """
+        engine = create_engine(f"sqlite:///{self.path}")
+        Base.metadata.create_all(engine)
+        engine.dispose()
+
+        await self.create_backend().create_tables()
+
+        self.assertEqual(self.revision(), "0010")
+
+    def create_baseline(self, *tables):
+        engine = create_engine(f"sqlite:///{self.path}")
+        BASELINE_METADATA.create_all(engine)
+        # Таблицы, которые create_all добавлял к базе первого выпуска до появления миграций
+        Base.metadata.create_all(engine, tables=list(tables))
+        with engine.begin() as connection:
+            upgrade_schema(connection)
+        engine.dispose()
+
+    async def test_upgrade_schema_on_baseline_database(self):
+        """
+        Тест на чтение и запись после обновления базы первого выпуска без alembic_version
+        """
+        self.create_baseline()
+
+        self.assertEqual(self.revision(), "0010")
+        backend = self.create_backend()
+        await backend.write_data("app", "key", b"\x01")
+        await backend.put_data("app", "key", b"\x02")
+        await backend.write_data("other", "key", b"\x03")
+
+        self.assertEqual(await backend.read_data("app", "key"), b"\x02")
+        self.assertEqual(await backend.read_data("other", "key"), b"\x03")
+        self.assertEqual(await backend.read_version("app", "key", 1), b"\x01")
+        self.assertEqual(await backend.reap_expired(10), 0)
+
+    async def test_upgrade_schema_with_tables_from_create_all(self):
+        """
+        Тест на обновление базы, в которую create_all уже добавил новые таблицы
+        """
+        self.create_baseline(SecretChunk.__table__, JobCheckpoint.__table__)
+
+        self.assertEqual(self.revision(), "0010")
+        backend = self.create_backend()
+        await backend.write_data("app", "key", b"\x01")
+        self.assertEqual(await backend.read_data("app", "key"), b"\x01")
+        await asyncio.to_thread(command.check, self.alembic_config)
+
+    async def test_head_matches_models(self):
+        """
+        Тест на соответствие схемы после миграций моделям rdb_models
+        """
+        await self.migrate("head")
+
+        await asyncio.to_thread(command.check, self.alembic_config)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from core.config import Config
+from core.db_conn.config import config
+from core.db_conn.storage_backend import SecretStorage
+from core.key_access.key_access_module import KeyAccessModule
+from core.master.rewrap_master_key import MasterKeyRewrapJob
+from core.secret_engines.secret_module import (
+    AESEncryptionStrategy,
+    MasterLayerStrategy,
+    SecretEngineModule,
+)
+
+OLD_KEY = "00" * 32
+NEW_KEYS = "1:" + "11" * 32
+
+
+class TestMasterKeyRewrapJob(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        patcher = patch.multiple(
+            config,
+            secret_db_type="rbdstorage",  # noqa: S106
+            secret_db_uri=f"sqlite+aiosqlite:///{Path(directory.name) / 'secrets.db'}",
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch.multiple(
+            Config, MASTER_KEY=OLD_KEY, MASTER_KEYS=None, TYPE_ENCRYPT="aes256-gcm96"
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.storage = SecretStorage()
+        await self.storage.db_conn.create_tables()
+        self.addAsyncCleanup(self.storage.db_conn.engine.dispose)
+
+        _, self.app_key = await KeyAccessModule.generate_app_key("aes256-gcm96")
+        old_engine = SecretEngineModule()
+        self.values = {f"key-{i}": f"value-{i}".encode() for i in range(25)}
+        for key, value in self.values.items():
+            encrypted = await old_engine.encrypt("aes256-gcm96", self.app_key, value)
+            await self.storage.write_data("app", key, encrypted)
+        # Значение в режиме wrap не содержит слоя мастер-ключа
+        old_engine.key_wrapping = True
+        self.values["single-layer"] = b"single"
+        encrypted = await old_engine.encrypt("aes256-gcm96", self.app_key, b"single")
+        await self.storage.write_data("app", "single-layer", encrypted)
+
+    def _new_engine(self):
+        with patch.object(Config, "MASTER_KEYS", NEW_KEYS):
+            return SecretEngineModule()
+
+    async def _assert_values(self, engine):
+        for key, value in self.values.items():
+            encrypted = await self.storage.read_data("app", key)
+            self.assertEqual(await engine.decrypt("aes256-gcm96", self.app_key, encrypted), value)
+
+    async def test_rewrap_all_values(self):
+        """
+        Тест на перешифрование значений новым мастер-ключом
+        """
+        engine = self._new_engine()
+        progress = []
+        job = MasterKeyRewrapJob(
+            self.storage,
+            engine,
+            batch_size=4,
+            concurrency=2,
+            max_rate=0,
+            progress=progress.append,
+        )
+        result = await job.run()
+
+        self.assertEqual(result["secrets"]["scanned"], 26)
+        self.assertEqual(result["secrets"]["rewrapped"], 25)
+        self.assertTrue(result["secrets"]["done"])
+        self.assertEqual(progress[-1]["collection"], "secrets")
+        self.assertGreater(len(progress), 7)
+
+        # Старый ключ больше не нужен
+        with patch.multiple(Config, MASTER_KEY=None, MASTER_KEYS=NEW_KEYS):
+            await self._assert_values(SecretEngineModule())
+        for key in self.values:
+            encrypted = await self.storage.read_data("app", key)
+            if not engine.is_single_layer(encrypted):
+                master_layer = MasterLayerStrategy(AESEncryptionStrategy())
+                self.assertEqual(master_layer.key_version(encrypted), 1)
+
+    async def test_resume_from_checkpoint(self):
+        """
+        Тест на продолжение с контрольной точки
+        """
+        engine = self._new_engine()
+        job = MasterKeyRewrapJob(self.storage, engine, batch_size=4, max_rate=0)
+        await self.storage.write_checkpoint(
+            job._checkpoint_name("secrets"),
+            {"last_id": "10", "scanned": 10, "rewrapped": 10, "conflicts": 0},
+        )
+        result = await job.run()
+        self.assertEqual(result["secrets"]["scanned"], 26)
+        self.assertEqual(result["secrets"]["rewrapped"], 10 + 15)
+
+        self.assertEqual((await job.run())["secrets"]["scanned"], 26)
+        restarted = await job.run(restart=True)
+        self.assertEqual(restarted["secrets"]["rewrapped"], 10)
+        await self._assert_values(engine)
@@ -0,0 +1,357 @@
+import tracemalloc
+import unittest
+from os import urandom
+from unittest.mock import patch
+
+from cryptography.exceptions import InvalidTag
+
+from core.config import Config
+from core.key_access.key_access_module import KeyAccessModule, RSAKeyGenerationStrategy
+from core.secret_engines.secret_module import (
+    SINGLE_LAYER_HEADER,
+    AESEncryptionStrategy,
+    MasterKeyring,
+    MasterLayerStrategy,
+    RSAEncryptionStrategy,
+    SecretEngineModule,
+)
+
+
+class TestRSAKeyCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        generator = RSAKeyGenerationStrategy(2048)
+        cls.key = generator.serialize_key(generator.generate_key())
+
+    def setUp(self):
+        RSAEncryptionStrategy._key_cache.clear()
+        self.strategy = RSAEncryptionStrategy()
+
+    def test_key_parsed_once(self):
+        """
+        Тест на повторное использование разобранного ключа
+        """
+        before = RSAEncryptionStrategy.cache_stats()
+        ciphertext = self.strategy.encrypt(self.key, b"value")
+        self.assertEqual(self.strategy.decrypt(self.key, ciphertext), b"value")
+
+        after = RSAEncryptionStrategy.cache_stats()
+        self.assertEqual(after["misses"] - before["misses"], 1)
+        self.assertEqual(after["hits"] - before["hits"], 1)
+
+    def test_cache_shared_between_instances(self):
+        """
+        Тест на общий кеш для всех экземпляров стратегии
+        """
+        ciphertext = self.strategy.encrypt(self.key, b"value")
+        before = RSAEncryptionStrategy.cache_stats()
+        self.assertEqual(RSAEncryptionStrategy().decrypt(self.key, ciphertext), b"value")
+        self.assertEqual(RSAEncryptionStrategy.cache_stats()["hits"] - before["hits"], 1)
+
+    def test_invalidate_key(self):
+        """
+        Тест на сброс ключа из кеша
+        """
+        self.strategy.encrypt(self.key, b"value")
+        self.assertEqual(RSAEncryptionStrategy.cache_stats()["size"], 1)
+
+        RSAEncryptionStrategy.invalidate_key(self.key)
+        self.assertEqual(RSAEncryptionStrategy.cache_stats()["size"], 0)
+
+
+class TestRSAHybridEnvelope(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        generator = RSAKeyGenerationStrategy(2048)
+        cls.key = generator.serialize_key(generator.generate_key())
+
+    def test_large_value_round_trip(self):
+        """
+        Тест на шифрование значения больше предела RSA-OAEP
+        """
+        strategy = RSAEncryptionStrategy(hybrid=True)
+        value = b"x" * 64 * 1024
+        ciphertext = strategy.encrypt(self.key, value)
+
+        self.assertTrue(ciphertext.startswith(RSAEncryptionStrategy.HYBRID_MAGIC))
+        self.assertEqual(strategy.decrypt(self.key, ciphertext), value)
+
+    def test_legacy_ciphertext_readable(self):
+        """
+        Тест на чтение значений, зашифрованных без гибридного режима
+        """
+        ciphertext = RSAEncryptionStrategy(hybrid=False).encrypt(self.key, b"value")
+        plaintext = RSAEncryptionStrategy(hybrid=True).decrypt(self.key, ciphertext)
+        self.assertEqual(plaintext, b"value")
+
+    def test_tampered_envelope_rejected(self):
+        """
+        Тест на отказ при изменении зашифрованных данных
+        """
+        strategy = RSAEncryptionStrategy(hybrid=True)
+        ciphertext = bytearray(strategy.encrypt(self.key, b"value"))
+        ciphertext[-1] ^= 1
+
+        with self.assertRaises(InvalidTag):
+            strategy.decrypt(self.key, bytes(ciphertext))
+
+    def test_truncated_envelope_rejected(self):
+        """
+        Тест на отказ при данных короче заголовка
+        """
+        strategy = RSAEncryptionStrategy(hybrid=True)
+        ciphertext = strategy.encrypt(self.key, b"value")
+
+        for truncated in (b"", RSAEncryptionStrategy.HYBRID_MAGIC, ciphertext[:100]):
+            with self.subTest(size=len(truncated)), self.assertRaises(ValueError):
+                strategy.decrypt(self.key, truncated)
+
+
+class TestBatchEncryption(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        patcher = patch.multiple(Config, MASTER_KEY="00" * 32, TYPE_ENCRYPT="aes256-gcm96")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.engine = SecretEngineModule()
+
+    async def test_batch_round_trip(self):
+        """
+        Тест на пакетное шифрование и расшифровку для всех алгоритмов
+        """
+        values = [f"value-{i}".encode() for i in range(200)]
+        for algorithm in ("aes128-gcm96", "aes256-gcm96", "chacha20-poly1305", "rsa-2048"):
+            with self.subTest(algorithm=algorithm):
+                _, key = await KeyAccessModule.generate_app_key(algorithm)
+                encrypted = await self.engine.encrypt_many(algorithm, key, values, fan_out=True)
+                self.assertEqual(await self.engine.decrypt_many(algorithm, key, encrypted), values)
+
+    async def test_batch_compatible_with_single_operations(self):
+        """
+        Тест на совместимость формата пакетных и одиночных операций
+        """
+        _, key = await KeyAccessModule.generate_app_key("aes256-gcm96")
+        encrypted = await self.engine.encrypt_many("aes256-gcm96", key, [b"a", b"b"])
+        self.assertEqual(await self.engine.decrypt("aes256-gcm96", key, encrypted[1]), b"b")
+
+        single = await self.engine.encrypt("aes256-gcm96", key, b"c")
+        self.assertEqual(await self.engine.decrypt_many("aes256-gcm96", key, [single]), [b"c"])
+
+    async def test_rsa_batch_shares_data_key(self):
+        """
+        Тест на общий ключ данных для пакета RSA
+        """
+        _, key = await KeyAccessModule.generate_app_key("rsa-2048")
+        encrypted = RSAEncryptionStrategy(hybrid=True).encrypt_many(key, [b"a", b"b"])
+        header_size = len(RSAEncryptionStrategy.HYBRID_MAGIC) + 1 + 256
+        self.assertEqual(encrypted[0][:header_size], encrypted[1][:header_size])
+
+
+class TestKeyWrapping(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        patcher = patch.multiple(Config, MASTER_KEY="00" * 32, TYPE_ENCRYPT="aes256-gcm96")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.engine = SecretEngineModule()
+        self.engine.key_wrapping = True
+
+    async def test_wrap_app_key(self):
+        """
+        Тест на обёртывание ключа приложения мастер-ключом
+        """
+        _, app_key = await KeyAccessModule.generate_app_key("aes256-gcm96")
+        wrapped = self.engine.wrap_app_key(app_key)
+
+        self.assertTrue(self.engine.is_wrapped_key(wrapped))
+        self.assertEqual(self.engine.unwrap_app_key(wrapped), app_key)
+        self.assertEqual(self.engine.unwrap_app_key(app_key), app_key)
+
+    async def test_single_layer_value(self):
+        """
+        Тест на однократное шифрование значения ключом приложения
+        """
+        _, app_key = await KeyAccessModule.generate_app_key("aes256-gcm96")
+        encrypted = await self.engine.encrypt("aes256-gcm96", app_key, b"value")
+
+        self.assertTrue(self.engine.is_single_layer(encrypted))
+        self.assertEqual(
+            AESEncryptionStrategy().decrypt(app_key, encrypted[len(SINGLE_LAYER_HEADER) :]),
+            b"value",
+        )
+        self.assertEqual(await self.engine.decrypt("aes256-gcm96", app_key, encrypted), b"value")
+
+    async def test_legacy_double_encrypted_values_readable(self):
+        """
+        Тест на чтение значений, зашифрованных в двойном режиме
+        """
+        _, app_key = await KeyAccessModule.generate_app_key("aes256-gcm96")
+        self.engine.key_wrapping = False
+        legacy = await self.engine.encrypt_many("aes256-gcm96", app_key, [b"old"])
+        self.engine.key_wrapping = True
+        current = await self.engine.encrypt_many("aes256-gcm96", app_key, [b"new"])
+
+        self.assertFalse(self.engine.is_single_layer(legacy[0]))
+        decrypted = await self.engine.decrypt_many("aes256-gcm96", app_key, legacy + current)
+        self.assertEqual(decrypted, [b"old", b"new"])
+
+    async def test_tampered_chacha20_value_rejected(self):
+        """
+        Тест на обнаружение подмены значения ChaCha20, у которого нет своего тега
+        """
+        _, app_key = await KeyAccessModule.generate_app_key("chacha20-poly1305")
+        encrypted = bytearray(
+            await self.engine.encrypt("chacha20-poly1305", app_key, b"amount=100")
+        )
+
+        self.assertFalse(self.engine.is_single_layer(encrypted))
+        self.assertFalse(self.engine.seals_single_layer("chacha20-poly1305"))
+        encrypted[-4] ^= 1
+        with self.assertRaises(InvalidTag):
+            await self.engine.decrypt("chacha20-poly1305", app_key, bytes(encrypted))
+
+
+class TestAutoMasterCipher(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        patcher = patch.multiple(
+            Config, MASTER_KEY="00" * 32, TYPE_ENCRYPT="auto", MASTER_CIPHER=None
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _engine(self, master_cipher=None, type_encrypt="auto"):
+        with patch.multiple(Config, MASTER_CIPHER=master_cipher, TYPE_ENCRYPT=type_encrypt):
+            return SecretEngineModule()
+
+    async def test_calibration_selects_cipher(self):
+        """
+        Тест на выбор шифра мастер-слоя калибровкой
+        """
+        info = self._engine().master_layer_info()
+
+        self.assertIn(info["cipher"], {"aes256-gcm96", "chacha20-poly1305"})
+        self.assertEqual(info["calibration"]["selected"], info["cipher"])
+        self.assertEqual(
+            set(info["calibration"]["bytes_per_sec"]), {"aes256-gcm96", "chacha20-poly1305"}
+        )
+
+    async def test_mixed_fleet_readable(self):
+        """
+        Тест на чтение данных узлами с разным выбором шифра
+        """
+        _, app_key = await KeyAccessModule.generate_app_key("aes256-gcm96")
+        aes_node = self._engine("aes256-gcm96")
+        chacha_node = self._engine("chacha20-poly1305")
+        legacy_node = self._engine(type_encrypt="aes256-gcm96")
+
+        values = [
+            (await aes_node.encrypt_many("aes256-gcm96", app_key, [b"aes"]))[0],
+            (await chacha_node.encrypt_many("aes256-gcm96", app_key, [b"chacha"]))[0],
+            (await legacy_node.encrypt_many("aes256-gcm96", app_key, [b"legacy"]))[0],
+        ]
+        self.assertEqual(values[0][5], MasterLayerStrategy.cipher_id_by_name("aes256-gcm96"))
+        self.assertEqual(values[1][5], MasterLayerStrategy.cipher_id_by_name("chacha20-poly1305"))
+        self.assertFalse(values[2].startswith(MasterLayerStrategy.MASTER_MAGIC))
+
+        for node in (aes_node, chacha_node, legacy_node):
+            decrypted = await node.decrypt_many("aes256-gcm96", app_key, values)
+            self.assertEqual(decrypted, [b"aes", b"chacha", b"legacy"])
+            self.assertEqual(await node.decrypt("aes256-gcm96", app_key, values[1]), b"chacha")
+
+    async def test_tampered_header_rejected(self):
+        """
+        Тест на проверку целостности заголовка мастер-слоя
+        """
+        _, app_key = await KeyAccessModule.generate_app_key("aes256-gcm96")
+        engine = self._engine("chacha20-poly1305")
+        wrapped = bytearray(engine.wrap_app_key(app_key))
+        # Заменяем идентификатор шифра на AES-GCM
+        wrapped[len(b"VMTK") + 1 + 5] = MasterLayerStrategy.cipher_id_by_name("aes256-gcm96")
+
+        with self.assertRaises(InvalidTag):
+            engine.unwrap_app_key(bytes(wrapped))
+
+
+class TestZeroCopyRead(unittest.IsolatedAsyncioTestCase):
+    SIZE = 4 * 1024 * 1024
+
+    def setUp(self):
+        patcher = patch.multiple(Config, MASTER_KEY="00" * 32, TYPE_ENCRYPT="aes256-gcm96")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.engine = SecretEngineModule()
+
+    async def _decrypt_peak(self, key_wrapping):
+        _, app_key = await KeyAccessModule.generate_app_key("aes256-gcm96")
+        self.engine.key_wrapping = key_wrapping
+        value = urandom(self.SIZE)
+        encrypted = await self.engine.encrypt("aes256-gcm96", app_key, value)
+
+        tracemalloc.start()
+        self.addCleanup(tracemalloc.stop)
+        decrypted = await self.engine.decrypt("aes256-gcm96", app_key, encrypted)
+        _, peak = tracemalloc.get_traced_memory()
+
+        self.assertEqual(decrypted, value)
+        return peak
+
+    async def test_single_layer_read_allocates_plaintext_only(self):
+        """
+        Тест на отсутствие промежуточных копий при чтении значения
+        """
+        peak = await self._decrypt_peak(key_wrapping=True)
+        self.assertLess(peak, self.SIZE * 1.1)
+
+    async def test_double_layer_read_allocates_one_buffer_per_layer(self):
+        """
+        Тест на отсутствие промежуточных копий при двойном шифровании
+        """
+        peak = await self._decrypt_peak(key_wrapping=False)
+        self.assertLess(peak, self.SIZE * 2.1)
+
+
+class TestVersionedMasterKeys(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        patcher = patch.multiple(
+            Config, MASTER_KEY="00" * 32, MASTER_KEYS=None, TYPE_ENCRYPT="aes256-gcm96"
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_keyring_from_config(self):
+        """
+        Тест на чтение версий мастер-ключа из настроек
+        """
+        with patch.object(Config, "MASTER_KEYS", "1:" + "11" * 32 + ", 2:" + "22" * 32):
+            keyring = MasterKeyring.from_config()
+            self.assertEqual(keyring.versions, [0, 1, 2])
+            self.assertEqual(keyring.active_version, 2)
+            with patch.object(Config, "MASTER_KEY_VERSION", "1"):
+                self.assertEqual(MasterKeyring.from_config().active_key, bytes.fromhex("11" * 32))
+            with patch.object(Config, "MASTER_KEY_VERSION", "3"), self.assertRaises(ValueError):
+                MasterKeyring.from_config()
+
+    async def test_old_versions_readable_and_rewrapped(self):
+        """
+        Тест на чтение и перешифрование данных под старой версией мастер-ключа
+        """
+        _, app_key = await KeyAccessModule.generate_app_key("aes256-gcm96")
+        old_engine = SecretEngineModule()
+        value = await old_engine.encrypt("aes256-gcm96", app_key, b"value")
+        wrapped_key = old_engine.wrap_app_key(app_key)
+
+        with patch.object(Config, "MASTER_KEYS", "1:" + "11" * 32):
+            engine = SecretEngineModule()
+        self.assertEqual(await engine.decrypt("aes256-gcm96", app_key, value), b"value")
+        self.assertEqual(engine.unwrap_app_key(wrapped_key), app_key)
+
+        [new_value] = await engine.rewrap_values([value])
+        [new_wrapped_key] = await engine.rewrap_app_keys([wrapped_key])
+        self.assertEqual(MasterLayerStrategy(None).key_version(new_value), 1)
+        self.assertEqual(await engine.rewrap_values([new_value]), [None])
+        self.assertEqual(await engine.rewrap_app_keys([app_key]), [None])
+
+        with patch.multiple(Config, MASTER_KEY=None, MASTER_KEYS="1:" + "11" * 32):
+            engine = SecretEngineModule()
+        self.assertEqual(await engine.decrypt("aes256-gcm96", app_key, new_value), b"value")
+        self.assertEqual(engine.unwrap_app_key(new_wrapped_key), app_key)
+        with self.assertRaises(ValueError):
+            await engine.decrypt("aes256-gcm96", app_key, value)
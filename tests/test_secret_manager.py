@@ -0,0 +1,460 @@
+import asyncio
+import unittest
+from datetime import UTC, datetime
+from hashlib import sha256
+from os import urandom
+from unittest.mock import AsyncMock, patch
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.serialization import load_pem_public_key
+
+from core.config import Config
+from core.db_conn.storage_backend import BlobManifest
+from core.key_access.key_access_module import KeyAccessModule
+from core.master.master_module import SecretManagerModule
+from core.secret_engines.secret_module import SINGLE_LAYER_HEADER
+from core.secret_engines.signing_module import SigningEngineModule
+
+
+class TestTransit(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        patcher = patch.multiple(Config, MASTER_KEY="00" * 32, TYPE_ENCRYPT="aes256-gcm96")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.manager = SecretManagerModule()
+        self.manager._get_app_key = AsyncMock(return_value=urandom(32))
+        self.manager.secret_storage = AsyncMock()
+
+    async def test_round_trip_without_storage(self):
+        """
+        Тест на шифрование данных вызывающего сервиса без сохранения
+        """
+        plaintexts = [urandom(size) for size in range(0, 1000, 7)]
+        ciphertexts = await self.manager.transit_encrypt("app", plaintexts, "aes256-gcm96")
+        decrypted = await self.manager.transit_decrypt("app", ciphertexts, "aes256-gcm96")
+
+        self.assertEqual(decrypted, plaintexts)
+        self.assertEqual(self.manager._get_app_key.await_count, 2)
+        self.assertEqual(self.manager.secret_storage.mock_calls, [])
+
+    async def test_tampered_item_rejected(self):
+        """
+        Тест на отказ при изменённом шифротексте
+        """
+        ciphertexts = await self.manager.transit_encrypt("app", [b"a", b"b"], "aes256-gcm96")
+        ciphertexts[1] = ciphertexts[1][:-1] + bytes([ciphertexts[1][-1] ^ 1])
+
+        with self.assertRaises(InvalidTag):
+            await self.manager.transit_decrypt("app", ciphertexts, "aes256-gcm96")
+
+
+class TestSigning(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        patcher = patch.multiple(Config, MASTER_KEY="00" * 32, TYPE_ENCRYPT="aes256-gcm96")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.manager = SecretManagerModule()
+        self.manager.secret_storage = AsyncMock()
+        SigningEngineModule._key_cache.clear()
+
+    async def _use_new_key(self, algorithm):
+        _, app_key = await KeyAccessModule.generate_app_key(algorithm)
+        self.manager._get_app_key = AsyncMock(return_value=app_key)
+        return app_key
+
+    async def test_batch_sign_and_verify(self):
+        """
+        Тест на пакетную подпись и проверку для всех алгоритмов подписи
+        """
+        digests = [sha256(str(i).encode()).digest() for i in range(200)]
+        for algorithm in ("ed25519", "ecdsa-p256", "ecdsa-p384", "ecdsa-p521"):
+            with self.subTest(algorithm=algorithm):
+                await self._use_new_key(algorithm)
+                signatures = await self.manager.sign("app", digests, algorithm)
+                signatures[3] = signatures[4]
+
+                valid = await self.manager.verify("app", digests, signatures, algorithm)
+                self.assertEqual(valid, [i != 3 for i in range(200)])
+
+    async def test_key_parsed_once_per_application_key(self):
+        """
+        Тест на однократный разбор ключа подписи
+        """
+        app_key = await self._use_new_key("ed25519")
+        before = SigningEngineModule.cache_stats()
+        await self.manager.sign("app", [b"a"] * 500, "ed25519")
+        await self.manager.sign("app", [b"b"] * 500, "ed25519")
+        self.assertEqual(SigningEngineModule.cache_stats()["misses"] - before["misses"], 1)
+
+        self.manager._on_app_key_changed("app", app_key)
+        self.assertEqual(SigningEngineModule.cache_stats()["size"], 0)
+
+    async def test_public_key_verifies_signature(self):
+        """
+        Тест на проверку подписи открытым ключом приложения
+        """
+        await self._use_new_key("ecdsa-p256")
+        signature = (await self.manager.sign("app", [b"artifact"], "ecdsa-p256"))[0]
+        public_key = load_pem_public_key(await self.manager.get_public_key("app", "ecdsa-p256"))
+
+        public_key.verify(signature, b"artifact", ec.ECDSA(hashes.SHA256()))
+
+
+class TestAppKeyCache(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        patcher = patch.multiple(Config, MASTER_KEY="00" * 32, TYPE_ENCRYPT="aes256-gcm96")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.manager = SecretManagerModule()
+        self.app_key = urandom(32)
+        self.manager.secret_storage = AsyncMock()
+        self.manager.secret_storage._read_key_app.return_value = self.app_key
+
+    async def test_key_read_once(self):
+        """
+        Тест на чтение ключа приложения из базы один раз и хранение в обёрнутом виде
+        """
+        for _ in range(3):
+            self.assertEqual(await self.manager._get_app_key("app", None), self.app_key)
+
+        self.assertEqual(self.manager.secret_storage._read_key_app.await_count, 1)
+        self.assertNotEqual(self.manager._app_key_cache.get("app"), self.app_key)
+        stats = self.manager.app_key_cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (3, 1))
+
+    async def test_invalidated_on_key_change(self):
+        """
+        Тест на сброс кеша при изменении ключа приложения
+        """
+        await self.manager._get_app_key("app", None)
+        new_key = urandom(32)
+        self.manager.secret_storage._read_key_app.return_value = new_key
+        self.manager._on_app_key_changed("app", self.app_key)
+
+        self.assertEqual(await self.manager._get_app_key("app", None), new_key)
+        self.assertEqual(self.manager.secret_storage._read_key_app.await_count, 2)
+
+    async def test_expired_entry(self):
+        """
+        Тест на повторное чтение ключа после истечения срока жизни записи
+        """
+        self.manager._app_key_cache.ttl = 0
+        await self.manager._get_app_key("app", None)
+        await self.manager._get_app_key("app", None)
+
+        self.assertEqual(self.manager.secret_storage._read_key_app.await_count, 2)
+        self.assertEqual(self.manager.app_key_cache_stats()["expirations"], 1)
+
+
+class TestAppKeyCreation(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        patcher = patch.multiple(Config, MASTER_KEY="00" * 32, TYPE_ENCRYPT="aes256-gcm96")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.manager = SecretManagerModule()
+        self.manager.secret_storage = AsyncMock()
+        self.manager.secret_storage._read_key_app.return_value = None
+
+        async def generate_app_key(algorithm):
+            await asyncio.sleep(0.01)
+            return algorithm, urandom(32)
+
+        self.manager.key_access.generate_app_key = AsyncMock(side_effect=generate_app_key)
+
+    async def test_single_flight(self):
+        """
+        Тест на создание одного ключа при параллельных первых запросах приложения
+        """
+
+        async def write_key_app(app_id, stored_key):
+            await asyncio.sleep(0.01)
+            return stored_key
+
+        self.manager.secret_storage._write_key_app.side_effect = write_key_app
+        keys = await asyncio.gather(
+            *(self.manager._get_app_key("app", "aes256-gcm96") for _ in range(20))
+        )
+
+        self.assertEqual(len(set(keys)), 1)
+        self.assertEqual(self.manager.key_access.generate_app_key.await_count, 1)
+        self.assertEqual(self.manager.secret_storage._write_key_app.await_count, 1)
+        self.assertEqual(self.manager._app_key_creations, {})
+
+    async def test_key_stored_by_other_instance(self):
+        """
+        Тест на использование ключа, который другой экземпляр сервиса сохранил первым
+        """
+        other_key = urandom(32)
+        self.manager.secret_storage._write_key_app.return_value = other_key
+
+        self.assertEqual(await self.manager._get_app_key("app", "aes256-gcm96"), other_key)
+
+
+class TestBulkRead(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        patcher = patch.multiple(Config, MASTER_KEY="00" * 32, TYPE_ENCRYPT="aes256-gcm96")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.manager = SecretManagerModule()
+        self.app_key = urandom(32)
+        self.manager.secret_storage = AsyncMock()
+        self.manager.secret_storage._read_key_app.return_value = self.app_key
+
+    async def test_bulk_read(self):
+        """
+        Тест на чтение нескольких секретов одним запросом к хранилищу
+        """
+        # Значение секрета может совпадать с чем угодно, блоб отмечает только хранилище
+        values = [f"value-{i}".encode() for i in range(100)] + [b"VMTBLOB1{}", b"{}"]
+        encrypted_values = await self.manager.secret_engine.encrypt_many(
+            "aes256-gcm96", self.app_key, values
+        )
+        encrypted_values[-1] = BlobManifest(encrypted_values[-1])
+        keys = [f"key-{i}" for i in range(len(values))]
+        self.manager.secret_storage.read_many.return_value = dict(zip(keys, encrypted_values))
+
+        result = await self.manager.retrieve_secrets("app", keys + ["unknown"], "aes256-gcm96")
+
+        self.assertEqual(
+            result["secrets"],
+            {**{f"key-{i}": f"value-{i}" for i in range(100)}, "key-100": "VMTBLOB1{}"},
+        )
+        self.assertEqual(result["missing"], ["unknown"])
+        self.assertEqual(result["blobs"], ["key-101"])
+        self.manager.secret_storage.read_many.assert_awaited_once_with("app", keys + ["unknown"])
+        self.manager.secret_storage.read_data.assert_not_awaited()
+
+    async def test_application_without_key(self):
+        """
+        Тест на чтение секретов приложения, у которого ещё нет ключа
+        """
+        self.manager.secret_storage._read_key_app.return_value = None
+
+        result = await self.manager.retrieve_secrets("app", None, "aes256-gcm96")
+
+        self.assertEqual(result, {"secrets": {}, "missing": [], "blobs": []})
+        self.manager.secret_storage.read_many.assert_not_awaited()
+
+
+class TestSecretVersions(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        patcher = patch.multiple(Config, MASTER_KEY="00" * 32, TYPE_ENCRYPT="aes256-gcm96")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.manager = SecretManagerModule()
+        self.app_key = urandom(32)
+        self.manager.secret_storage = AsyncMock()
+        self.manager.secret_storage._read_key_app.return_value = self.app_key
+
+    async def test_list_versions_pages(self):
+        """
+        Тест на постраничный вывод версий секрета по номеру версии
+        """
+        history = [{"version": version, "is_deleted": False} for version in range(5, 0, -1)]
+
+        async def list_versions(app_id, key, before_version, limit):
+            versions = [
+                v for v in history if before_version is None or v["version"] < before_version
+            ]
+            return versions[:limit]
+
+        self.manager.secret_storage.list_versions.side_effect = list_versions
+
+        first = await self.manager.list_secret_versions("app", "key", limit=2)
+        second = await self.manager.list_secret_versions("app", "key", first["next_before"], 2)
+        last = await self.manager.list_secret_versions("app", "key", second["next_before"], 2)
+
+        self.assertEqual([v["version"] for v in first["versions"]], [5, 4])
+        self.assertEqual([v["version"] for v in second["versions"]], [3, 2])
+        self.assertEqual([v["version"] for v in last["versions"]], [1])
+        self.assertIsNone(last["next_before"])
+
+    async def test_retrieve_version(self):
+        """
+        Тест на чтение конкретной версии и версии на момент времени
+        """
+        encrypted_value = await self.manager.secret_engine.encrypt(
+            "aes256-gcm96", self.app_key, b"old"
+        )
+        self.manager.secret_storage.read_version.return_value = encrypted_value
+        self.manager.secret_storage.read_as_of.return_value = None
+
+        self.assertEqual(
+            await self.manager.retrieve_secret_version("app", "key", version=2), {"key": "old"}
+        )
+        self.assertEqual(
+            await self.manager.retrieve_secret_version("app", "key", as_of=datetime.now(UTC)),
+            {"error": "Secret not found"},
+        )
+        self.manager.secret_storage.read_version.assert_awaited_once_with("app", "key", 2)
+        self.manager.secret_storage.read_data.assert_not_awaited()
+
+
+class TestSecretCache(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        patcher = patch.multiple(
+            Config,
+            MASTER_KEY="00" * 32,
+            TYPE_ENCRYPT="aes256-gcm96",
+            SECRET_CACHE_SIZE=16,
+            SECRET_CACHE_EXCLUDED_NAMESPACES="restricted",  # noqa: S106
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.manager = SecretManagerModule()
+        self.app_key = urandom(32)
+        self.manager.secret_storage = AsyncMock()
+        self.manager.secret_storage._read_key_app.return_value = self.app_key
+        self.manager.secret_storage.read_data.return_value = (
+            await self.manager.secret_engine.encrypt("aes256-gcm96", self.app_key, b"password")
+        )
+
+    async def _read(self, cache=True):
+        return await self.manager.process_request("app", "db", "aes256-gcm96", cache=cache)
+
+    async def test_cached_read(self):
+        """
+        Тест на чтение часто запрашиваемого секрета из кеша
+        """
+        for _ in range(3):
+            self.assertEqual(await self._read(), {"db": "password"})
+
+        self.assertEqual(self.manager.secret_storage.read_data.await_count, 1)
+        stats = self.manager.secret_cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 1))
+
+    async def test_invalidated_on_write_and_delete(self):
+        """
+        Тест на сброс кеша при сохранении и удалении секрета
+        """
+        await self._read()
+        await self.manager.process_request("app", {"db": "new"}, "aes256-gcm96")
+        await self._read()
+        await self.manager.delete_secret("app", "db")
+        await self._read()
+
+        self.assertEqual(self.manager.secret_storage.read_data.await_count, 3)
+
+    async def test_read_during_write(self):
+        """
+        Тест на сброс кеша, если чтение старого значения пришлось на время записи
+        """
+        new_value = await self.manager.secret_engine.encrypt(
+            "aes256-gcm96", self.app_key, b"new-password"
+        )
+
+        async def write_many(app_id, values, expires_at):
+            # Параллельное чтение успевает получить из хранилища старое значение
+            self.assertEqual(await self._read(), {"db": "password"})
+            self.manager.secret_storage.read_data.return_value = new_value
+            return {"status": "success"}
+
+        self.manager.secret_storage.write_many.side_effect = write_many
+        await self.manager.process_request("app", {"db": "new-password"}, "aes256-gcm96")
+
+        self.assertEqual(await self._read(), {"db": "new-password"})
+
+    async def test_opt_out(self):
+        """
+        Тест на отключение кеша для запроса и для неймспейса
+        """
+        await self._read(cache=False)
+        await self._read(cache=False)
+
+        self.assertEqual(self.manager.secret_storage.read_data.await_count, 2)
+        self.assertEqual(len(self.manager._secret_cache), 0)
+        self.assertTrue(self.manager.secret_cache_allowed("team"))
+        self.assertFalse(self.manager.secret_cache_allowed("restricted"))
+
+
+class TestKeyWrappingMigration(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        patcher = patch.multiple(
+            Config, MASTER_KEY="00" * 32, TYPE_ENCRYPT="aes256-gcm96", KEY_WRAPPING_MODE="wrap"
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.manager = SecretManagerModule()
+        self.app_key = urandom(32)
+        self.manager.secret_engine.key_wrapping = False
+        self.values = {
+            "db": await self.manager.secret_engine.encrypt("aes256-gcm96", self.app_key, b"pw"),
+            "file": BlobManifest(
+                await self.manager.secret_engine.encrypt(
+                    "aes256-gcm96", self.app_key, b'{"blob_id": "blob"}'
+                )
+            ),
+        }
+        self.manager.secret_engine.key_wrapping = True
+        self.app_keys = {"app": self.app_key}
+
+        storage = self.manager.secret_storage = AsyncMock()
+        storage._read_key_app.side_effect = self.app_keys.get
+        storage._update_key_app.side_effect = self.app_keys.__setitem__
+        storage.list_secret_keys.side_effect = lambda app_id: list(self.values)
+        storage.read_data.side_effect = lambda app_id, key: self.values.get(key)
+        storage.put_data.side_effect = lambda app_id, key, value, blob_id: self.values.update(
+            {key: BlobManifest(value) if blob_id else value}
+        )
+
+    async def test_second_run_changes_nothing(self):
+        """
+        Тест на повторный запуск миграции без новых версий и изменений ключа
+        """
+        first = await self.manager.migrate_key_wrapping("app", "aes256-gcm96")
+        migrated_values, migrated_keys = dict(self.values), dict(self.app_keys)
+        second = await self.manager.migrate_key_wrapping("app", "aes256-gcm96")
+
+        self.assertEqual(first, {"migrated": 2, "skipped": 0})
+        self.assertEqual(second, {"migrated": 0, "skipped": 2})
+        self.assertEqual(self.values, migrated_values)
+        self.assertEqual(self.app_keys, migrated_keys)
+        self.assertEqual(self.manager.secret_storage.put_data.await_count, 2)
+        # Манифест блоба остаётся отмеченным после перешифрования
+        self.assertIsInstance(self.values["file"], BlobManifest)
+        self.assertEqual(
+            self.manager.secret_storage.put_data.await_args_list[1].kwargs["blob_id"], "blob"
+        )
+        self.assertEqual(self.manager.secret_storage._update_key_app.await_count, 1)
+        self.assertTrue(self.manager.secret_engine.is_single_layer(self.values["db"]))
+        self.assertEqual(
+            await self.manager.secret_engine.decrypt(
+                "aes256-gcm96", self.app_key, self.values["db"]
+            ),
+            b"pw",
+        )
+
+    async def test_chacha20_values_keep_master_layer(self):
+        """
+        Тест на перенос значений ChaCha20 в двойной режим: без мастер-слоя подмена не видна
+        """
+        strategy = self.manager.secret_engine._get_strategy("chacha20-poly1305")
+        self.values = {
+            "db": SINGLE_LAYER_HEADER + strategy.encrypt(self.app_key, b"amount=100"),
+            "old": await self.manager.secret_engine.encrypt(
+                "chacha20-poly1305", self.app_key, b"amount=200"
+            ),
+        }
+
+        result = await self.manager.migrate_key_wrapping("app", "chacha20-poly1305")
+
+        self.assertEqual(result, {"migrated": 1, "skipped": 1})
+        self.assertFalse(self.manager.secret_engine.is_single_layer(self.values["db"]))
+        self.assertEqual(
+            await self.manager.secret_engine.decrypt(
+                "chacha20-poly1305", self.app_key, self.values["db"]
+            ),
+            b"amount=100",
+        )
+
+    async def test_refused_in_double_mode(self):
+        """
+        Тест на отказ от миграции, если значения шифруются в двух слоях
+        """
+        self.manager.secret_engine.key_wrapping = False
+
+        with self.assertRaises(RuntimeError):
+            await self.manager.migrate_key_wrapping("app", "aes256-gcm96")
+        self.manager.secret_storage.put_data.assert_not_awaited()
@@ -0,0 +1,50 @@
+import json
+import tracemalloc
+import unittest
+
+from api.responses import SecretJSONResponse
+
+
+class TestSecretJSONResponse(unittest.TestCase):
+    def test_matches_json_encoding(self):
+        """
+        Тест на совпадение ответа с обычной JSON-сериализацией
+        """
+        values = [
+            b"plain",
+            b'quote " and \\ slash',
+            b"line\nbreak\ttab\x00\x1f",
+            "юникод".encode(),
+        ]
+        for value in values:
+            with self.subTest(value=value):
+                content = {"status": "success", "secret": {"key": bytearray(value)}}
+                body = SecretJSONResponse(content).body
+                self.assertEqual(
+                    json.loads(body), {"status": "success", "secret": {"key": value.decode()}}
+                )
+
+    def test_error_response(self):
+        """
+        Тест на сериализацию ответа с ошибкой
+        """
+        body = SecretJSONResponse({"status": "success", "secret": {"error": "Secret not found"}})
+        self.assertEqual(
+            json.loads(body.body), {"status": "success", "secret": {"error": "Secret not found"}}
+        )
+
+    def test_large_secret_copied_once(self):
+        """
+        Тест на однократное копирование большого секрета в тело ответа
+        """
+        size = 4 * 1024 * 1024
+        value = bytearray(b"a" * size)
+
+        tracemalloc.start()
+        self.addCleanup(tracemalloc.stop)
+        response = SecretJSONResponse({"status": "success", "secret": {"key": value}})
+        _, peak = tracemalloc.get_traced_memory()
+
+        envelope = b'{"status":"success","secret":{"key":""}}'
+        self.assertEqual(len(response.body), size + len(envelope))
+        self.assertLess(peak, size * 1.1)
@@ -0,0 +1,106 @@
+import asyncio
+import unittest
+from unittest.mock import MagicMock, patch
+
+from core.master.secret_watcher import RESYNC_EVENT, SecretWatcher
+
+
+class FakeStorage:
+    def __init__(self):
+        self.changes = asyncio.Queue()
+        self.feeds = 0
+        self.failures = 0
+
+    async def watch_changes(self, position=None):
+        self.feeds += 1
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("feed error")
+        while True:
+            change = await self.changes.get()
+            yield change["version"], change
+
+
+class TestSecretWatcher(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.storage = FakeStorage()
+        self.watcher = SecretWatcher(self.storage, queue_size=2)
+
+    async def asyncTearDown(self):
+        self.watcher.shutdown()
+
+    async def publish(self, application_id, key, version):
+        await self.storage.changes.put(
+            {"application_id": application_id, "key": key, "version": version, "deleted": False}
+        )
+        # Даём ленте изменений доставить событие подписчикам
+        for _ in range(3):
+            await asyncio.sleep(0)
+
+    async def test_fan_out(self):
+        """
+        Тест на доставку изменений только подписчикам своего приложения
+        """
+        listener = MagicMock()
+        self.watcher.add_listener(listener)
+        first = self.watcher.subscribe("app")
+        second = self.watcher.subscribe("app")
+        other = self.watcher.subscribe("other")
+
+        await self.publish("app", "key", 2)
+
+        expected = {"key": "key", "version": 2, "deleted": False}
+        self.assertEqual(first.get_nowait(), expected)
+        self.assertEqual(second.get_nowait(), expected)
+        self.assertTrue(other.empty())
+        listener.assert_called_once()
+        self.assertEqual(self.storage.feeds, 1)
+        self.assertEqual(self.watcher.stats()["subscribers"], 3)
+
+    async def test_resync_on_overflow(self):
+        """
+        Тест на замену изменений событием resync, если подписчик отстал
+        """
+        queue = self.watcher.subscribe("app")
+        for version in range(1, 4):
+            await self.publish("app", "key", version)
+
+        self.assertIs(queue.get_nowait(), RESYNC_EVENT)
+        self.assertTrue(queue.empty())
+        self.assertEqual(self.watcher.stats()["dropped"], 1)
+
+    async def test_feed_stops_without_subscribers(self):
+        """
+        Тест на остановку ленты изменений после отписки последнего подписчика
+        """
+        queue = self.watcher.subscribe("app")
+        await asyncio.sleep(0)
+        task = self.watcher._task
+
+        self.watcher.unsubscribe("app", queue)
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertIsNone(self.watcher._task)
+        self.assertEqual(self.watcher.stats()["subscribers"], 0)
+
+    async def test_resync_on_feed_error(self):
+        """
+        Тест на событие resync для всех подписчиков после ошибки ленты изменений
+        """
+        self.storage.failures = 1
+        queue = self.watcher.subscribe("app")
+        other = self.watcher.subscribe("other")
+
+        with patch("core.master.secret_watcher.Config.WATCH_POLL_INTERVAL", 0):
+            await asyncio.sleep(0)
+            await self.publish("app", "key", 2)
+
+        self.assertIs(queue.get_nowait(), RESYNC_EVENT)
+        self.assertEqual(queue.get_nowait(), {"key": "key", "version": 2, "deleted": False})
+        self.assertIs(other.get_nowait(), RESYNC_EVENT)
+        self.assertEqual(self.storage.feeds, 2)
+        self.assertEqual(self.watcher.stats()["errors"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
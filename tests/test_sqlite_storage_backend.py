@@ -0,0 +1,343 @@
+import asyncio
+import tempfile
+import unittest
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+from sqlalchemy import func, select
+
+from core.db_conn.config import config
+from core.db_conn.rdb_models import LATEST_LIVE_SECRET, Secret, SecretChunk
+from core.db_conn.storage_backend import BlobManifest, RDBStorageBackend
+
+
+class TestRDBBulkOperations(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        with patch.object(
+            config,
+            "secret_db_uri",
+            f"sqlite+aiosqlite:///{Path(directory.name) / 'secrets.db'}",
+        ):
+            self.backend = RDBStorageBackend()
+        await self.backend.create_tables()
+        self.addAsyncCleanup(self.backend.engine.dispose)
+
+    async def test_write_many_and_read_many(self):
+        """
+        Тест на запись и чтение нескольких секретов одним запросом
+        """
+        values = {f"key-{i}": f"value-{i}".encode() for i in range(500)}
+        await self.backend.write_many("app", values)
+        await self.backend.write_data("other", "other-key", b"other")
+
+        self.assertEqual(await self.backend.read_many("app"), values)
+        self.assertEqual(
+            await self.backend.read_many("app", ["key-1", "key-2", "other-key", "unknown"]),
+            {"key-1": b"value-1", "key-2": b"value-2"},
+        )
+
+    async def test_write_many_all_or_nothing(self):
+        """
+        Тест на отсутствие частичной записи при конфликте ключей
+        """
+        await self.backend.write_data("app", "existing", b"old")
+
+        with self.assertRaises(ValueError):
+            await self.backend.write_many("app", {"new-1": b"1", "existing": b"2", "new-2": b"3"})
+
+        self.assertEqual(await self.backend.read_many("app"), {"existing": b"old"})
+
+    async def test_put_data(self):
+        """
+        Тест на создание секрета и увеличение версии при повторной записи
+        """
+        self.assertEqual(await self.backend.put_data("app", "key", b"v1"), 1)
+        self.assertEqual(await self.backend.put_data("app", "key", b"v2"), 2)
+        await self.backend.delete_data("app", "key")
+        self.assertEqual(await self.backend.put_data("app", "key", b"v3"), 3)
+
+        self.assertEqual(await self.backend.read_data("app", "key"), b"v3")
+
+    async def test_versions(self):
+        """
+        Тест на сохранение истории версий и чтение версии по номеру и на момент времени
+        """
+        before = datetime.now(UTC) - timedelta(seconds=1)
+        await self.backend.put_data("app", "key", b"v1")
+        between = datetime.now(UTC)
+        await self.backend.put_data("app", "key", b"v2")
+        await self.backend.put_data("app", "key", b"v3")
+
+        versions = await self.backend.list_versions("app", "key", None, 2)
+        self.assertEqual(
+            [(v["version"], v["is_deleted"]) for v in versions], [(3, False), (2, False)]
+        )
+        versions = await self.backend.list_versions("app", "key", 2, 2)
+        self.assertEqual([v["version"] for v in versions], [1])
+        self.assertEqual(await self.backend.read_version("app", "key", 1), b"v1")
+        self.assertEqual(await self.backend.read_data("app", "key"), b"v3")
+        self.assertEqual(await self.backend.read_as_of("app", "key", between), b"v1")
+        self.assertEqual(await self.backend.read_as_of("app", "key", datetime.now(UTC)), b"v3")
+        self.assertIsNone(await self.backend.read_as_of("app", "key", before))
+
+        await self.backend.delete_data("app", "key")
+        self.assertIsNone(await self.backend.read_version("app", "key", 1))
+        self.assertIsNone(await self.backend.read_as_of("app", "key", datetime.now(UTC)))
+
+    async def test_keys_per_application(self):
+        """
+        Тест на одинаковые ключи секретов в разных приложениях
+        """
+        await self.backend.write_data("app", "db-password", b"first")
+        await self.backend.write_many("other", {"db-password": b"second"})
+        self.assertEqual(await self.backend.put_data("other", "db-password", b"third"), 2)
+
+        with self.assertRaises(ValueError):
+            await self.backend.write_data("app", "db-password", b"again")
+        self.assertEqual(await self.backend.read_data("app", "db-password"), b"first")
+        self.assertEqual(await self.backend.read_data("other", "db-password"), b"third")
+        self.assertEqual(await self.backend.list_secret_keys("other"), ["db-password"])
+
+    async def test_read_uses_latest_live_index(self):
+        """
+        Тест на чтение секрета одним поиском по частичному индексу последних версий
+        """
+        await self.backend.put_data("app", "key", b"v1")
+        await self.backend.put_data("app", "key", b"v2")
+
+        async with self.backend.engine.connect() as connection:
+            query = (
+                select(Secret.secret_value)
+                .filter(
+                    Secret.application_id == "app",
+                    Secret.secret_key == "key",  # noqa: S105
+                    LATEST_LIVE_SECRET,
+                    self.backend._unexpired(),
+                )
+                .compile(connection.sync_engine, compile_kwargs={"literal_binds": True})
+            )
+            result = await connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {query}")
+            plan = " ".join(row[-1] for row in result)
+
+        self.assertIn("SEARCH secrets USING INDEX ix_secrets_latest_live", plan)
+
+    async def test_leases(self):
+        """
+        Тест на скрытие истёкших секретов, продление и отзыв аренды
+        """
+        now = datetime.now(UTC)
+        await self.backend.write_many("app", {"permanent": b"p"})
+        await self.backend.write_many("app", {"leased": b"l"}, now + timedelta(hours=1))
+        await self.backend.write_many("app", {"expired": b"e"}, now - timedelta(seconds=1))
+
+        self.assertEqual(await self.backend.read_many("app"), {"permanent": b"p", "leased": b"l"})
+        self.assertIsNone(await self.backend.read_data("app", "expired"))
+        self.assertFalse(await self.backend.set_expiry("app", "expired", now + timedelta(hours=1)))
+
+        self.assertTrue(await self.backend.set_expiry("app", "leased", now + timedelta(days=1)))
+        self.assertEqual(await self.backend.read_data("app", "leased"), b"l")
+        self.assertTrue(await self.backend.set_expiry("app", "leased", now))
+        self.assertIsNone(await self.backend.read_data("app", "leased"))
+        self.assertEqual(sorted(await self.backend.list_secret_keys("app")), ["permanent"])
+
+    async def test_lease_kept_by_new_versions(self):
+        """
+        Тест на сохранение аренды новой версией и скрытие истёкшего секрета при чтении на момент
+        """
+        now = datetime.now(UTC)
+        expires_at = now + timedelta(hours=1)
+        await self.backend.write_many("app", {"leased": b"v1"}, expires_at)
+        await self.backend.put_data("app", "leased", b"v2")
+
+        self.assertEqual(await self.backend.read_data("app", "leased"), b"v2")
+        async with self.backend.session() as session:
+            result = await session.execute(
+                select(Secret.expires_at).filter(Secret.application_id == "app")
+            )
+            leases = list(result.scalars())
+        self.assertEqual(leases, [expires_at.replace(tzinfo=None)] * 2)
+        self.assertTrue(await self.backend.set_expiry("app", "leased", now))
+
+        self.assertIsNone(await self.backend.read_data("app", "leased"))
+        self.assertIsNone(await self.backend.read_as_of("app", "leased", datetime.now(UTC)))
+        self.assertIsNone(await self.backend.read_version("app", "leased", 1))
+
+    async def test_reap_expired_in_batches(self):
+        """
+        Тест на удаление истёкших секретов пакетами ограниченного размера
+        """
+        expired_at = datetime.now(UTC) - timedelta(seconds=1)
+        await self.backend.write_many("app", {f"key-{i}": b"v" for i in range(5)}, expired_at)
+        await self.backend.write_data("app", "permanent", b"p")
+
+        self.assertEqual(await self.backend.reap_expired(2), 2)
+        self.assertEqual(await self.backend.reap_expired(2), 2)
+        self.assertEqual(await self.backend.reap_expired(2), 1)
+        self.assertEqual(await self.backend.reap_expired(2), 0)
+        self.assertEqual(await self.backend.read_many("app"), {"permanent": b"p"})
+        # Ключ освободился и может быть записан заново
+        await self.backend.write_many("app", {"key-0": b"new"})
+
+    async def test_watch_changes(self):
+        """
+        Тест на получение изменений версий опросом по updated_at
+        """
+        await self.backend.put_data("app", "old", b"v1")
+        changes = self.backend.watch_changes(datetime.now(UTC).replace(tzinfo=None))
+        self.addAsyncCleanup(changes.aclose)
+
+        await self.backend.put_data("app", "key", b"v1")
+        await self.backend.put_data("app", "key", b"v2")
+        await self.backend.delete_data("app", "old")
+
+        received = [(await anext(changes))[1] for _ in range(2)]
+        self.assertEqual(
+            received,
+            [
+                {"application_id": "app", "key": "key", "version": 2, "deleted": False},
+                {"application_id": "app", "key": "old", "version": 1, "deleted": True},
+            ],
+        )
+
+    async def test_blob_manifest_mark(self):
+        """
+        Тест на отметку манифеста блоба в хранилище при всех видах чтения
+        """
+        await self.backend.put_data("app", "blob", b"manifest", blob_id="blob")
+        await self.backend.put_data("app", "key", b"value")
+
+        self.assertIsInstance(await self.backend.read_data("app", "blob"), BlobManifest)
+        self.assertIsInstance(await self.backend.read_version("app", "blob", 1), BlobManifest)
+        self.assertIsInstance(
+            await self.backend.read_as_of("app", "blob", datetime.now(UTC)), BlobManifest
+        )
+        values = await self.backend.read_many("app")
+        self.assertIsInstance(values["blob"], BlobManifest)
+        self.assertNotIsInstance(values["key"], BlobManifest)
+        self.assertEqual(values, {"blob": b"manifest", "key": b"value"})
+
+    async def write_blob(self, key: str, blob_id: str) -> None:
+        async def chunks():
+            yield b"chunk-0"
+            yield b"chunk-1"
+
+        await self.backend.write_blob_chunks("app", blob_id, chunks())
+        await self.backend.put_data("app", key, b"manifest", blob_id=blob_id)
+
+    async def count_chunks(self) -> dict[str, int]:
+        async with self.backend.session() as session:
+            result = await session.execute(
+                select(SecretChunk.blob_id, func.count()).group_by(SecretChunk.blob_id)
+            )
+            return dict(result.all())
+
+    async def test_blob_chunks_removed(self):
+        """
+        Тест на удаление чанков вытесненных, удалённых и истёкших блобов
+        """
+        await self.write_blob("blob", "first")
+        await self.write_blob("blob", "second")
+        self.assertEqual(await self.count_chunks(), {"second": 2})
+        # Перешифрование манифеста сохраняет чанки того же блоба
+        await self.backend.put_data("app", "blob", b"manifest", blob_id="second")
+        self.assertEqual(await self.count_chunks(), {"second": 2})
+
+        await self.backend.delete_data("app", "blob")
+        self.assertEqual(await self.count_chunks(), {})
+
+        await self.write_blob("replaced", "third")
+        await self.backend.put_data("app", "replaced", b"value")
+        await self.write_blob("leased", "fourth")
+        self.assertTrue(await self.backend.set_expiry("app", "leased", datetime.now(UTC)))
+        self.assertEqual(await self.count_chunks(), {"fourth": 2})
+        self.assertEqual(await self.backend.reap_expired(10), 1)
+        self.assertEqual(await self.count_chunks(), {})
+
+    async def test_key_app(self):
+        """
+        Тест на хранение ключа приложения: первая запись выигрывает, обновление и удаление
+        """
+        self.assertIsNone(await self.backend._read_key_app("app"))
+        self.assertEqual(await self.backend._write_key_app("app", b"first"), b"first")
+        # Параллельный запрос получает ключ, записанный первым
+        self.assertEqual(await self.backend._write_key_app("app", b"second"), b"first")
+
+        await self.backend._update_key_app("app", b"rotated")
+        self.assertEqual(await self.backend._read_key_app("app"), b"rotated")
+        batches = [batch async for batch in self.backend.iter_stored_values("apps_keys", None, 10)]
+        self.assertEqual([value for _, value in batches[0]], [b"rotated"])
+
+        await self.backend._delete_key_app("app")
+        self.assertIsNone(await self.backend._read_key_app("app"))
+        with self.assertRaises(ValueError):
+            await self.backend._update_key_app("app", b"key")
+        with self.assertRaises(ValueError):
+            await self.backend._delete_key_app("app")
+
+
+class TestRDBConnectionPool(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        with patch.multiple(
+            config,
+            secret_db_uri=f"sqlite+aiosqlite:///{Path(directory.name) / 'secrets.db'}",
+            secret_db_pool_size=1,
+            secret_db_max_overflow=0,
+            secret_db_pool_timeout=0.05,
+        ):
+            self.backend = RDBStorageBackend()
+        await self.backend.create_tables()
+        self.addAsyncCleanup(self.backend.engine.dispose)
+
+    async def test_pool_saturation_metrics(self):
+        """
+        Тест на учёт занятых соединений и таймаутов при исчерпании пула
+        """
+        async with self.backend.session() as session:
+            await session.execute(select(1))
+            self.assertEqual(self.backend.pool_stats()["checked_out"], 1)
+
+            with self.assertRaises(RuntimeError):
+                await self.backend.read_data("app", "key")
+
+        stats = self.backend.pool_stats()
+        self.assertEqual(stats["size"], 1)
+        self.assertEqual(stats["checked_out"], 0)
+        self.assertEqual(stats["waiting"], 0)
+        self.assertEqual(stats["timeouts"], 1)
+        self.assertFalse(self.backend.engine.echo)
+
+    async def test_waiting_counts_blocked_checkouts(self):
+        """
+        Тест на учёт ожидающих только при исчерпанном пуле
+        """
+        pool = self.backend.engine.sync_engine.pool
+        pool._timeout = 5
+        get = pool._pool.get
+        observed = []
+
+        def observe(*args):
+            observed.append(pool.waiting)
+            return get(*args)
+
+        with patch.object(pool._pool, "get", observe):
+            async with self.backend.session() as session:
+                await session.execute(select(1))
+                # Свободное соединение выдаётся без ожидания
+                self.assertEqual(observed, [0])
+
+                read = asyncio.create_task(self.backend.read_data("app", "key"))
+                await asyncio.sleep(0.05)
+                self.assertEqual(self.backend.pool_stats()["waiting"], 1)
+
+            self.assertIsNone(await read)
+        self.assertEqual(self.backend.pool_stats()["waiting"], 0)
+        self.assertEqual(self.backend.pool_stats()["timeouts"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import tracemalloc
+import unittest
+from os import urandom
+
+from cryptography.exceptions import InvalidTag
+
+from core.secret_engines.stream_module import StreamCipher
+
+
+async def _iterate(items):
+    for item in items:
+        yield item
+
+
+async def _collect(stream):
+    return [chunk async for chunk in stream]
+
+
+class TestStreamCipher(unittest.IsolatedAsyncioTestCase):
+    async def test_round_trip(self):
+        """
+        Тест на потоковое шифрование и расшифровку
+        """
+        cipher = StreamCipher.generate()
+        data = urandom(10_000)
+        pieces = [data[i : i + 777] for i in range(0, len(data), 777)]
+
+        chunks = await _collect(cipher.encrypt_stream(_iterate(pieces), chunk_size=1024))
+        self.assertEqual(len(chunks), 10)
+
+        decrypted = await _collect(cipher.decrypt_stream(_iterate(chunks), len(chunks)))
+        self.assertEqual(b"".join(decrypted), data)
+
+    async def test_empty_stream(self):
+        """
+        Тест на пустой поток
+        """
+        cipher = StreamCipher.generate()
+        chunks = await _collect(cipher.encrypt_stream(_iterate([]), chunk_size=1024))
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual(await _collect(cipher.decrypt_stream(_iterate(chunks), 1)), [b""])
+
+    async def test_truncated_stream_rejected(self):
+        """
+        Тест на отказ при отброшенном последнем чанке
+        """
+        cipher = StreamCipher.generate()
+        chunks = await _collect(cipher.encrypt_stream(_iterate([urandom(4096)]), chunk_size=1024))
+
+        with self.assertRaises(InvalidTag):
+            await _collect(cipher.decrypt_stream(_iterate(chunks[:-1]), len(chunks) - 1))
+        with self.assertRaises(ValueError):
+            await _collect(cipher.decrypt_stream(_iterate(chunks[:-1]), len(chunks)))
+
+    async def test_reordered_chunks_rejected(self):
+        """
+        Тест на отказ при перестановке чанков
+        """
+        cipher = StreamCipher.generate()
+        chunks = await _collect(cipher.encrypt_stream(_iterate([urandom(4096)]), chunk_size=1024))
+        chunks[0], chunks[1] = chunks[1], chunks[0]
+
+        with self.assertRaises(InvalidTag):
+            await _collect(cipher.decrypt_stream(_iterate(chunks), len(chunks)))
+
+    async def test_constant_memory(self):
+        """
+        Тест на независимость пикового потребления памяти от размера блоба
+        """
+        cipher = StreamCipher.generate()
+        chunk_size = 64 * 1024
+
+        async def source(size):
+            for _ in range(size // chunk_size):
+                yield bytes(chunk_size)
+
+        peaks = []
+        for size in (chunk_size * 8, chunk_size * 64):
+            tracemalloc.start()
+            async for _ in cipher.encrypt_stream(source(size), chunk_size):
+                pass
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+        self.assertLess(peaks[1], peaks[0] * 1.5)
+        self.assertLess(peaks[1], chunk_size * 8)